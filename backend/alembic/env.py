@@ -0,0 +1,63 @@
+"""
+Ambiente das migrações.
+
+O schema alvo é o `Base.metadata` dos models em `app.models`; a URL vem
+das settings (DATABASE_URL), a não ser que quem chama já tenha definido
+`sqlalchemy.url` (migrate_database). Tabelas que existem no banco mas não nos
+models (ex.: as do main.py legado) são ignoradas pelo autogenerate em vez
+de virarem DROP TABLE.
+"""
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import engine_from_config, pool
+
+from app.core.config import settings
+from app.db.session import Base
+import app.models  # noqa: F401  (registra as tabelas no metadata)
+
+config = context.config
+if config.config_file_name is not None and config.attributes.get("configurar_logging", True):
+    # migrate_database já configura o logging e passa configurar_logging=False
+    fileConfig(config.config_file_name, disable_existing_loggers=False)
+if not config.get_main_option("sqlalchemy.url"):
+    config.set_main_option("sqlalchemy.url", settings.DATABASE_URL.replace("%", "%%"))
+
+target_metadata = Base.metadata
+
+def include_object(object, name, type_, reflected, compare_to):
+    if type_ == "table" and reflected and compare_to is None:
+        return False
+    return True
+
+def _opcoes(dialeto: str) -> dict:
+    return {
+        "target_metadata": target_metadata,
+        "include_object": include_object,
+        # SQLite não altera colunas no lugar: o Alembic recria a tabela (batch)
+        "render_as_batch": dialeto == "sqlite",
+        "compare_type": True,
+    }
+
+def run_migrations_offline() -> None:
+    """Gerar o SQL das migrações sem conectar (`alembic upgrade head --sql`)"""
+    url = config.get_main_option("sqlalchemy.url")
+    context.configure(url=url, literal_binds=True, dialect_opts={"paramstyle": "named"}, **_opcoes(url.split(":", 1)[0].split("+", 1)[0]))
+    with context.begin_transaction():
+        context.run_migrations()
+
+def run_migrations_online() -> None:
+    connectable = engine_from_config(
+        config.get_section(config.config_ini_section, {}),
+        prefix="sqlalchemy.",
+        poolclass=pool.NullPool,
+    )
+    with connectable.connect() as connection:
+        context.configure(connection=connection, **_opcoes(connection.dialect.name))
+        with context.begin_transaction():
+            context.run_migrations()
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
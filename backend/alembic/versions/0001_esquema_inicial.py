@@ -0,0 +1,396 @@
+"""esquema inicial
+
+Tabelas dos models de app.models como o create_all do migrate_database as
+criava, mais a tabela `bancos` usada pelas rotas legadas do main.py. Os
+índices dos caminhos quentes ficam na 0002.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 13:17:50.258313
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    # Rotas legadas do main.py (/api/v1/bancos)
+    op.create_table('bancos',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('codigo', sa.String(length=10), nullable=False),
+    sa.Column('nome', sa.String(length=100), nullable=False),
+    sa.Column('nome_fantasia', sa.String(length=100), nullable=True),
+    sa.Column('site', sa.String(length=255), nullable=True),
+    sa.Column('ativo', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_bancos_codigo'), 'bancos', ['codigo'], unique=True)
+    op.create_index(op.f('ix_bancos_id'), 'bancos', ['id'], unique=False)
+
+    op.create_table('categorias',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('nome', sa.String(length=100), nullable=False),
+    sa.Column('descricao', sa.Text(), nullable=True),
+    sa.Column('ativa', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_categorias_id'), 'categorias', ['id'], unique=False)
+
+    op.create_table('clientes_fornecedores',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('nome', sa.String(length=200), nullable=False),
+    sa.Column('nome_fantasia', sa.String(length=200), nullable=True),
+    sa.Column('tipo_pessoa', sa.Enum('fisica', 'juridica', name='tipopessoa'), nullable=False),
+    sa.Column('cpf_cnpj', sa.String(length=18), nullable=True),
+    sa.Column('rg_ie', sa.String(length=20), nullable=True),
+    sa.Column('im', sa.String(length=20), nullable=True),
+    sa.Column('endereco', sa.String(length=255), nullable=True),
+    sa.Column('numero', sa.String(length=10), nullable=True),
+    sa.Column('complemento', sa.String(length=100), nullable=True),
+    sa.Column('bairro', sa.String(length=100), nullable=True),
+    sa.Column('cidade', sa.String(length=100), nullable=True),
+    sa.Column('estado', sa.String(length=2), nullable=True),
+    sa.Column('cep', sa.String(length=10), nullable=True),
+    sa.Column('telefone1', sa.String(length=20), nullable=True),
+    sa.Column('telefone2', sa.String(length=20), nullable=True),
+    sa.Column('email', sa.String(length=100), nullable=True),
+    sa.Column('site', sa.String(length=255), nullable=True),
+    sa.Column('banco', sa.String(length=100), nullable=True),
+    sa.Column('agencia', sa.String(length=10), nullable=True),
+    sa.Column('conta', sa.String(length=20), nullable=True),
+    sa.Column('tipo_conta', sa.String(length=20), nullable=True),
+    sa.Column('pix', sa.String(length=100), nullable=True),
+    sa.Column('cnae_principal', sa.String(length=10), nullable=True),
+    sa.Column('cnae_secundario', sa.String(length=500), nullable=True),
+    sa.Column('inscricao_suframa', sa.String(length=20), nullable=True),
+    sa.Column('eh_cliente', sa.Boolean(), nullable=True),
+    sa.Column('eh_fornecedor', sa.Boolean(), nullable=True),
+    sa.Column('ativo', sa.Boolean(), nullable=True),
+    sa.Column('observacoes', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_clientes_fornecedores_cpf_cnpj'), 'clientes_fornecedores', ['cpf_cnpj'], unique=True)
+    op.create_index(op.f('ix_clientes_fornecedores_id'), 'clientes_fornecedores', ['id'], unique=False)
+
+    op.create_table('contas_corrente',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('nome', sa.String(length=100), nullable=False),
+    sa.Column('banco', sa.String(length=100), nullable=False),
+    sa.Column('codigo_banco', sa.String(length=10), nullable=True),
+    sa.Column('agencia', sa.String(length=10), nullable=False),
+    sa.Column('conta', sa.String(length=20), nullable=False),
+    sa.Column('digito_conta', sa.String(length=2), nullable=True),
+    sa.Column('tipo_conta', sa.String(length=20), nullable=True),
+    sa.Column('saldo_inicial', sa.Numeric(precision=15, scale=2), nullable=True),
+    sa.Column('saldo_atual', sa.Numeric(precision=15, scale=2), nullable=True),
+    sa.Column('limite', sa.Numeric(precision=15, scale=2), nullable=True),
+    sa.Column('gerente', sa.String(length=100), nullable=True),
+    sa.Column('telefone_banco', sa.String(length=20), nullable=True),
+    sa.Column('observacoes', sa.Text(), nullable=True),
+    sa.Column('ativa', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_contas_corrente_id'), 'contas_corrente', ['id'], unique=False)
+
+    op.create_table('empresas',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('codigo_cliente_omie', sa.Integer(), nullable=True),
+    sa.Column('codigo_cliente_integracao', sa.String(length=50), nullable=True),
+    sa.Column('razao_social', sa.String(length=200), nullable=False),
+    sa.Column('nome_fantasia', sa.String(length=200), nullable=True),
+    sa.Column('cnpj', sa.String(length=18), nullable=True),
+    sa.Column('inscricao_estadual', sa.String(length=20), nullable=True),
+    sa.Column('inscricao_municipal', sa.String(length=20), nullable=True),
+    sa.Column('inscricao_suframa', sa.String(length=20), nullable=True),
+    sa.Column('endereco', sa.String(length=255), nullable=True),
+    sa.Column('endereco_numero', sa.String(length=10), nullable=True),
+    sa.Column('bairro', sa.String(length=100), nullable=True),
+    sa.Column('complemento', sa.String(length=100), nullable=True),
+    sa.Column('cidade', sa.String(length=100), nullable=True),
+    sa.Column('estado', sa.String(length=2), nullable=True),
+    sa.Column('cep', sa.String(length=10), nullable=True),
+    sa.Column('codigo_pais', sa.String(length=10), nullable=True),
+    sa.Column('telefone1_ddd', sa.String(length=3), nullable=True),
+    sa.Column('telefone1_numero', sa.String(length=15), nullable=True),
+    sa.Column('telefone2_ddd', sa.String(length=3), nullable=True),
+    sa.Column('telefone2_numero', sa.String(length=15), nullable=True),
+    sa.Column('fax_ddd', sa.String(length=3), nullable=True),
+    sa.Column('fax_numero', sa.String(length=15), nullable=True),
+    sa.Column('email', sa.String(length=100), nullable=True),
+    sa.Column('homepage', sa.String(length=255), nullable=True),
+    sa.Column('optante_simples_nacional', sa.String(length=1), nullable=True),
+    sa.Column('data_abertura', sa.Date(), nullable=True),
+    sa.Column('cnae', sa.String(length=10), nullable=True),
+    sa.Column('tipo_atividade', sa.String(length=1), nullable=True),
+    sa.Column('codigo_regime_tributario', sa.String(length=1), nullable=True),
+    sa.Column('codigo_banco', sa.String(length=10), nullable=True),
+    sa.Column('agencia', sa.String(length=10), nullable=True),
+    sa.Column('conta_corrente', sa.String(length=20), nullable=True),
+    sa.Column('doc_titular', sa.String(length=18), nullable=True),
+    sa.Column('nome_titular', sa.String(length=100), nullable=True),
+    sa.Column('observacoes', sa.Text(), nullable=True),
+    sa.Column('inativo', sa.String(length=1), nullable=True),
+    sa.Column('bloqueado', sa.String(length=1), nullable=True),
+    sa.Column('hash_omie', sa.String(length=64), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_empresas_cnpj'), 'empresas', ['cnpj'], unique=True)
+    op.create_index(op.f('ix_empresas_codigo_cliente_integracao'), 'empresas', ['codigo_cliente_integracao'], unique=True)
+    op.create_index(op.f('ix_empresas_codigo_cliente_omie'), 'empresas', ['codigo_cliente_omie'], unique=True)
+    op.create_index(op.f('ix_empresas_id'), 'empresas', ['id'], unique=False)
+
+    op.create_table('execucoes_rotinas',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('rotina', sa.String(length=50), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('contadores', sa.JSON(), nullable=True),
+    sa.Column('mensagem', sa.Text(), nullable=True),
+    sa.Column('duracao_ms', sa.Integer(), nullable=True),
+    sa.Column('iniciado_em', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('finalizado_em', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_execucoes_rotinas_id'), 'execucoes_rotinas', ['id'], unique=False)
+    op.create_index(op.f('ix_execucoes_rotinas_rotina'), 'execucoes_rotinas', ['rotina'], unique=False)
+
+    op.create_table('fluxo_caixa_diario',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('data', sa.Date(), nullable=False),
+    sa.Column('conta_corrente_id', sa.Integer(), nullable=False),
+    sa.Column('categoria_id', sa.Integer(), nullable=False),
+    sa.Column('entradas', sa.Numeric(precision=15, scale=2), nullable=False),
+    sa.Column('saidas', sa.Numeric(precision=15, scale=2), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('data', 'conta_corrente_id', 'categoria_id')
+    )
+    op.create_index(op.f('ix_fluxo_caixa_diario_id'), 'fluxo_caixa_diario', ['id'], unique=False)
+
+    op.create_table('integracoes',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('nome', sa.String(length=100), nullable=False),
+    sa.Column('tipo', sa.String(length=50), nullable=False),
+    sa.Column('descricao', sa.Text(), nullable=True),
+    sa.Column('base_url', sa.String(length=255), nullable=True),
+    sa.Column('app_key', sa.String(length=255), nullable=True),
+    sa.Column('app_secret', sa.String(length=255), nullable=True),
+    sa.Column('token', sa.String(length=500), nullable=True),
+    sa.Column('configuracoes_extras', sa.JSON(), nullable=True),
+    sa.Column('ativo', sa.Boolean(), nullable=True),
+    sa.Column('testado', sa.Boolean(), nullable=True),
+    sa.Column('ultima_sincronizacao', sa.DateTime(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_integracoes_id'), 'integracoes', ['id'], unique=False)
+
+    op.create_table('users',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('email', sa.String(), nullable=False),
+    sa.Column('hashed_password', sa.String(), nullable=False),
+    sa.Column('full_name', sa.String(), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('is_superuser', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_users_email'), 'users', ['email'], unique=True)
+    op.create_index(op.f('ix_users_id'), 'users', ['id'], unique=False)
+
+    op.create_table('anexos_clientes_fornecedores',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('cliente_fornecedor_id', sa.Integer(), nullable=False),
+    sa.Column('nome_arquivo', sa.String(length=255), nullable=False),
+    sa.Column('caminho_arquivo', sa.String(length=500), nullable=False),
+    sa.Column('tipo_arquivo', sa.String(length=50), nullable=True),
+    sa.Column('tamanho', sa.Integer(), nullable=True),
+    sa.Column('descricao', sa.String(length=255), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.ForeignKeyConstraint(['cliente_fornecedor_id'], ['clientes_fornecedores.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_anexos_clientes_fornecedores_id'), 'anexos_clientes_fornecedores', ['id'], unique=False)
+
+    op.create_table('contas_pagar',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('descricao', sa.String(), nullable=False),
+    sa.Column('fornecedor_id', sa.Integer(), nullable=True),
+    sa.Column('categoria_id', sa.Integer(), nullable=True),
+    sa.Column('conta_corrente_id', sa.Integer(), nullable=True),
+    sa.Column('valor_original', sa.Numeric(precision=15, scale=2), nullable=False),
+    sa.Column('valor_pago', sa.Numeric(precision=15, scale=2), nullable=True),
+    sa.Column('data_vencimento', sa.Date(), nullable=False),
+    sa.Column('data_emissao', sa.Date(), nullable=True),
+    sa.Column('numero_documento', sa.String(length=50), nullable=True),
+    sa.Column('status', sa.Enum('pendente', 'pago', 'cancelado', 'vencido', name='statusconta'), nullable=True),
+    sa.Column('observacoes', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['categoria_id'], ['categorias.id'], ),
+    sa.ForeignKeyConstraint(['conta_corrente_id'], ['contas_corrente.id'], ),
+    sa.ForeignKeyConstraint(['fornecedor_id'], ['clientes_fornecedores.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_contas_pagar_id'), 'contas_pagar', ['id'], unique=False)
+
+    op.create_table('contas_receber',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('descricao', sa.String(), nullable=False),
+    sa.Column('cliente', sa.String(), nullable=False),
+    sa.Column('valor', sa.Float(), nullable=False),
+    sa.Column('data_vencimento', sa.Date(), nullable=False),
+    sa.Column('data_recebimento', sa.Date(), nullable=True),
+    sa.Column('status', sa.Enum('pendente', 'pago', 'cancelado', 'vencido', name='statusconta'), nullable=True),
+    sa.Column('observacoes', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_contas_receber_id'), 'contas_receber', ['id'], unique=False)
+
+    op.create_table('contatos_clientes_fornecedores',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('cliente_fornecedor_id', sa.Integer(), nullable=False),
+    sa.Column('tipo', sa.String(length=20), nullable=False),
+    sa.Column('valor', sa.String(length=100), nullable=False),
+    sa.Column('descricao', sa.String(length=100), nullable=True),
+    sa.Column('principal', sa.Boolean(), nullable=True),
+    sa.ForeignKeyConstraint(['cliente_fornecedor_id'], ['clientes_fornecedores.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_contatos_clientes_fornecedores_id'), 'contatos_clientes_fornecedores', ['id'], unique=False)
+
+    op.create_table('jobs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('tipo', sa.String(length=50), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('parametros', sa.JSON(), nullable=True),
+    sa.Column('resultado', sa.JSON(), nullable=True),
+    sa.Column('mensagem', sa.Text(), nullable=True),
+    sa.Column('progresso_atual', sa.Integer(), nullable=True),
+    sa.Column('progresso_total', sa.Integer(), nullable=True),
+    sa.Column('tentativas', sa.Integer(), nullable=True),
+    sa.Column('max_tentativas', sa.Integer(), nullable=True),
+    sa.Column('cancelamento_solicitado', sa.Boolean(), nullable=True),
+    sa.Column('task_id', sa.String(length=155), nullable=True),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('iniciado_em', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('finalizado_em', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_jobs_id'), 'jobs', ['id'], unique=False)
+    op.create_index(op.f('ix_jobs_status'), 'jobs', ['status'], unique=False)
+
+    op.create_table('saldos_diarios',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('conta_corrente_id', sa.Integer(), nullable=False),
+    sa.Column('data', sa.Date(), nullable=False),
+    sa.Column('movimento', sa.Numeric(precision=15, scale=2), nullable=False),
+    sa.Column('acumulado', sa.Numeric(precision=15, scale=2), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.ForeignKeyConstraint(['conta_corrente_id'], ['contas_corrente.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('conta_corrente_id', 'data')
+    )
+    op.create_index(op.f('ix_saldos_diarios_id'), 'saldos_diarios', ['id'], unique=False)
+
+    op.create_table('sincronizacao_watermarks',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('integracao_id', sa.Integer(), nullable=False),
+    sa.Column('entidade', sa.String(length=50), nullable=False),
+    sa.Column('sincronizado_ate', sa.DateTime(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['integracao_id'], ['integracoes.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('integracao_id', 'entidade')
+    )
+    op.create_index(op.f('ix_sincronizacao_watermarks_id'), 'sincronizacao_watermarks', ['id'], unique=False)
+
+    op.create_table('pagamentos',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('conta_pagar_id', sa.Integer(), nullable=False),
+    sa.Column('conta_corrente_id', sa.Integer(), nullable=True),
+    sa.Column('valor', sa.Numeric(precision=15, scale=2), nullable=False),
+    sa.Column('data_pagamento', sa.Date(), nullable=False),
+    sa.Column('tipo_pagamento', sa.Enum('dinheiro', 'cartao_credito', 'cartao_debito', 'transferencia', 'boleto', 'pix', 'cheque', name='tipopagamento'), nullable=False),
+    sa.Column('numero_documento', sa.String(length=50), nullable=True),
+    sa.Column('observacoes', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['conta_corrente_id'], ['contas_corrente.id'], ),
+    sa.ForeignKeyConstraint(['conta_pagar_id'], ['contas_pagar.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_pagamentos_id'), 'pagamentos', ['id'], unique=False)
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_pagamentos_id'), table_name='pagamentos')
+    op.drop_table('pagamentos')
+    op.drop_index(op.f('ix_sincronizacao_watermarks_id'), table_name='sincronizacao_watermarks')
+    op.drop_table('sincronizacao_watermarks')
+    op.drop_index(op.f('ix_saldos_diarios_id'), table_name='saldos_diarios')
+    op.drop_table('saldos_diarios')
+    op.drop_index(op.f('ix_jobs_status'), table_name='jobs')
+    op.drop_index(op.f('ix_jobs_id'), table_name='jobs')
+    op.drop_table('jobs')
+    op.drop_index(op.f('ix_contatos_clientes_fornecedores_id'), table_name='contatos_clientes_fornecedores')
+    op.drop_table('contatos_clientes_fornecedores')
+    op.drop_index(op.f('ix_contas_receber_id'), table_name='contas_receber')
+    op.drop_table('contas_receber')
+    op.drop_index(op.f('ix_contas_pagar_id'), table_name='contas_pagar')
+    op.drop_table('contas_pagar')
+    op.drop_index(op.f('ix_anexos_clientes_fornecedores_id'), table_name='anexos_clientes_fornecedores')
+    op.drop_table('anexos_clientes_fornecedores')
+    op.drop_index(op.f('ix_users_id'), table_name='users')
+    op.drop_index(op.f('ix_users_email'), table_name='users')
+    op.drop_table('users')
+    op.drop_index(op.f('ix_integracoes_id'), table_name='integracoes')
+    op.drop_table('integracoes')
+    op.drop_index(op.f('ix_fluxo_caixa_diario_id'), table_name='fluxo_caixa_diario')
+    op.drop_table('fluxo_caixa_diario')
+    op.drop_index(op.f('ix_execucoes_rotinas_rotina'), table_name='execucoes_rotinas')
+    op.drop_index(op.f('ix_execucoes_rotinas_id'), table_name='execucoes_rotinas')
+    op.drop_table('execucoes_rotinas')
+    op.drop_index(op.f('ix_empresas_id'), table_name='empresas')
+    op.drop_index(op.f('ix_empresas_codigo_cliente_omie'), table_name='empresas')
+    op.drop_index(op.f('ix_empresas_codigo_cliente_integracao'), table_name='empresas')
+    op.drop_index(op.f('ix_empresas_cnpj'), table_name='empresas')
+    op.drop_table('empresas')
+    op.drop_index(op.f('ix_contas_corrente_id'), table_name='contas_corrente')
+    op.drop_table('contas_corrente')
+    op.drop_index(op.f('ix_clientes_fornecedores_id'), table_name='clientes_fornecedores')
+    op.drop_index(op.f('ix_clientes_fornecedores_cpf_cnpj'), table_name='clientes_fornecedores')
+    op.drop_table('clientes_fornecedores')
+    op.drop_index(op.f('ix_categorias_id'), table_name='categorias')
+    op.drop_table('categorias')
+    op.drop_index(op.f('ix_bancos_id'), table_name='bancos')
+    op.drop_index(op.f('ix_bancos_codigo'), table_name='bancos')
+    op.drop_table('bancos')
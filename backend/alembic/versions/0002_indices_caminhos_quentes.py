@@ -0,0 +1,55 @@
+"""índices dos caminhos quentes
+
+Índices compostos das listagens e índices parciais dos títulos pendentes.
+No Postgres são criados com CREATE INDEX CONCURRENTLY, fora de transação,
+para não bloquear gravações nas tabelas durante a criação; IF NOT EXISTS
+permite rodar sobre bancos que já os têm (criados pelo create_all).
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 13:40:12.104263
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PENDENTE = sa.text("status = 'pendente'")
+
+# (nome, tabela, colunas, where)
+INDICES = [
+    ('ix_contas_pagar_user_vencimento', 'contas_pagar', ['user_id', 'data_vencimento', 'id'], None),
+    ('ix_contas_pagar_status_vencimento', 'contas_pagar', ['status', 'data_vencimento'], None),
+    ('ix_contas_pagar_fornecedor_status', 'contas_pagar', ['fornecedor_id', 'status'], None),
+    ('ix_contas_pagar_categoria_id', 'contas_pagar', ['categoria_id'], None),
+    ('ix_contas_pagar_conta_corrente_id', 'contas_pagar', ['conta_corrente_id'], None),
+    ('ix_contas_pagar_vencimento_pendente', 'contas_pagar', ['data_vencimento'], PENDENTE),
+    ('ix_contas_receber_user_vencimento', 'contas_receber', ['user_id', 'data_vencimento', 'id'], None),
+    ('ix_contas_receber_status_vencimento', 'contas_receber', ['status', 'data_vencimento'], None),
+    ('ix_contas_receber_data_recebimento', 'contas_receber', ['data_recebimento'], None),
+    ('ix_contas_receber_vencimento_pendente', 'contas_receber', ['data_vencimento'], PENDENTE),
+    ('ix_pagamentos_conta_pagar_id', 'pagamentos', ['conta_pagar_id'], None),
+    ('ix_pagamentos_conta_corrente_data', 'pagamentos', ['conta_corrente_id', 'data_pagamento'], None),
+    ('ix_pagamentos_data_pagamento', 'pagamentos', ['data_pagamento'], None),
+]
+
+def upgrade() -> None:
+    # CONCURRENTLY não roda dentro de transação
+    with op.get_context().autocommit_block():
+        for nome, tabela, colunas, where in INDICES:
+            op.create_index(
+                nome, tabela, colunas, unique=False, if_not_exists=True,
+                postgresql_concurrently=True, postgresql_where=where, sqlite_where=where
+            )
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for nome, tabela, _, _ in reversed(INDICES):
+            op.drop_index(nome, table_name=tabela, if_exists=True, postgresql_concurrently=True)
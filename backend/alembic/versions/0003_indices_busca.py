@@ -0,0 +1,46 @@
+"""índices de busca
+
+Índices pg_trgm (Postgres) / FTS5 (SQLite) das caixas de pesquisa, criados
+por app.db.search (no Postgres com CONCURRENTLY). Sem permissão para as
+extensões a migração segue e as buscas continuam no ilike.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 13:41:55.617020
+
+"""
+import logging
+from typing import Sequence, Union
+
+from alembic import op
+
+from app.db.search import INDICES_BUSCA, ensure_search_indexes
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+logger = logging.getLogger("alembic.runtime.migration")
+
+def upgrade() -> None:
+    if op.get_context().as_sql:
+        # Sem conexão no modo --sql: rode migrate_database ou o upgrade online
+        return
+    # Os índices são criados numa conexão própria, em autocommit
+    with op.get_context().autocommit_block():
+        if not ensure_search_indexes(op.get_bind().engine):
+            logger.warning("Índices de busca não criados; as buscas usarão ilike")
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    with op.get_context().autocommit_block():
+        if bind.dialect.name == "postgresql":
+            for tabela in INDICES_BUSCA:
+                op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS ix_{tabela}_busca_trgm")
+        elif bind.dialect.name == "sqlite":
+            for tabela in INDICES_BUSCA:
+                for sufixo in ("ai", "ad", "au"):
+                    op.execute(f"DROP TRIGGER IF EXISTS {tabela}_busca_{sufixo}")
+                op.execute(f"DROP TABLE IF EXISTS {tabela}_busca")
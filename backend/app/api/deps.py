@@ -1,13 +1,14 @@
-from typing import Generator, Optional
-from fastapi import Depends, HTTPException, status
+from typing import AsyncGenerator, Generator, Optional
+from fastapi import Depends, HTTPException, Response, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import jwt, JWTError
-from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.core import security
+from app.core import principal as cache_principal, tokens
+from app.core.principal import Principal
 from app.core.config import settings
+from app.core.tokens import TokenInvalido
 from app.crud import crud_user
-from app.db.session import SessionLocal
+from app.db.session import AsyncSessionLocal, SessionLocal
 from app.models import User
 from app.schemas import TokenPayload
 
@@ -15,6 +16,9 @@ reusable_oauth2 = OAuth2PasswordBearer(
     tokenUrl=f"{settings.API_V1_STR}/auth/login"
 )
 
+# Header com o cursor da próxima página nas listagens paginadas por chave
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
 def get_db() -> Generator:
     try:
         db = SessionLocal()
@@ -22,36 +26,77 @@ def get_db() -> Generator:
     finally:
         db.close()
 
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """Sessão assíncrona para as rotas async def (não ocupa o threadpool)"""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def _credenciais_invalidas() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_403_FORBIDDEN,
+        detail="Não foi possível validar as credenciais",
+    )
+
+def _ler_token(token: str) -> TokenPayload:
+    try:
+        return tokens.validar(token)
+    except TokenInvalido:
+        raise _credenciais_invalidas()
+
+async def _ler_token_async(token: str) -> TokenPayload:
+    try:
+        return await tokens.validar_async(token)
+    except TokenInvalido:
+        raise _credenciais_invalidas()
+
+async def get_token_payload_async(token: str = Depends(reusable_oauth2)) -> TokenPayload:
+    """Payload do token da requisição (validado e não revogado)"""
+    return await _ler_token_async(token)
+
 def get_current_user(
     db: Session = Depends(get_db), token: str = Depends(reusable_oauth2)
-) -> User:
-    try:
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
-        )
-        token_data = TokenPayload(**payload)
-    except (JWTError, ValidationError):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Não foi possível validar as credenciais",
-        )
-    user = crud_user.get(db, id=token_data.sub)
-    if not user:
-        raise HTTPException(status_code=404, detail="Usuário não encontrado")
-    return user
+) -> Principal:
+    # Com o principal em cache a sessão nem chega a abrir conexão
+    token_data = _ler_token(token)
+    principal = cache_principal.obter(token_data.sub)
+    if principal is None:
+        user = crud_user.get(db, id=token_data.sub)
+        if not user:
+            raise HTTPException(status_code=404, detail="Usuário não encontrado")
+        principal = cache_principal.guardar(Principal.do_usuario(user))
+    return principal
 
 def get_current_active_user(
-    current_user: User = Depends(get_current_user),
-) -> User:
+    current_user: Principal = Depends(get_current_user),
+) -> Principal:
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Usuário inativo")
     return current_user
 
+async def get_current_active_user_async(
+    db: AsyncSession = Depends(get_async_db), token: str = Depends(reusable_oauth2)
+) -> Principal:
+    """get_current_active_user das rotas async, com a mesma sessão assíncrona da rota"""
+    token_data = await _ler_token_async(token)
+    principal = await cache_principal.obter_async(token_data.sub)
+    if principal is None:
+        user = await db.get(User, token_data.sub) if token_data.sub is not None else None
+        if not user:
+            raise HTTPException(status_code=404, detail="Usuário não encontrado")
+        principal = await cache_principal.guardar_async(Principal.do_usuario(user))
+    if not principal.is_active:
+        raise HTTPException(status_code=400, detail="Usuário inativo")
+    return principal
+
 def get_current_active_superuser(
-    current_user: User = Depends(get_current_user),
-) -> User:
+    current_user: Principal = Depends(get_current_user),
+) -> Principal:
     if not current_user.is_superuser:
         raise HTTPException(
             status_code=400, detail="O usuário não tem privilégios suficientes"
         )
-    return current_user
\ No newline at end of file
+    return current_user
+
+def set_next_cursor(response: Response, next_cursor: Optional[str]) -> None:
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
@@ -1,8 +1,8 @@
 from fastapi import APIRouter
 from app.api.v1.endpoints import (
     auth, users, contas_pagar, contas_receber, conta_corrente, 
-    import_export, empresas, integracoes, clientes_fornecedores, 
-    categorias, pagamentos
+    import_export, empresas, bancos, integracoes, clientes_fornecedores, 
+    categorias, pagamentos, jobs, relatorios
 )
 
 api_router = APIRouter()
@@ -10,6 +10,7 @@ api_router = APIRouter()
 api_router.include_router(auth.router, prefix="/auth", tags=["authentication"])
 api_router.include_router(users.router, prefix="/users", tags=["users"])
 api_router.include_router(empresas.router, prefix="/empresas", tags=["empresas"])
+api_router.include_router(bancos.router, prefix="/bancos", tags=["bancos"])
 api_router.include_router(integracoes.router, prefix="/integracoes", tags=["integrações"])
 api_router.include_router(clientes_fornecedores.router, prefix="/clientes-fornecedores", tags=["clientes e fornecedores"])
 api_router.include_router(categorias.router, prefix="/categorias", tags=["categorias"])
@@ -18,3 +19,5 @@ api_router.include_router(contas_pagar.router, prefix="/contas-pagar", tags=["co
 api_router.include_router(pagamentos.router, prefix="/pagamentos", tags=["pagamentos"])
 api_router.include_router(contas_receber.router, prefix="/contas-receber", tags=["contas a receber"])
 api_router.include_router(import_export.router, prefix="/import-export", tags=["importação/exportação"])
+api_router.include_router(relatorios.router, prefix="/relatorios", tags=["relatórios"])
+api_router.include_router(jobs.router, prefix="/jobs", tags=["jobs"])
@@ -1,37 +1,77 @@
+import math
 from datetime import timedelta
 from typing import Any
-from fastapi import APIRouter, Body, Depends, HTTPException
+from fastapi import APIRouter, Body, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.api import deps
-from app.core import security
+from app.core import principal as cache_principal, security, tokens
+from app.core.principal import Principal
 from app.core.config import settings
+from app.core.limitador import LimitadorTentativas
 from app.core.security import get_password_hash
 from app.crud import crud_user
-from app.schemas import User, UserCreate, Token
+from app.schemas import User, UserCreate, Token, TokenPayload
 
 router = APIRouter()
 
+# Por processo: falhas seguidas por conta e falhas por IP (logins bem-sucedidos não contam)
+limite_conta = LimitadorTentativas(settings.LOGIN_FALHAS_POR_CONTA, settings.LOGIN_JANELA_SEGUNDOS)
+limite_ip = LimitadorTentativas(settings.LOGIN_FALHAS_POR_IP, settings.LOGIN_JANELA_SEGUNDOS)
+
+def _verificar_limites(conta: str, ip: str) -> None:
+    for limitador, chave in ((limite_ip, ip), (limite_conta, conta)):
+        espera = limitador.bloqueado_por(chave)
+        if espera is not None:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Muitas tentativas de login; tente novamente mais tarde",
+                headers={"Retry-After": str(max(math.ceil(espera), 1))},
+            )
+
 @router.post("/login", response_model=Token)
-def login(
-    db: Session = Depends(deps.get_db),
+async def login(
+    request: Request,
+    db: AsyncSession = Depends(deps.get_async_db),
     form_data: OAuth2PasswordRequestForm = Depends()
 ) -> Any:
-    user = crud_user.authenticate(
+    conta = form_data.username.strip().lower()
+    ip = request.client.host if request.client else "desconhecido"
+    # Recusa antes de gastar CPU com o bcrypt
+    _verificar_limites(conta, ip)
+    
+    user = await crud_user.authenticate_async(
         db, email=form_data.username, password=form_data.password
     )
     if not user:
-        raise HTTPException(status_code=400, detail="Email ou senha incorretos")
+        limite_conta.registrar(conta)
+        limite_ip.registrar(ip)
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Email ou senha incorretos",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
     elif not user.is_active:
-        raise HTTPException(status_code=400, detail="Usuário inativo")
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Usuário inativo")
+    limite_conta.limpar(conta)
+    # As primeiras chamadas da tela logo após o login já encontram o usuário em cache
+    await cache_principal.guardar_async(Principal.do_usuario(user))
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     return {
         "access_token": security.create_access_token(
             user.id, expires_delta=access_token_expires
         ),
         "token_type": "bearer",
+        "user": user,
     }
 
+@router.post("/logout")
+async def logout(token_data: TokenPayload = Depends(deps.get_token_payload_async)) -> Any:
+    # Revoga o token até o exp: as próximas requisições com ele recebem 403
+    await tokens.revogar_async(token_data)
+    return {"message": "Sessão encerrada"}
+
 @router.post("/register", response_model=User)
 def register(
     *,
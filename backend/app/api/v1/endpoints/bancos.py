@@ -0,0 +1,110 @@
+from typing import Any, Optional
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy.orm import Session
+
+from app import crud
+from app.api import deps
+from app.core import cache_respostas
+from app.core.principal import Principal
+from app.db.pagination import ModoContagem, paginated_response
+from app.schemas.banco import Banco, BancoCreate, BancoUpdate
+
+router = APIRouter()
+
+@router.get("/", response_model=dict)
+def read_bancos(
+    request: Request,
+    db: Session = Depends(deps.get_db),
+    page: int = 1,
+    limit: int = 10,
+    cursor: Optional[str] = None,
+    count: ModoContagem = ModoContagem.EXACT,
+    search: Optional[str] = None,
+    current_user: Principal = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Listar bancos com paginação por página (`page`/`limit`) e busca por
+    código ou nome. Com `cursor` (vazio na primeira página) a paginação é por
+    chave e o cursor da próxima página volta em `next_cursor`. As páginas
+    vêm do cache de respostas, com ETag.
+    """
+    skip = (page - 1) * limit
+    
+    def carregar():
+        pagina = crud.banco.get_page_with_search(
+            db, skip=skip, limit=limit, cursor=cursor, count=count, search=search
+        )
+        return paginated_response(
+            [Banco.from_orm(item) for item in pagina.items],
+            pagina.total,
+            skip=skip,
+            limit=limit,
+            cursor=cursor,
+            next_cursor=pagina.next_cursor
+        )
+    
+    return cache_respostas.responder(request, cache_respostas.BANCOS, carregar, dict)
+
+@router.post("/", response_model=Banco)
+def create_banco(
+    *,
+    db: Session = Depends(deps.get_db),
+    banco_in: BancoCreate,
+    current_user: Principal = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Criar banco.
+    """
+    if crud.banco.get_by_codigo(db, codigo=banco_in.codigo):
+        raise HTTPException(status_code=400, detail="Código já existe")
+    
+    return crud.banco.create(db=db, obj_in=banco_in)
+
+@router.put("/{id}", response_model=Banco)
+def update_banco(
+    *,
+    db: Session = Depends(deps.get_db),
+    id: int,
+    banco_in: BancoUpdate,
+    current_user: Principal = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Atualizar banco.
+    """
+    banco = crud.banco.get(db=db, id=id)
+    if not banco:
+        raise HTTPException(status_code=404, detail="Banco não encontrado")
+    
+    return crud.banco.update(db=db, db_obj=banco, obj_in=banco_in)
+
+@router.get("/{id}", response_model=Banco)
+def read_banco(
+    *,
+    db: Session = Depends(deps.get_db),
+    id: int,
+    current_user: Principal = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Obter banco pelo ID.
+    """
+    banco = crud.banco.get(db=db, id=id)
+    if not banco:
+        raise HTTPException(status_code=404, detail="Banco não encontrado")
+    return banco
+
+@router.delete("/{id}")
+def delete_banco(
+    *,
+    db: Session = Depends(deps.get_db),
+    id: int,
+    current_user: Principal = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Excluir banco.
+    """
+    banco = crud.banco.get(db=db, id=id)
+    if not banco:
+        raise HTTPException(status_code=404, detail="Banco não encontrado")
+    
+    crud.banco.remove(db=db, id=id)
+    return {"message": "Banco excluído com sucesso"}
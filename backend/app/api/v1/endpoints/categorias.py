@@ -1,44 +1,69 @@
-from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Any, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app import crud, models, schemas
+from app import crud, schemas
 from app.api import deps
+from app.core import cache_respostas
+from app.core.principal import Principal
 
 router = APIRouter()
 
 @router.get("/", response_model=List[schemas.Categoria])
-def read_categorias(
-    db: Session = Depends(deps.get_db),
+async def read_categorias(
+    response: Response,
+    db: AsyncSession = Depends(deps.get_async_db),
     skip: int = 0,
     limit: int = 100,
-    current_user: models.User = Depends(deps.get_current_active_user),
+    cursor: Optional[str] = None,
+    current_user: Principal = Depends(deps.get_current_active_user_async),
 ) -> Any:
     """
     Recuperar categorias.
+    Com `cursor` (vazio na primeira página) a paginação é por chave e o
+    cursor da próxima página é retornado no header X-Next-Cursor.
     """
-    categorias = crud.crud_categoria.get_multi(db, skip=skip, limit=limit)
+    if cursor is not None:
+        categorias, next_cursor = await crud.crud_categoria_async.get_multi_keyset(db, cursor=cursor, limit=limit)
+        deps.set_next_cursor(response, next_cursor)
+        return categorias
+    categorias = await crud.crud_categoria_async.get_multi(db, skip=skip, limit=limit)
     return categorias
 
 @router.get("/ativas", response_model=List[schemas.Categoria])
-def read_categorias_ativas(
-    db: Session = Depends(deps.get_db),
+async def read_categorias_ativas(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(deps.get_async_db),
     skip: int = 0,
     limit: int = 100,
-    current_user: models.User = Depends(deps.get_current_active_user),
+    cursor: Optional[str] = None,
+    current_user: Principal = Depends(deps.get_current_active_user_async),
 ) -> Any:
     """
     Recuperar apenas categorias ativas.
+    Com `cursor` (vazio na primeira página) a paginação é por chave e o
+    cursor da próxima página é retornado no header X-Next-Cursor. Sem
+    cursor a lista vem do cache de respostas, com ETag.
     """
-    categorias = crud.crud_categoria.get_ativas(db, skip=skip, limit=limit)
-    return categorias
+    if cursor is not None:
+        categorias, next_cursor = await crud.crud_categoria_async.get_ativas_keyset(db, cursor=cursor, limit=limit)
+        deps.set_next_cursor(response, next_cursor)
+        return categorias
+    return await cache_respostas.responder_async(
+        request,
+        cache_respostas.CATEGORIAS,
+        lambda: crud.crud_categoria_async.get_ativas(db, skip=skip, limit=limit),
+        List[schemas.Categoria],
+    )
 
 @router.post("/", response_model=schemas.Categoria)
 def create_categoria(
     *,
     db: Session = Depends(deps.get_db),
     categoria_in: schemas.CategoriaCreate,
-    current_user: models.User = Depends(deps.get_current_active_user),
+    current_user: Principal = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Criar nova categoria.
@@ -52,7 +77,7 @@ def update_categoria(
     db: Session = Depends(deps.get_db),
     id: int,
     categoria_in: schemas.CategoriaUpdate,
-    current_user: models.User = Depends(deps.get_current_active_user),
+    current_user: Principal = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Atualizar categoria.
@@ -67,16 +92,16 @@ def update_categoria(
     return categoria
 
 @router.get("/{id}", response_model=schemas.Categoria)
-def read_categoria(
+async def read_categoria(
     *,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
     id: int,
-    current_user: models.User = Depends(deps.get_current_active_user),
+    current_user: Principal = Depends(deps.get_current_active_user_async),
 ) -> Any:
     """
     Obter categoria por ID.
     """
-    categoria = crud.crud_categoria.get(db=db, id=id)
+    categoria = await crud.crud_categoria_async.get(db=db, id=id)
     if not categoria:
         raise HTTPException(status_code=404, detail="Categoria não encontrada")
     return categoria
@@ -86,7 +111,7 @@ def delete_categoria(
     *,
     db: Session = Depends(deps.get_db),
     id: int,
-    current_user: models.User = Depends(deps.get_current_active_user),
+    current_user: Principal = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Deletar categoria.
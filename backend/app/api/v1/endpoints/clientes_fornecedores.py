@@ -1,57 +1,118 @@
-from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Any, List, Optional, Tuple
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
 
-from app import crud, models, schemas
+from app import crud, schemas
 from app.api import deps
+from app.core.principal import Principal
+from app.core.serializacao import RespostaJSON
+from app.db.projecao import ler_campos, serializar_campos
 
 router = APIRouter()
 
+def _responder(
+    response: Response, itens: List[Any], campos: Optional[Tuple[str, ...]], next_cursor: Optional[str] = None
+) -> Any:
+    # Com `fields` a lista sai pelo schema reduzido, fora do response_model da rota
+    if campos is None:
+        deps.set_next_cursor(response, next_cursor)
+        return itens
+    resposta = RespostaJSON(serializar_campos(itens, schemas.ClienteFornecedor, campos))
+    deps.set_next_cursor(resposta, next_cursor)
+    return resposta
+
 @router.get("/", response_model=List[schemas.ClienteFornecedor])
 def read_clientes_fornecedores(
+    response: Response,
     db: Session = Depends(deps.get_db),
     skip: int = 0,
     limit: int = 100,
-    current_user: models.User = Depends(deps.get_current_active_user),
+    cursor: Optional[str] = None,
+    search: Optional[str] = None,
+    fields: Optional[str] = None,
+    current_user: Principal = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Recuperar clientes e fornecedores.
+    Com `cursor` (vazio na primeira página) a paginação é por chave e o
+    cursor da próxima página é retornado no header X-Next-Cursor.
+    `search` filtra por nome, nome fantasia, CPF/CNPJ e email, ordenando
+    por relevância na paginação por offset.
+    `fields` (ex.: id,nome,cpf_cnpj) restringe as colunas lidas e retornadas.
     """
-    clientes_fornecedores = crud.crud_cliente_fornecedor.get_multi(db, skip=skip, limit=limit)
-    return clientes_fornecedores
+    campos = ler_campos(fields, schemas.ClienteFornecedor)
+    if cursor is not None:
+        clientes_fornecedores, next_cursor = crud.crud_cliente_fornecedor.get_multi_with_search_keyset(
+            db, cursor=cursor, limit=limit, search=search, campos=campos
+        )
+        return _responder(response, clientes_fornecedores, campos, next_cursor)
+    clientes_fornecedores = crud.crud_cliente_fornecedor.get_multi_with_search(
+        db, skip=skip, limit=limit, search=search, campos=campos
+    )
+    return _responder(response, clientes_fornecedores, campos)
 
 @router.get("/clientes", response_model=List[schemas.ClienteFornecedor])
 def read_clientes(
+    response: Response,
     db: Session = Depends(deps.get_db),
     skip: int = 0,
     limit: int = 100,
-    current_user: models.User = Depends(deps.get_current_active_user),
+    cursor: Optional[str] = None,
+    search: Optional[str] = None,
+    fields: Optional[str] = None,
+    current_user: Principal = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Recuperar apenas clientes.
+    Com `cursor` (vazio na primeira página) a paginação é por chave e o
+    cursor da próxima página é retornado no header X-Next-Cursor.
+    `search` filtra por nome, nome fantasia, CPF/CNPJ e email, ordenando
+    por relevância na paginação por offset.
+    `fields` (ex.: id,nome,cpf_cnpj) restringe as colunas lidas e retornadas.
     """
-    clientes = crud.crud_cliente_fornecedor.get_clientes(db, skip=skip, limit=limit)
-    return clientes
+    campos = ler_campos(fields, schemas.ClienteFornecedor)
+    if cursor is not None:
+        clientes, next_cursor = crud.crud_cliente_fornecedor.get_clientes_keyset(
+            db, cursor=cursor, limit=limit, search=search, campos=campos
+        )
+        return _responder(response, clientes, campos, next_cursor)
+    clientes = crud.crud_cliente_fornecedor.get_clientes(db, skip=skip, limit=limit, search=search, campos=campos)
+    return _responder(response, clientes, campos)
 
 @router.get("/fornecedores", response_model=List[schemas.ClienteFornecedor])
 def read_fornecedores(
+    response: Response,
     db: Session = Depends(deps.get_db),
     skip: int = 0,
     limit: int = 100,
-    current_user: models.User = Depends(deps.get_current_active_user),
+    cursor: Optional[str] = None,
+    search: Optional[str] = None,
+    fields: Optional[str] = None,
+    current_user: Principal = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Recuperar apenas fornecedores.
+    Com `cursor` (vazio na primeira página) a paginação é por chave e o
+    cursor da próxima página é retornado no header X-Next-Cursor.
+    `search` filtra por nome, nome fantasia, CPF/CNPJ e email, ordenando
+    por relevância na paginação por offset.
+    `fields` (ex.: id,nome,cpf_cnpj) restringe as colunas lidas e retornadas.
     """
-    fornecedores = crud.crud_cliente_fornecedor.get_fornecedores(db, skip=skip, limit=limit)
-    return fornecedores
+    campos = ler_campos(fields, schemas.ClienteFornecedor)
+    if cursor is not None:
+        fornecedores, next_cursor = crud.crud_cliente_fornecedor.get_fornecedores_keyset(
+            db, cursor=cursor, limit=limit, search=search, campos=campos
+        )
+        return _responder(response, fornecedores, campos, next_cursor)
+    fornecedores = crud.crud_cliente_fornecedor.get_fornecedores(db, skip=skip, limit=limit, search=search, campos=campos)
+    return _responder(response, fornecedores, campos)
 
 @router.post("/", response_model=schemas.ClienteFornecedor)
 def create_cliente_fornecedor(
     *,
     db: Session = Depends(deps.get_db),
     cliente_fornecedor_in: schemas.ClienteFornecedorCreate,
-    current_user: models.User = Depends(deps.get_current_active_user),
+    current_user: Principal = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Criar novo cliente/fornecedor.
@@ -73,7 +134,7 @@ def update_cliente_fornecedor(
     db: Session = Depends(deps.get_db),
     id: int,
     cliente_fornecedor_in: schemas.ClienteFornecedorUpdate,
-    current_user: models.User = Depends(deps.get_current_active_user),
+    current_user: Principal = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Atualizar cliente/fornecedor.
@@ -101,7 +162,7 @@ def read_cliente_fornecedor(
     *,
     db: Session = Depends(deps.get_db),
     id: int,
-    current_user: models.User = Depends(deps.get_current_active_user),
+    current_user: Principal = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Obter cliente/fornecedor por ID.
@@ -116,7 +177,7 @@ def delete_cliente_fornecedor(
     *,
     db: Session = Depends(deps.get_db),
     id: int,
-    current_user: models.User = Depends(deps.get_current_active_user),
+    current_user: Principal = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Deletar cliente/fornecedor.
@@ -135,7 +196,7 @@ def create_contato(
     db: Session = Depends(deps.get_db),
     id: int,
     contato_in: schemas.ContatoClienteFornecedorCreate,
-    current_user: models.User = Depends(deps.get_current_active_user),
+    current_user: Principal = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Adicionar contato ao cliente/fornecedor.
@@ -153,7 +214,7 @@ def read_contatos(
     *,
     db: Session = Depends(deps.get_db),
     id: int,
-    current_user: models.User = Depends(deps.get_current_active_user),
+    current_user: Principal = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Obter contatos do cliente/fornecedor.
@@ -170,7 +231,7 @@ def create_anexo(
     db: Session = Depends(deps.get_db),
     id: int,
     anexo_in: schemas.AnexoClienteFornecedorCreate,
-    current_user: models.User = Depends(deps.get_current_active_user),
+    current_user: Principal = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Adicionar anexo ao cliente/fornecedor.
@@ -188,7 +249,7 @@ def read_anexos(
     *,
     db: Session = Depends(deps.get_db),
     id: int,
-    current_user: models.User = Depends(deps.get_current_active_user),
+    current_user: Principal = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Obter anexos do cliente/fornecedor.
@@ -1,44 +1,70 @@
-from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Any, List, Optional
+from datetime import date
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app import crud, models, schemas
+from app import crud, schemas
 from app.api import deps
+from app.core import cache_respostas
+from app.core.principal import Principal
 
 router = APIRouter()
 
 @router.get("/", response_model=List[schemas.ContaCorrente])
-def read_contas_corrente(
-    db: Session = Depends(deps.get_db),
+async def read_contas_corrente(
+    response: Response,
+    db: AsyncSession = Depends(deps.get_async_db),
     skip: int = 0,
     limit: int = 100,
-    current_user: models.User = Depends(deps.get_current_active_user),
+    cursor: Optional[str] = None,
+    current_user: Principal = Depends(deps.get_current_active_user_async),
 ) -> Any:
     """
     Recuperar contas corrente.
+    Com `cursor` (vazio na primeira página) a paginação é por chave e o
+    cursor da próxima página é retornado no header X-Next-Cursor.
     """
-    contas = crud.crud_conta_corrente.get_multi(db, skip=skip, limit=limit)
+    if cursor is not None:
+        contas, next_cursor = await crud.crud_conta_corrente_async.get_multi_keyset(db, cursor=cursor, limit=limit)
+        deps.set_next_cursor(response, next_cursor)
+        return contas
+    contas = await crud.crud_conta_corrente_async.get_multi(db, skip=skip, limit=limit)
     return contas
 
 @router.get("/ativas", response_model=List[schemas.ContaCorrente])
-def read_contas_corrente_ativas(
-    db: Session = Depends(deps.get_db),
+async def read_contas_corrente_ativas(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(deps.get_async_db),
     skip: int = 0,
     limit: int = 100,
-    current_user: models.User = Depends(deps.get_current_active_user),
+    cursor: Optional[str] = None,
+    current_user: Principal = Depends(deps.get_current_active_user_async),
 ) -> Any:
     """
     Recuperar apenas contas corrente ativas.
+    Com `cursor` (vazio na primeira página) a paginação é por chave e o
+    cursor da próxima página é retornado no header X-Next-Cursor. Sem
+    cursor a lista vem do cache de respostas, com ETag.
     """
-    contas = crud.crud_conta_corrente.get_ativas(db, skip=skip, limit=limit)
-    return contas
+    if cursor is not None:
+        contas, next_cursor = await crud.crud_conta_corrente_async.get_ativas_keyset(db, cursor=cursor, limit=limit)
+        deps.set_next_cursor(response, next_cursor)
+        return contas
+    return await cache_respostas.responder_async(
+        request,
+        cache_respostas.CONTAS_CORRENTE,
+        lambda: crud.crud_conta_corrente_async.get_ativas(db, skip=skip, limit=limit),
+        List[schemas.ContaCorrente],
+    )
 
 @router.post("/", response_model=schemas.ContaCorrente)
 def create_conta_corrente(
     *,
     db: Session = Depends(deps.get_db),
     conta_in: schemas.ContaCorrenteCreate,
-    current_user: models.User = Depends(deps.get_current_active_user),
+    current_user: Principal = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Criar nova conta corrente.
@@ -52,7 +78,7 @@ def update_conta_corrente(
     db: Session = Depends(deps.get_db),
     id: int,
     conta_in: schemas.ContaCorrenteUpdate,
-    current_user: models.User = Depends(deps.get_current_active_user),
+    current_user: Principal = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Atualizar conta corrente.
@@ -67,26 +93,46 @@ def update_conta_corrente(
     return conta
 
 @router.get("/{id}", response_model=schemas.ContaCorrente)
-def read_conta_corrente(
+async def read_conta_corrente(
     *,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
     id: int,
-    current_user: models.User = Depends(deps.get_current_active_user),
+    current_user: Principal = Depends(deps.get_current_active_user_async),
 ) -> Any:
     """
     Obter conta corrente por ID.
     """
-    conta = crud.crud_conta_corrente.get(db=db, id=id)
+    conta = await crud.crud_conta_corrente_async.get(db=db, id=id)
     if not conta:
         raise HTTPException(status_code=404, detail="Conta corrente não encontrada")
     return conta
 
+@router.get("/{id}/saldo", response_model=schemas.SaldoContaCorrente)
+def read_saldo_conta_corrente(
+    *,
+    db: Session = Depends(deps.get_db),
+    id: int,
+    data: Optional[date] = None,
+    current_user: Principal = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Obter o saldo da conta corrente ao fim do dia `data` (padrão: saldo atual).
+    """
+    conta = crud.crud_conta_corrente.get(db=db, id=id)
+    if not conta:
+        raise HTTPException(status_code=404, detail="Conta corrente não encontrada")
+    
+    if data is None:
+        return {"conta_corrente_id": conta.id, "data": None, "saldo": conta.saldo_atual or 0}
+    saldo = crud.crud_conta_corrente.get_saldo_em(db, db_obj=conta, data=data)
+    return {"conta_corrente_id": conta.id, "data": data, "saldo": saldo}
+
 @router.delete("/{id}", response_model=schemas.ContaCorrente)
 def delete_conta_corrente(
     *,
     db: Session = Depends(deps.get_db),
     id: int,
-    current_user: models.User = Depends(deps.get_current_active_user),
+    current_user: Principal = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Deletar conta corrente.
@@ -1,23 +1,36 @@
-from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Any, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app import crud, models, schemas
+from app import crud, schemas
 from app.api import deps
+from app.core.principal import Principal
 
 router = APIRouter()
 
 @router.get("/", response_model=List[schemas.ContaPagar])
-def read_contas_pagar(
-    db: Session = Depends(deps.get_db),
+async def read_contas_pagar(
+    response: Response,
+    db: AsyncSession = Depends(deps.get_async_db),
     skip: int = 0,
     limit: int = 100,
-    current_user: models.User = Depends(deps.get_current_active_user),
+    cursor: Optional[str] = None,
+    current_user: Principal = Depends(deps.get_current_active_user_async),
 ) -> Any:
     """
     Recuperar contas a pagar do usuário.
+    Com `cursor` (vazio na primeira página) a paginação é por chave, ordenada
+    por (data_vencimento, id), e o cursor da próxima página é retornado no
+    header X-Next-Cursor.
     """
-    contas = crud.crud_conta_pagar.get_multi_by_user(
+    if cursor is not None:
+        contas, next_cursor = await crud.crud_conta_pagar_async.get_multi_by_user_keyset(
+            db=db, user_id=current_user.id, cursor=cursor, limit=limit
+        )
+        deps.set_next_cursor(response, next_cursor)
+        return contas
+    contas = await crud.crud_conta_pagar_async.get_multi_by_user(
         db=db, user_id=current_user.id, skip=skip, limit=limit
     )
     return contas
@@ -27,7 +40,7 @@ def create_conta_pagar(
     *,
     db: Session = Depends(deps.get_db),
     conta_in: schemas.ContaPagarCreate,
-    current_user: models.User = Depends(deps.get_current_active_user),
+    current_user: Principal = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Criar nova conta a pagar.
@@ -63,7 +76,7 @@ def update_conta_pagar(
     db: Session = Depends(deps.get_db),
     id: int,
     conta_in: schemas.ContaPagarUpdate,
-    current_user: models.User = Depends(deps.get_current_active_user),
+    current_user: Principal = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Atualizar conta a pagar.
@@ -98,16 +111,16 @@ def update_conta_pagar(
     return conta
 
 @router.get("/{id}", response_model=schemas.ContaPagar)
-def read_conta_pagar(
+async def read_conta_pagar(
     *,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
     id: int,
-    current_user: models.User = Depends(deps.get_current_active_user),
+    current_user: Principal = Depends(deps.get_current_active_user_async),
 ) -> Any:
     """
     Obter conta a pagar por ID.
     """
-    conta = crud.crud_conta_pagar.get(db=db, id=id)
+    conta = await crud.crud_conta_pagar_async.get(db=db, id=id)
     if not conta:
         raise HTTPException(status_code=404, detail="Conta não encontrada")
     if conta.user_id != current_user.id and not current_user.is_superuser:
@@ -119,7 +132,7 @@ def delete_conta_pagar(
     *,
     db: Session = Depends(deps.get_db),
     id: int,
-    current_user: models.User = Depends(deps.get_current_active_user),
+    current_user: Principal = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Deletar conta a pagar.
@@ -143,20 +156,20 @@ def delete_conta_pagar(
 
 # Endpoint para obter pagamentos de uma conta a pagar
 @router.get("/{id}/pagamentos", response_model=List[schemas.Pagamento])
-def read_pagamentos_conta_pagar(
+async def read_pagamentos_conta_pagar(
     *,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
     id: int,
-    current_user: models.User = Depends(deps.get_current_active_user),
+    current_user: Principal = Depends(deps.get_current_active_user_async),
 ) -> Any:
     """
     Obter pagamentos de uma conta a pagar.
     """
-    conta = crud.crud_conta_pagar.get(db=db, id=id)
+    conta = await crud.crud_conta_pagar_async.get(db=db, id=id)
     if not conta:
         raise HTTPException(status_code=404, detail="Conta não encontrada")
     if conta.user_id != current_user.id and not current_user.is_superuser:
         raise HTTPException(status_code=403, detail="Sem permissão")
     
-    pagamentos = crud.crud_pagamento.get_by_conta_pagar(db=db, conta_pagar_id=id)
-    return pagamentos
+    # Carregados junto com a conta
+    return conta.pagamentos
@@ -1,11 +1,17 @@
 from typing import Any, List, Optional
 import httpx
-import asyncio
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
-from app import crud, models, schemas
+from app import crud, schemas
 from app.api import deps
+from app.core.principal import Principal
+from app.core.serializacao import RespostaJSON
+from app.jobs import fila
+from app.jobs.tarefas import IMPORTAR_EMPRESAS_OMIE
+from app.services.omie import OmieClient, OmieErro
+from app.db.pagination import ModoContagem, paginated_response
+from app.db.projecao import ler_campos
 from app.schemas.empresa import (
     Empresa, EmpresaCreate, EmpresaUpdate, EmpresaOmieImport, EmpresaImportResponse
 )
@@ -17,34 +23,44 @@ def read_empresas(
     db: Session = Depends(deps.get_db),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
+    count: ModoContagem = ModoContagem.EXACT,
     search: Optional[str] = None,
     ativo_apenas: bool = False,
-    current_user: models.User = Depends(deps.get_current_active_user),
+    fields: Optional[str] = None,
+    current_user: Principal = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Retrieve empresas with pagination and search.
-    """
-    empresas = crud.empresa.get_multi_with_search(
-        db, skip=skip, limit=limit, search=search, ativo_apenas=ativo_apenas
-    )
-    total = crud.empresa.count_with_search(
-        db, search=search, ativo_apenas=ativo_apenas
+    Pass `cursor` (empty for the first page) to page by key instead of offset;
+    the next page cursor is returned as `next_cursor`.
+    `count` selects how `total` is computed: exact, estimated (planner
+    statistics, for very large tables) or none.
+    Rows are projected straight into dicts with the Empresa columns and
+    returned as-is, skipping ORM hydration and schema validation.
+    `fields` (e.g. id,razao_social,cnpj) selects only those columns.
+    """
+    pagina = crud.empresa.get_page_with_search(
+        db, skip=skip, limit=limit, cursor=cursor, count=count,
+        search=search, ativo_apenas=ativo_apenas, projecao=Empresa,
+        campos=ler_campos(fields, Empresa)
     )
     
-    return {
-        "items": empresas,
-        "total": total,
-        "page": (skip // limit) + 1,
-        "limit": limit,
-        "totalPages": (total + limit - 1) // limit
-    }
+    return RespostaJSON(paginated_response(
+        pagina.items,
+        pagina.total,
+        skip=skip,
+        limit=limit,
+        cursor=cursor,
+        next_cursor=pagina.next_cursor
+    ))
 
 @router.post("/", response_model=Empresa)
 def create_empresa(
     *,
     db: Session = Depends(deps.get_db),
     empresa_in: EmpresaCreate,
-    current_user: models.User = Depends(deps.get_current_active_user),
+    current_user: Principal = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Create new empresa.
@@ -78,7 +94,7 @@ def update_empresa(
     db: Session = Depends(deps.get_db),
     id: int,
     empresa_in: EmpresaUpdate,
-    current_user: models.User = Depends(deps.get_current_active_user),
+    current_user: Principal = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Update an empresa.
@@ -116,7 +132,7 @@ def read_empresa(
     *,
     db: Session = Depends(deps.get_db),
     id: int,
-    current_user: models.User = Depends(deps.get_current_active_user),
+    current_user: Principal = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Get empresa by ID.
@@ -131,7 +147,7 @@ def delete_empresa(
     *,
     db: Session = Depends(deps.get_db),
     id: int,
-    current_user: models.User = Depends(deps.get_current_active_user),
+    current_user: Principal = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Delete an empresa.
@@ -148,57 +164,23 @@ async def import_empresas_omie(
     *,
     db: Session = Depends(deps.get_db),
     empresas_data: List[EmpresaOmieImport],
-    current_user: models.User = Depends(deps.get_current_active_user),
+    current_user: Principal = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Import empresas from Omie API data.
+    Rows are upserted in batches in a single transaction; rows that fail
+    are reported in `erros` without aborting the rest.
     """
-    total_importadas = 0
-    total_atualizadas = 0
-    total_erros = 0
-    empresas_importadas = []
-    empresas_atualizadas = []
-    erros = []
-    
-    for empresa_data in empresas_data:
-        try:
-            # Verificar se empresa já existe pelo código Omie
-            existing_empresa = crud.empresa.get_by_codigo_omie(
-                db, codigo_cliente_omie=empresa_data.codigo_cliente_omie
-            )
-            
-            if existing_empresa:
-                # Atualizar empresa existente
-                updated_empresa = crud.empresa.update_from_omie(
-                    db, db_obj=existing_empresa, obj_in=empresa_data
-                )
-                total_atualizadas += 1
-                empresas_atualizadas.append(f"{updated_empresa.razao_social} (ID: {updated_empresa.id})")
-            else:
-                # Verificar se já existe empresa com mesmo CNPJ
-                if empresa_data.cnpj:
-                    existing_cnpj = crud.empresa.get_by_cnpj(db, cnpj=empresa_data.cnpj)
-                    if existing_cnpj:
-                        erros.append(f"CNPJ {empresa_data.cnpj} já existe no sistema (Empresa: {existing_cnpj.razao_social})")
-                        total_erros += 1
-                        continue
-                
-                # Criar nova empresa
-                new_empresa = crud.empresa.create_from_omie(db, obj_in=empresa_data)
-                total_importadas += 1
-                empresas_importadas.append(f"{new_empresa.razao_social} (ID: {new_empresa.id})")
-                
-        except Exception as e:
-            total_erros += 1
-            erros.append(f"Erro ao processar empresa {empresa_data.razao_social}: {str(e)}")
+    resultado = crud.empresa.bulk_upsert_from_omie(db, objs_in=empresas_data)
     
     return EmpresaImportResponse(
-        total_importadas=total_importadas,
-        total_atualizadas=total_atualizadas,
-        total_erros=total_erros,
-        empresas_importadas=empresas_importadas,
-        empresas_atualizadas=empresas_atualizadas,
-        erros=erros
+        total_importadas=len(resultado.inseridas),
+        total_atualizadas=len(resultado.atualizadas),
+        total_sem_alteracao=len(resultado.inalteradas),
+        total_erros=len(resultado.erros),
+        empresas_importadas=[f"{razao_social} (ID: {id})" for id, razao_social in resultado.inseridas],
+        empresas_atualizadas=[f"{razao_social} (ID: {id})" for id, razao_social in resultado.atualizadas],
+        erros=resultado.erros
     )
 
 @router.get("/omie/listar", response_model=dict)
@@ -208,42 +190,21 @@ async def listar_empresas_omie(
     app_secret: str,
     pagina: int = 1,
     registros_por_pagina: int = 50,
-    current_user: models.User = Depends(deps.get_current_active_user),
+    current_user: Principal = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     List empresas from Omie API.
     Requires app_key and app_secret from Omie.
     """
-    url = "https://app.omie.com.br/api/v1/geral/empresas/"
-    
-    payload = {
-        "call": "ListarEmpresas",
-        "app_key": app_key,
-        "app_secret": app_secret,
-        "param": [
-            {
-                "pagina": pagina,
-                "registros_por_pagina": registros_por_pagina,
-                "apenas_importado_api": "N"
-            }
-        ]
-    }
+    client = OmieClient(app_key, app_secret)
     
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(url, json=payload, timeout=30.0)
-            response.raise_for_status()
-            
-            data = response.json()
-            
-            if "faultstring" in data:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Erro da API Omie: {data['faultstring']}"
-                )
-            
-            return data
-            
+        return await client.listar_empresas_pagina(pagina, registros_por_pagina)
+    except OmieErro as e:
+        raise HTTPException(
+            status_code=400,
+            detail=str(e)
+        )
     except httpx.HTTPError as e:
         raise HTTPException(
             status_code=500,
@@ -256,78 +217,27 @@ async def listar_empresas_omie(
         )
 
 @router.post("/omie/importar-automatico")
-async def importar_empresas_omie_automatico(
+def importar_empresas_omie_automatico(
     *,
     db: Session = Depends(deps.get_db),
     app_key: str,
     app_secret: str,
-    background_tasks: BackgroundTasks,
-    current_user: models.User = Depends(deps.get_current_active_user),
+    current_user: Principal = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Import all empresas from Omie API automatically.
-    This runs in background to avoid timeout.
-    """
-    
-    async def import_task():
-        try:
-            # Buscar todas as empresas da API Omie
-            url = "https://app.omie.com.br/api/v1/geral/empresas/"
-            pagina = 1
-            registros_por_pagina = 50
-            todas_empresas = []
-            
-            while True:
-                payload = {
-                    "call": "ListarEmpresas",
-                    "app_key": app_key,
-                    "app_secret": app_secret,
-                    "param": [
-                        {
-                            "pagina": pagina,
-                            "registros_por_pagina": registros_por_pagina,
-                            "apenas_importado_api": "N"
-                        }
-                    ]
-                }
-                
-                async with httpx.AsyncClient() as client:
-                    response = await client.post(url, json=payload, timeout=30.0)
-                    response.raise_for_status()
-                    data = response.json()
-                    
-                    if "faultstring" in data:
-                        print(f"Erro da API Omie: {data['faultstring']}")
-                        break
-                    
-                    empresas = data.get("empresas_cadastro", [])
-                    if not empresas:
-                        break
-                    
-                    todas_empresas.extend(empresas)
-                    
-                    # Verificar se há mais páginas
-                    if len(empresas) < registros_por_pagina:
-                        break
-                    
-                    pagina += 1
-            
-            # Converter para formato de importação
-            empresas_import = []
-            for empresa in todas_empresas:
-                empresa_import = EmpresaOmieImport(**empresa)
-                empresas_import.append(empresa_import)
-            
-            # Importar empresas
-            # Aqui você precisaria chamar a função de importação
-            # Como estamos em background task, precisamos de uma nova sessão de DB
-            print(f"Importando {len(empresas_import)} empresas do Omie...")
-            
-        except Exception as e:
-            print(f"Erro na importação automática: {str(e)}")
-    
-    background_tasks.add_task(import_task)
+    The import runs as a background job outside the API workers; follow
+    its progress at GET /jobs/{job_id}.
+    """
+    job = fila.enfileirar(
+        db,
+        tipo=IMPORTAR_EMPRESAS_OMIE,
+        parametros={"app_key": app_key, "app_secret": app_secret, "registros_por_pagina": 50},
+        user_id=current_user.id
+    )
     
     return {
-        "message": "Importação iniciada em segundo plano. Verifique os logs para acompanhar o progresso."
+        "message": "Importação iniciada em segundo plano. Acompanhe o progresso pelo job.",
+        "job_id": job.id,
+        "status": job.status
     }
@@ -1,14 +1,20 @@
 from typing import Any, List, Optional, Dict
 import httpx
-import asyncio
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.orm import Session
 
-from app import crud, models, schemas
+from app import crud, schemas
 from app.api import deps
+from app.core import cache_respostas
+from app.core.principal import Principal
+from app.db.pagination import ModoContagem, paginated_response
+from app.jobs import fila
+from app.jobs.tarefas import IMPORTAR_EMPRESAS_OMIE
+from app.services.omie import OmieClient, OmieErro
+from app.services.omie_sync import MODO_COMPLETO, MODO_DELTA
 from app.schemas.integracao import (
     Integracao, IntegracaoCreate, IntegracaoUpdate, IntegracaoPublic, 
-    IntegracaoTeste, IntegracaoOmie, SincronizacaoRequest, SincronizacaoResponse
+    IntegracaoTeste, IntegracaoOmie, SincronizacaoRequest, SincronizacaoIniciada
 )
 
 router = APIRouter()
@@ -18,38 +24,43 @@ def read_integracoes(
     db: Session = Depends(deps.get_db),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
+    count: ModoContagem = ModoContagem.EXACT,
     search: Optional[str] = None,
     tipo: Optional[str] = None,
     ativo_apenas: bool = False,
-    current_user: models.User = Depends(deps.get_current_active_user),
+    current_user: Principal = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Retrieve integracoes with pagination and search.
+    Pass `cursor` (empty for the first page) to page by key instead of offset;
+    the next page cursor is returned as `next_cursor`.
+    `count` selects how `total` is computed: exact, estimated (planner
+    statistics, for very large tables) or none.
     """
-    integracoes = crud.integracao.get_multi_with_search(
-        db, skip=skip, limit=limit, search=search, tipo=tipo, ativo_apenas=ativo_apenas
-    )
-    total = crud.integracao.count_with_search(
-        db, search=search, tipo=tipo, ativo_apenas=ativo_apenas
+    pagina = crud.integracao.get_page_with_search(
+        db, skip=skip, limit=limit, cursor=cursor, count=count,
+        search=search, tipo=tipo, ativo_apenas=ativo_apenas
     )
     
     # Converter para formato público (sem dados sensíveis)
-    items_public = [IntegracaoPublic.from_orm(item) for item in integracoes]
+    items_public = [IntegracaoPublic.from_orm(item) for item in pagina.items]
     
-    return {
-        "items": items_public,
-        "total": total,
-        "page": (skip // limit) + 1,
-        "limit": limit,
-        "totalPages": (total + limit - 1) // limit
-    }
+    return paginated_response(
+        items_public,
+        pagina.total,
+        skip=skip,
+        limit=limit,
+        cursor=cursor,
+        next_cursor=pagina.next_cursor
+    )
 
 @router.post("/", response_model=IntegracaoPublic)
 def create_integracao(
     *,
     db: Session = Depends(deps.get_db),
     integracao_in: IntegracaoCreate,
-    current_user: models.User = Depends(deps.get_current_active_user),
+    current_user: Principal = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Create new integracao.
@@ -71,7 +82,7 @@ def update_integracao(
     db: Session = Depends(deps.get_db),
     id: int,
     integracao_in: IntegracaoUpdate,
-    current_user: models.User = Depends(deps.get_current_active_user),
+    current_user: Principal = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Update an integracao.
@@ -97,7 +108,7 @@ def read_integracao(
     *,
     db: Session = Depends(deps.get_db),
     id: int,
-    current_user: models.User = Depends(deps.get_current_active_user),
+    current_user: Principal = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Get integracao by ID (com dados completos para administradores).
@@ -117,7 +128,7 @@ def delete_integracao(
     *,
     db: Session = Depends(deps.get_db),
     id: int,
-    current_user: models.User = Depends(deps.get_current_active_user),
+    current_user: Principal = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Delete an integracao.
@@ -134,7 +145,7 @@ async def testar_integracao(
     *,
     db: Session = Depends(deps.get_db),
     id: int,
-    current_user: models.User = Depends(deps.get_current_active_user),
+    current_user: Principal = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Test integration connection.
@@ -172,7 +183,7 @@ def configurar_omie(
     db: Session = Depends(deps.get_db),
     app_key: str,
     app_secret: str,
-    current_user: models.User = Depends(deps.get_current_active_user),
+    current_user: Principal = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Configure Omie integration with provided API keys.
@@ -182,16 +193,19 @@ def configurar_omie(
     )
     return IntegracaoPublic.from_orm(integracao)
 
-@router.post("/sincronizar", response_model=SincronizacaoResponse)
-async def sincronizar_dados(
+@router.post("/sincronizar", response_model=SincronizacaoIniciada)
+def sincronizar_dados(
     *,
     db: Session = Depends(deps.get_db),
     request: SincronizacaoRequest,
-    background_tasks: BackgroundTasks,
-    current_user: models.User = Depends(deps.get_current_active_user),
+    current_user: Principal = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Synchronize data from external system.
+    The synchronization runs as a background job outside the API workers;
+    follow its progress at GET /jobs/{job_id}.
+    parametros["modo"]: "delta" (padrão, só alterações desde a última
+    sincronização) ou "completo".
     """
     integracao = crud.integracao.get(db=db, id=request.integracao_id)
     if not integracao:
@@ -203,100 +217,102 @@ async def sincronizar_dados(
     if not integracao.testado:
         raise HTTPException(status_code=400, detail="Integração não foi testada com sucesso")
     
-    try:
-        if integracao.nome.lower() == "omie" and request.tipo_dados == "empresas":
-            # Sincronizar empresas do Omie
-            resultado = await sincronizar_empresas_omie(db, integracao, request.parametros or {})
-        else:
-            raise HTTPException(
-                status_code=400, 
-                detail=f"Sincronização de {request.tipo_dados} não implementada para {integracao.nome}"
-            )
-        
-        # Atualizar timestamp da última sincronização
-        crud.integracao.atualizar_ultima_sincronizacao(db, db_obj=integracao)
-        
-        return resultado
-        
-    except Exception as e:
-        return SincronizacaoResponse(
-            sucesso=False,
-            total_processados=0,
-            total_importados=0,
-            total_atualizados=0,
-            total_erros=1,
-            mensagens=[f"Erro na sincronização: {str(e)}"],
-            detalhes={"erro": str(e)}
+    if integracao.nome.lower() != "omie" or request.tipo_dados != "empresas":
+        raise HTTPException(
+            status_code=400, 
+            detail=f"Sincronização de {request.tipo_dados} não implementada para {integracao.nome}"
         )
+    
+    parametros = request.parametros or {}
+    modo = parametros.get("modo", MODO_DELTA)
+    if modo not in (MODO_DELTA, MODO_COMPLETO):
+        raise HTTPException(status_code=400, detail=f"Modo de sincronização inválido: {modo}")
+    
+    job = fila.enfileirar(
+        db,
+        tipo=IMPORTAR_EMPRESAS_OMIE,
+        parametros={
+            "integracao_id": integracao.id,
+            "modo": modo,
+            "registros_por_pagina": parametros.get("registros_por_pagina", 50)
+        },
+        user_id=current_user.id
+    )
+    
+    return {
+        "message": "Sincronização iniciada em segundo plano. Acompanhe o progresso pelo job.",
+        "job_id": job.id,
+        "status": job.status
+    }
+
+# Listas fixas servidas pelo cache de respostas (ETag/304)
+TIPOS_INTEGRACAO = {
+    "tipos": [
+        {"codigo": "ERP", "nome": "Sistema ERP", "descricao": "Sistemas de gestão empresarial"},
+        {"codigo": "CRM", "nome": "Sistema CRM", "descricao": "Sistemas de relacionamento com cliente"},
+        {"codigo": "Financeiro", "nome": "Sistema Financeiro", "descricao": "Sistemas de gestão financeira"},
+        {"codigo": "E-commerce", "nome": "E-commerce", "descricao": "Plataformas de comércio eletrônico"},
+        {"codigo": "Contabil", "nome": "Sistema Contábil", "descricao": "Sistemas de contabilidade"},
+    ]
+}
+
+TEMPLATE_OMIE = {
+    "nome": "Omie",
+    "tipo": "ERP",
+    "descricao": "Integração com sistema Omie ERP",
+    "base_url": "https://app.omie.com.br/api/v1/",
+    "campos_obrigatorios": ["app_key", "app_secret"],
+    "configuracoes_extras": {
+        "timeout": 30,
+        "max_retries": 3,
+        "registros_por_pagina": 50
+    },
+    "documentacao": "https://developer.omie.com.br/"
+}
 
 @router.get("/tipos/disponiveis")
 def get_tipos_integracoes(
-    current_user: models.User = Depends(deps.get_current_active_user),
+    request: Request,
+    current_user: Principal = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Get available integration types.
     """
-    return {
-        "tipos": [
-            {"codigo": "ERP", "nome": "Sistema ERP", "descricao": "Sistemas de gestão empresarial"},
-            {"codigo": "CRM", "nome": "Sistema CRM", "descricao": "Sistemas de relacionamento com cliente"},
-            {"codigo": "Financeiro", "nome": "Sistema Financeiro", "descricao": "Sistemas de gestão financeira"},
-            {"codigo": "E-commerce", "nome": "E-commerce", "descricao": "Plataformas de comércio eletrônico"},
-            {"codigo": "Contabil", "nome": "Sistema Contábil", "descricao": "Sistemas de contabilidade"},
-        ]
-    }
+    return cache_respostas.responder(
+        request, cache_respostas.INTEGRACOES_FIXAS, lambda: TIPOS_INTEGRACAO, dict
+    )
 
 @router.get("/templates/omie")
 def get_template_omie(
-    current_user: models.User = Depends(deps.get_current_active_user),
+    request: Request,
+    current_user: Principal = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Get Omie integration template.
     """
-    return {
-        "nome": "Omie",
-        "tipo": "ERP",
-        "descricao": "Integração com sistema Omie ERP",
-        "base_url": "https://app.omie.com.br/api/v1/",
-        "campos_obrigatorios": ["app_key", "app_secret"],
-        "configuracoes_extras": {
-            "timeout": 30,
-            "max_retries": 3,
-            "registros_por_pagina": 50
-        },
-        "documentacao": "https://developer.omie.com.br/"
-    }
+    return cache_respostas.responder(
+        request, cache_respostas.INTEGRACOES_FIXAS, lambda: TEMPLATE_OMIE, dict
+    )
 
 # Funções auxiliares
 async def testar_conexao_omie(integracao) -> Dict[str, Any]:
     """Testar conexão com API do Omie"""
-    url = f"{integracao.base_url}geral/empresas/"
+    client = OmieClient.from_integracao(integracao, timeout=10.0, max_retries=0)
     
-    payload = {
-        "call": "ListarEmpresas",
-        "app_key": integracao.app_key,
-        "app_secret": integracao.app_secret,
-        "param": [{"pagina": 1, "registros_por_pagina": 1}]
-    }
-    
-    async with httpx.AsyncClient() as client:
-        response = await client.post(url, json=payload, timeout=10.0)
-        response.raise_for_status()
-        
-        data = response.json()
-        
-        if "faultstring" in data:
-            return {
-                "sucesso": False,
-                "mensagem": f"Erro da API Omie: {data['faultstring']}",
-                "detalhes": data
-            }
-        
+    try:
+        data = await client.listar_empresas_pagina(pagina=1, registros_por_pagina=1)
+    except OmieErro as e:
         return {
-            "sucesso": True,
-            "mensagem": "Conexão com Omie estabelecida com sucesso",
-            "detalhes": {"total_empresas": data.get("total_de_registros", 0)}
+            "sucesso": False,
+            "mensagem": str(e),
+            "detalhes": {"faultstring": e.faultstring, "faultcode": e.faultcode}
         }
+    
+    return {
+        "sucesso": True,
+        "mensagem": "Conexão com Omie estabelecida com sucesso",
+        "detalhes": {"total_empresas": data.get("total_de_registros", 0)}
+    }
 
 async def testar_conexao_generica(integracao) -> Dict[str, Any]:
     """Teste genérico para outras integrações"""
@@ -323,84 +339,3 @@ async def testar_conexao_generica(integracao) -> Dict[str, Any]:
             "mensagem": f"Erro na conexão: {str(e)}",
             "detalhes": {"erro": str(e)}
         }
-
-async def sincronizar_empresas_omie(db: Session, integracao, parametros: Dict[str, Any]) -> SincronizacaoResponse:
-    """Sincronizar empresas do Omie"""
-    from app.schemas.empresa import EmpresaOmieImport
-    
-    url = f"{integracao.base_url}geral/empresas/"
-    pagina = 1
-    registros_por_pagina = parametros.get("registros_por_pagina", 50)
-    todas_empresas = []
-    
-    # Buscar todas as empresas
-    while True:
-        payload = {
-            "call": "ListarEmpresas",
-            "app_key": integracao.app_key,
-            "app_secret": integracao.app_secret,
-            "param": [{
-                "pagina": pagina,
-                "registros_por_pagina": registros_por_pagina,
-                "apenas_importado_api": "N"
-            }]
-        }
-        
-        async with httpx.AsyncClient() as client:
-            response = await client.post(url, json=payload, timeout=30.0)
-            response.raise_for_status()
-            data = response.json()
-            
-            if "faultstring" in data:
-                raise Exception(f"Erro da API Omie: {data['faultstring']}")
-            
-            empresas = data.get("empresas_cadastro", [])
-            if not empresas:
-                break
-            
-            todas_empresas.extend(empresas)
-            
-            if len(empresas) < registros_por_pagina:
-                break
-            
-            pagina += 1
-    
-    # Processar empresas
-    total_importadas = 0
-    total_atualizadas = 0
-    total_erros = 0
-    mensagens = []
-    
-    for empresa_data in todas_empresas:
-        try:
-            empresa_import = EmpresaOmieImport(**empresa_data)
-            
-            # Verificar se empresa já existe
-            existing_empresa = crud.empresa.get_by_codigo_omie(
-                db, codigo_cliente_omie=empresa_import.codigo_cliente_omie
-            )
-            
-            if existing_empresa:
-                crud.empresa.update_from_omie(db, db_obj=existing_empresa, obj_in=empresa_import)
-                total_atualizadas += 1
-            else:
-                crud.empresa.create_from_omie(db, obj_in=empresa_import)
-                total_importadas += 1
-                
-        except Exception as e:
-            total_erros += 1
-            mensagens.append(f"Erro ao processar empresa {empresa_data.get('razao_social', 'N/A')}: {str(e)}")
-    
-    return SincronizacaoResponse(
-        sucesso=total_erros == 0,
-        total_processados=len(todas_empresas),
-        total_importados=total_importadas,
-        total_atualizadas=total_atualizadas,
-        total_erros=total_erros,
-        mensagens=mensagens or ["Sincronização concluída com sucesso"],
-        detalhes={
-            "integracao": integracao.nome,
-            "tipo_dados": "empresas",
-            "paginas_processadas": pagina - 1
-        }
-    )
@@ -0,0 +1,97 @@
+from typing import Any, List, Optional
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+
+from app import crud, models, schemas
+from app.api import deps
+from app.core.principal import Principal
+from app.jobs import fila
+from app.jobs.runner import TAREFAS
+from app.models.job import STATUS_FINAIS
+from app.jobs import tarefas  # noqa: F401  (registra os handlers)
+
+router = APIRouter()
+
+def _get_job_do_usuario(db: Session, id: int, current_user: Principal) -> models.Job:
+    job = crud.crud_job.get(db, id=id)
+    if not job or (job.user_id != current_user.id and not current_user.is_superuser):
+        raise HTTPException(status_code=404, detail="Job não encontrado")
+    return job
+
+@router.get("/", response_model=List[schemas.Job])
+def read_jobs(
+    db: Session = Depends(deps.get_db),
+    skip: int = 0,
+    limit: int = 100,
+    status: Optional[str] = None,
+    current_user: Principal = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Listar jobs, mais recentes primeiro (superusuários veem os de todos).
+    """
+    user_id = None if current_user.is_superuser else current_user.id
+    return crud.crud_job.get_multi_by_user(db, user_id=user_id, status=status, skip=skip, limit=limit)
+
+@router.post("/", response_model=schemas.Job)
+def create_job(
+    *,
+    db: Session = Depends(deps.get_db),
+    job_in: schemas.JobCreate,
+    current_user: Principal = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Enfileirar um job. Tipos disponíveis em GET /jobs/tipos.
+    """
+    if job_in.tipo not in TAREFAS:
+        raise HTTPException(status_code=400, detail=f"Tipo de job desconhecido: {job_in.tipo}")
+    return fila.enfileirar(db, tipo=job_in.tipo, parametros=job_in.parametros, user_id=current_user.id)
+
+@router.get("/tipos")
+def read_tipos_jobs(
+    current_user: Principal = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Listar os tipos de job disponíveis.
+    """
+    return {"tipos": sorted(TAREFAS)}
+
+@router.get("/rotinas/execucoes", response_model=List[schemas.ExecucaoRotina])
+def read_execucoes_rotinas(
+    db: Session = Depends(deps.get_db),
+    rotina: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 100,
+    current_user: Principal = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Histórico das rotinas agendadas (ex.: marcar_vencidos), mais recentes
+    primeiro, com as linhas afetadas e a duração de cada execução.
+    """
+    return crud.crud_execucao_rotina.get_recentes(db, rotina=rotina, skip=skip, limit=limit)
+
+@router.get("/{id}", response_model=schemas.Job)
+def read_job(
+    *,
+    db: Session = Depends(deps.get_db),
+    id: int,
+    current_user: Principal = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Consultar status, progresso e resultado de um job.
+    """
+    return _get_job_do_usuario(db, id, current_user)
+
+@router.post("/{id}/cancelar", response_model=schemas.Job)
+def cancelar_job(
+    *,
+    db: Session = Depends(deps.get_db),
+    id: int,
+    current_user: Principal = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Cancelar um job. Se já estiver em execução, ele para após o lote atual.
+    """
+    job = _get_job_do_usuario(db, id, current_user)
+    if job.status in STATUS_FINAIS:
+        raise HTTPException(status_code=400, detail="Job já finalizado")
+    return fila.cancelar(db, job)
@@ -1,37 +1,46 @@
-from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Any, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from decimal import Decimal
 
-from app import crud, models, schemas
+from app import crud, schemas
 from app.api import deps
+from app.core.principal import Principal
 
 router = APIRouter()
 
 @router.get("/", response_model=List[schemas.Pagamento])
-def read_pagamentos(
-    db: Session = Depends(deps.get_db),
+async def read_pagamentos(
+    response: Response,
+    db: AsyncSession = Depends(deps.get_async_db),
     skip: int = 0,
     limit: int = 100,
-    current_user: models.User = Depends(deps.get_current_active_user),
+    cursor: Optional[str] = None,
+    current_user: Principal = Depends(deps.get_current_active_user_async),
 ) -> Any:
     """
     Recuperar pagamentos.
+    Com `cursor` (vazio na primeira página) a paginação é por chave e o
+    cursor da próxima página é retornado no header X-Next-Cursor.
     """
-    pagamentos = crud.crud_pagamento.get_multi(db, skip=skip, limit=limit)
+    if cursor is not None:
+        pagamentos, next_cursor = await crud.crud_pagamento_async.get_multi_keyset(db, cursor=cursor, limit=limit)
+        deps.set_next_cursor(response, next_cursor)
+        return pagamentos
+    pagamentos = await crud.crud_pagamento_async.get_multi(db, skip=skip, limit=limit)
     return pagamentos
 
 @router.get("/conta-pagar/{conta_pagar_id}", response_model=List[schemas.Pagamento])
-def read_pagamentos_by_conta_pagar(
+async def read_pagamentos_by_conta_pagar(
     *,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
     conta_pagar_id: int,
-    current_user: models.User = Depends(deps.get_current_active_user),
+    current_user: Principal = Depends(deps.get_current_active_user_async),
 ) -> Any:
     """
     Recuperar pagamentos de uma conta a pagar específica.
     """
-    pagamentos = crud.crud_pagamento.get_by_conta_pagar(db, conta_pagar_id=conta_pagar_id)
+    pagamentos = await crud.crud_pagamento_async.get_by_conta_pagar(db, conta_pagar_id=conta_pagar_id)
     return pagamentos
 
 @router.post("/", response_model=schemas.Pagamento)
@@ -39,13 +48,13 @@ def create_pagamento(
     *,
     db: Session = Depends(deps.get_db),
     pagamento_in: schemas.PagamentoCreate,
-    current_user: models.User = Depends(deps.get_current_active_user),
+    current_user: Principal = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Criar novo pagamento.
     """
-    # Verificar se a conta a pagar existe
-    conta_pagar = crud.crud_conta_pagar.get(db=db, id=pagamento_in.conta_pagar_id)
+    # Verificar se a conta a pagar existe, travando-a até o commit do pagamento
+    conta_pagar = crud.crud_conta_pagar.get_for_update(db=db, id=pagamento_in.conta_pagar_id)
     if not conta_pagar:
         raise HTTPException(status_code=404, detail="Conta a pagar não encontrada")
     
@@ -55,27 +64,11 @@ def create_pagamento(
         if not conta_corrente:
             raise HTTPException(status_code=404, detail="Conta corrente não encontrada")
     
-    # Criar o pagamento
+    # Criar o pagamento; valor pago e status da conta são recalculados na mesma transação
     pagamento = crud.crud_pagamento.create_with_user(
         db=db, obj_in=pagamento_in, user_id=current_user.id
     )
     
-    # Atualizar o valor pago na conta a pagar
-    total_pagamentos = sum([p.valor for p in crud.crud_pagamento.get_by_conta_pagar(db, conta_pagar_id=conta_pagar.id)])
-    
-    # Atualizar status da conta se totalmente paga
-    if total_pagamentos >= conta_pagar.valor_original:
-        conta_pagar_update = schemas.ContaPagarUpdate(
-            valor_pago=total_pagamentos,
-            status=schemas.StatusConta.PAGO
-        )
-    else:
-        conta_pagar_update = schemas.ContaPagarUpdate(
-            valor_pago=total_pagamentos
-        )
-    
-    crud.crud_conta_pagar.update(db=db, db_obj=conta_pagar, obj_in=conta_pagar_update)
-    
     return pagamento
 
 @router.put("/{id}", response_model=schemas.Pagamento)
@@ -84,7 +77,7 @@ def update_pagamento(
     db: Session = Depends(deps.get_db),
     id: int,
     pagamento_in: schemas.PagamentoUpdate,
-    current_user: models.User = Depends(deps.get_current_active_user),
+    current_user: Principal = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Atualizar pagamento.
@@ -99,41 +92,30 @@ def update_pagamento(
         if not conta_corrente:
             raise HTTPException(status_code=404, detail="Conta corrente não encontrada")
     
+    # Travar a conta a pagar (o valor pago é recalculado na mesma transação) e
+    # só então reler o pagamento: o estorno usa os valores já travados
+    crud.crud_conta_pagar.get_for_update(db=db, id=pagamento.conta_pagar_id)
+    pagamento = crud.crud_pagamento.get_for_update(db=db, id=id)
+    if not pagamento:
+        db.rollback()
+        raise HTTPException(status_code=404, detail="Pagamento não encontrado")
     pagamento = crud.crud_pagamento.update(
         db=db, db_obj=pagamento, obj_in=pagamento_in
     )
     
-    # Recalcular o valor pago na conta a pagar
-    conta_pagar = crud.crud_conta_pagar.get(db=db, id=pagamento.conta_pagar_id)
-    total_pagamentos = sum([p.valor for p in crud.crud_pagamento.get_by_conta_pagar(db, conta_pagar_id=conta_pagar.id)])
-    
-    # Atualizar status da conta se totalmente paga
-    if total_pagamentos >= conta_pagar.valor_original:
-        conta_pagar_update = schemas.ContaPagarUpdate(
-            valor_pago=total_pagamentos,
-            status=schemas.StatusConta.PAGO
-        )
-    else:
-        conta_pagar_update = schemas.ContaPagarUpdate(
-            valor_pago=total_pagamentos,
-            status=schemas.StatusConta.PENDENTE
-        )
-    
-    crud.crud_conta_pagar.update(db=db, db_obj=conta_pagar, obj_in=conta_pagar_update)
-    
     return pagamento
 
 @router.get("/{id}", response_model=schemas.Pagamento)
-def read_pagamento(
+async def read_pagamento(
     *,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
     id: int,
-    current_user: models.User = Depends(deps.get_current_active_user),
+    current_user: Principal = Depends(deps.get_current_active_user_async),
 ) -> Any:
     """
     Obter pagamento por ID.
     """
-    pagamento = crud.crud_pagamento.get(db=db, id=id)
+    pagamento = await crud.crud_pagamento_async.get(db=db, id=id)
     if not pagamento:
         raise HTTPException(status_code=404, detail="Pagamento não encontrado")
     return pagamento
@@ -143,7 +125,7 @@ def delete_pagamento(
     *,
     db: Session = Depends(deps.get_db),
     id: int,
-    current_user: models.User = Depends(deps.get_current_active_user),
+    current_user: Principal = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Deletar pagamento.
@@ -152,28 +134,12 @@ def delete_pagamento(
     if not pagamento:
         raise HTTPException(status_code=404, detail="Pagamento não encontrado")
     
-    conta_pagar_id = pagamento.conta_pagar_id
+    # Travar a conta a pagar: o valor pago é recalculado na mesma transação
+    crud.crud_conta_pagar.get_for_update(db=db, id=pagamento.conta_pagar_id)
     
-    # Deletar o pagamento
+    # Deletar o pagamento (relido com a linha travada; None se outra exclusão venceu)
     pagamento = crud.crud_pagamento.remove(db=db, id=id)
-    
-    # Recalcular o valor pago na conta a pagar
-    conta_pagar = crud.crud_conta_pagar.get(db=db, id=conta_pagar_id)
-    total_pagamentos = sum([p.valor for p in crud.crud_pagamento.get_by_conta_pagar(db, conta_pagar_id=conta_pagar_id)])
-    
-    # Atualizar status da conta
-    if total_pagamentos >= conta_pagar.valor_original:
-        status = schemas.StatusConta.PAGO
-    elif total_pagamentos > 0:
-        status = schemas.StatusConta.PENDENTE
-    else:
-        status = schemas.StatusConta.PENDENTE
-    
-    conta_pagar_update = schemas.ContaPagarUpdate(
-        valor_pago=total_pagamentos,
-        status=status
-    )
-    
-    crud.crud_conta_pagar.update(db=db, db_obj=conta_pagar, obj_in=conta_pagar_update)
+    if not pagamento:
+        raise HTTPException(status_code=404, detail="Pagamento não encontrado")
     
     return pagamento
@@ -0,0 +1,97 @@
+from typing import Any, Optional
+from datetime import date, timedelta
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+
+from app import schemas
+from app.api import deps
+from app.core.principal import Principal
+from app.services import analise_financeira, fluxo_caixa
+from app.services.analise_financeira import RelatorioIndisponivel
+
+router = APIRouter()
+
+# Horizonte padrão e máximo da projeção
+HORIZONTE_PADRAO_DIAS = 90
+HORIZONTE_MAXIMO_DIAS = 366 * 5
+
+@router.get("/fluxo-caixa", response_model=schemas.FluxoCaixa)
+def read_fluxo_caixa(
+    db: Session = Depends(deps.get_db),
+    data_inicio: Optional[date] = None,
+    data_fim: Optional[date] = None,
+    periodo: schemas.PeriodoFluxoCaixa = schemas.PeriodoFluxoCaixa.DIARIO,
+    agrupar_por: schemas.AgrupamentoFluxoCaixa = schemas.AgrupamentoFluxoCaixa.NENHUM,
+    conta_corrente_id: Optional[int] = None,
+    categoria_id: Optional[int] = None,
+    current_user: Principal = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Projeção do fluxo de caixa: entradas (contas a receber em aberto),
+    saídas (saldo a pagar das contas a pagar) e saldo acumulado por dia,
+    semana ou mês, a partir de `data_inicio` (padrão: hoje).
+    Use `conta_corrente_id`/`categoria_id` = 0 para títulos sem conta/categoria.
+    """
+    data_inicio = data_inicio or date.today()
+    data_fim = data_fim or data_inicio + timedelta(days=HORIZONTE_PADRAO_DIAS)
+    if data_fim < data_inicio:
+        raise HTTPException(status_code=400, detail="data_fim deve ser posterior a data_inicio")
+    if (data_fim - data_inicio).days > HORIZONTE_MAXIMO_DIAS:
+        raise HTTPException(status_code=400, detail="Período máximo da projeção é de 5 anos")
+    
+    series = fluxo_caixa.projetar(
+        db,
+        data_inicio=data_inicio,
+        data_fim=data_fim,
+        periodo=periodo.value,
+        agrupar_por=agrupar_por.value,
+        conta_corrente_id=conta_corrente_id,
+        categoria_id=categoria_id
+    )
+    return {
+        "data_inicio": data_inicio,
+        "data_fim": data_fim,
+        "periodo": periodo,
+        "agrupar_por": agrupar_por,
+        "series": series
+    }
+
+@router.get("/aging", response_model=schemas.Aging)
+def read_aging(
+    db: Session = Depends(deps.get_db),
+    data_base: Optional[date] = None,
+    por_categoria: bool = False,
+    current_user: Principal = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Aging das contas a pagar e a receber em aberto: a vencer e vencidos
+    há 0-30, 31-60, 61-90 e mais de 90 dias em `data_base` (padrão: hoje).
+    """
+    try:
+        return analise_financeira.aging(
+            db, data_base=data_base or date.today(), por_categoria=por_categoria
+        )
+    except RelatorioIndisponivel as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+@router.get("/dre", response_model=schemas.DRE)
+def read_dre(
+    db: Session = Depends(deps.get_db),
+    data_inicio: Optional[date] = None,
+    data_fim: Optional[date] = None,
+    current_user: Principal = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    DRE por categoria e mês, pelo regime de caixa: recebimentos como
+    receitas e pagamentos como despesas (padrão: ano corrente).
+    """
+    hoje = date.today()
+    data_inicio = data_inicio or hoje.replace(month=1, day=1)
+    data_fim = data_fim or hoje.replace(month=12, day=31)
+    if data_fim < data_inicio:
+        raise HTTPException(status_code=400, detail="data_fim deve ser posterior a data_inicio")
+    
+    try:
+        return analise_financeira.dre(db, data_inicio=data_inicio, data_fim=data_fim)
+    except RelatorioIndisponivel as e:
+        raise HTTPException(status_code=503, detail=str(e))
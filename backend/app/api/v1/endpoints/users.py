@@ -1,16 +1,16 @@
-from typing import Any, List
-from fastapi import APIRouter, Body, Depends, HTTPException
+from typing import Any, List, Optional
+from fastapi import APIRouter, Body, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
 from app.api import deps
+from app.core.principal import Principal
 from app.crud import crud_user
-from app.models import User
 from app.schemas import User as UserSchema, UserCreate, UserUpdate
 
 router = APIRouter()
 
 @router.get("/me", response_model=UserSchema)
 def read_user_me(
-    current_user: User = Depends(deps.get_current_active_user),
+    current_user: Principal = Depends(deps.get_current_active_user),
 ) -> Any:
     return current_user
 
@@ -19,17 +19,25 @@ def update_user_me(
     *,
     db: Session = Depends(deps.get_db),
     user_in: UserUpdate,
-    current_user: User = Depends(deps.get_current_active_user),
+    current_user: Principal = Depends(deps.get_current_active_user),
 ) -> Any:
-    user = crud_user.update(db, db_obj=current_user, obj_in=user_in)
+    # current_user é o principal em cache; a atualização precisa do registro da sessão
+    user = crud_user.get(db, id=current_user.id)
+    user = crud_user.update(db, db_obj=user, obj_in=user_in)
     return user
 
 @router.get("/", response_model=List[UserSchema])
 def read_users(
+    response: Response,
     db: Session = Depends(deps.get_db),
     skip: int = 0,
     limit: int = 100,
-    current_user: User = Depends(deps.get_current_active_superuser),
+    cursor: Optional[str] = None,
+    current_user: Principal = Depends(deps.get_current_active_superuser),
 ) -> Any:
+    if cursor is not None:
+        users, next_cursor = crud_user.get_multi_keyset(db, cursor=cursor, limit=limit)
+        deps.set_next_cursor(response, next_cursor)
+        return users
     users = crud_user.get_multi(db, skip=skip, limit=limit)
     return users
\ No newline at end of file
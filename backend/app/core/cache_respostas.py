@@ -0,0 +1,205 @@
+"""
+Cache de respostas das listas de referência (categorias, contas corrente,
+bancos, tipos e templates de integração), com ETag e 304.
+
+Cada recurso tem um contador de versão, incrementado após o commit de
+qualquer escrita nele. Os CRUDs e os serviços chamam `marcar(db, recurso)`
+e o incremento acontece no `after_commit` da sessão. O corpo JSON já
+serializado fica num LRU do processo, junto com a versão em que foi
+gerado e o ETag forte (sha256 do corpo).
+
+A cada requisição:
+- versão igual à da entrada: responde sem tocar no banco;
+- If-None-Match igual ao ETag: responde 304 sem corpo;
+- versão diferente: a entrada é descartada e a consulta roda de novo.
+
+Com CACHE_RESPOSTAS_REDIS os contadores ficam no Redis (REDIS_URL), então
+uma escrita em qualquer worker invalida o cache de todos. Sem Redis o
+contador é do processo e os demais workers podem servir a versão anterior
+por até CACHE_RESPOSTAS_TTL segundos.
+"""
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+
+try:
+    import redis
+    import redis.asyncio as redis_async
+except ImportError:  # Redis é opcional fora do Celery / CACHE_RESPOSTAS_REDIS
+    redis = None
+    redis_async = None
+
+logger = logging.getLogger(__name__)
+
+PREFIXO_REDIS = "erp:versao:"
+
+# Recursos com resposta em cache
+CATEGORIAS = "categorias"
+CONTAS_CORRENTE = "contas_corrente"
+BANCOS = "bancos"
+# Listas fixas no código: mudam só com deploy (e o ETag acompanha o corpo)
+INTEGRACOES_FIXAS = "integracoes_fixas"
+# Títulos e pagamentos: só a versão, usada pelo cache dos relatórios (app.services.analise_financeira)
+LANCAMENTOS = "lancamentos"
+
+# O navegador sempre revalida (If-None-Match) e nenhum proxy compartilhado guarda a resposta
+CACHE_CONTROL = "private, no-cache"
+
+@dataclass(frozen=True)
+class _Entrada:
+    versao: int
+    etag: str
+    corpo: bytes
+    expira_em: float
+
+# ==================== VERSÕES ====================
+
+_versoes: Dict[str, int] = {}
+_versoes_lock = threading.Lock()
+_redis_cliente = None
+_redis_cliente_async = None
+
+def _usar_redis() -> bool:
+    return settings.CACHE_RESPOSTAS_REDIS and redis is not None
+
+def _redis():
+    global _redis_cliente
+    if _redis_cliente is None:
+        _redis_cliente = redis.Redis.from_url(settings.REDIS_URL, socket_timeout=0.25)
+    return _redis_cliente
+
+def _redis_async():
+    global _redis_cliente_async
+    if _redis_cliente_async is None:
+        _redis_cliente_async = redis_async.Redis.from_url(settings.REDIS_URL, socket_timeout=0.25)
+    return _redis_cliente_async
+
+def versao(recurso: str) -> Optional[int]:
+    """Versão atual do recurso; None se o Redis estiver indisponível (sem cache)"""
+    if _usar_redis():
+        try:
+            return int(_redis().get(f"{PREFIXO_REDIS}{recurso}") or 0)
+        except redis.RedisError as e:
+            logger.warning(f"Versões do cache de respostas no Redis indisponíveis: {e}")
+            return None
+    return _versoes.get(recurso, 0)
+
+async def versao_async(recurso: str) -> Optional[int]:
+    if _usar_redis():
+        try:
+            return int(await _redis_async().get(f"{PREFIXO_REDIS}{recurso}") or 0)
+        except redis.RedisError as e:
+            logger.warning(f"Versões do cache de respostas no Redis indisponíveis: {e}")
+            return None
+    return _versoes.get(recurso, 0)
+
+def invalidar(recurso: str) -> None:
+    """Incrementar a versão do recurso: as respostas em cache deixam de valer"""
+    with _versoes_lock:
+        _versoes[recurso] = _versoes.get(recurso, 0) + 1
+    if _usar_redis():
+        try:
+            _redis().incr(f"{PREFIXO_REDIS}{recurso}")
+        except redis.RedisError as e:
+            logger.warning(f"Não foi possível invalidar {recurso} no Redis: {e}")
+
+# ==================== INVALIDAÇÃO NO COMMIT ====================
+# Incrementar antes do commit deixaria uma leitura concorrente guardar os
+# dados antigos já com a versão nova.
+
+def marcar(db: Session, recurso: str) -> None:
+    """Invalidar o recurso quando a transação atual de `db` for confirmada"""
+    db.info.setdefault("recursos_alterados", set()).add(recurso)
+
+@event.listens_for(Session, "after_commit")
+def _invalidar_apos_commit(session: Session) -> None:
+    for recurso in session.info.pop("recursos_alterados", ()):
+        invalidar(recurso)
+
+@event.listens_for(Session, "after_rollback")
+def _descartar_apos_rollback(session: Session) -> None:
+    session.info.pop("recursos_alterados", None)
+
+# ==================== RESPOSTAS ====================
+
+_respostas: "OrderedDict[str, _Entrada]" = OrderedDict()
+_respostas_lock = threading.Lock()
+
+@lru_cache(maxsize=None)
+def _adaptador(modelo: Any) -> TypeAdapter:
+    return TypeAdapter(modelo)
+
+def _obter(chave: str, versao_atual: int) -> Optional[_Entrada]:
+    with _respostas_lock:
+        entrada = _respostas.get(chave)
+        if entrada is None:
+            return None
+        if entrada.versao != versao_atual or entrada.expira_em <= time.monotonic():
+            del _respostas[chave]
+            return None
+        _respostas.move_to_end(chave)
+        return entrada
+
+def _gerar(chave: str, versao_atual: Optional[int], dados: Any, modelo: Any) -> _Entrada:
+    adaptador = _adaptador(modelo)
+    corpo = adaptador.dump_json(adaptador.validate_python(dados, from_attributes=True))
+    entrada = _Entrada(
+        versao=versao_atual if versao_atual is not None else -1,
+        etag=f'"{hashlib.sha256(corpo).hexdigest()[:32]}"',
+        corpo=corpo,
+        expira_em=time.monotonic() + settings.CACHE_RESPOSTAS_TTL,
+    )
+    if versao_atual is not None and settings.CACHE_RESPOSTAS_TTL > 0:
+        with _respostas_lock:
+            _respostas[chave] = entrada
+            _respostas.move_to_end(chave)
+            while len(_respostas) > settings.CACHE_RESPOSTAS_TAMANHO:
+                _respostas.popitem(last=False)
+    return entrada
+
+def _chave(request: Request, recurso: str) -> str:
+    return f"{recurso}:{request.url.path}?{request.url.query}"
+
+def _responder(request: Request, entrada: _Entrada) -> Response:
+    headers = {"ETag": entrada.etag, "Cache-Control": CACHE_CONTROL}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and (if_none_match.strip() == "*" or entrada.etag in [
+        etag.strip() for etag in if_none_match.split(",")
+    ]):
+        return Response(status_code=304, headers=headers)
+    return Response(content=entrada.corpo, media_type="application/json", headers=headers)
+
+def responder(request: Request, recurso: str, carregar: Callable[[], Any], modelo: Any) -> Response:
+    """
+    Resposta de `carregar()` serializada como `modelo`, em cache até a
+    próxima escrita no recurso, com ETag e 304.
+    """
+    versao_atual = versao(recurso)
+    chave = _chave(request, recurso)
+    entrada = _obter(chave, versao_atual) if versao_atual is not None else None
+    if entrada is None:
+        entrada = _gerar(chave, versao_atual, carregar(), modelo)
+    return _responder(request, entrada)
+
+async def responder_async(
+    request: Request, recurso: str, carregar: Callable[[], Awaitable[Any]], modelo: Any
+) -> Response:
+    """`responder` das rotas async: `carregar` é uma corrotina"""
+    versao_atual = await versao_async(recurso)
+    chave = _chave(request, recurso)
+    entrada = _obter(chave, versao_atual) if versao_atual is not None else None
+    if entrada is None:
+        entrada = _gerar(chave, versao_atual, await carregar(), modelo)
+    return _responder(request, entrada)
@@ -0,0 +1,11 @@
+import hashlib
+import json
+from typing import Any, Dict
+
+def hash_conteudo(dados: Dict[str, Any]) -> str:
+    """
+    Hash estável (sha256) do conteúdo de um registro, independente da ordem
+    das chaves; datas e decimais entram pela representação em texto.
+    """
+    serializado = json.dumps(dados, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(serializado.encode()).hexdigest()
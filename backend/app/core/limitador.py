@@ -0,0 +1,50 @@
+"""
+Limite de tentativas de login por janela deslizante, por processo.
+
+Cada chave (conta ou IP) guarda os instantes das tentativas recentes; acima
+do limite o login é recusado antes de gastar CPU com o bcrypt. As chaves
+são limitadas em número (as menos usadas saem primeiro), então um ataque
+com muitos e-mails/IPs distintos não cresce a memória sem fim.
+"""
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Deque, Optional
+
+MAX_CHAVES = 100_000
+
+class LimitadorTentativas:
+    def __init__(self, limite: int, janela_segundos: float):
+        self.limite = limite
+        self.janela = janela_segundos
+        self._tentativas: "OrderedDict[str, Deque[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _recentes(self, chave: str, agora: float) -> Deque[float]:
+        instantes = self._tentativas.get(chave)
+        if instantes is None:
+            instantes = self._tentativas[chave] = deque()
+            while len(self._tentativas) > MAX_CHAVES:
+                self._tentativas.popitem(last=False)
+        self._tentativas.move_to_end(chave)
+        while instantes and instantes[0] <= agora - self.janela:
+            instantes.popleft()
+        return instantes
+
+    def bloqueado_por(self, chave: str) -> Optional[float]:
+        """Segundos até liberar a chave, ou None se ainda cabe uma tentativa"""
+        agora = time.monotonic()
+        with self._lock:
+            instantes = self._recentes(chave, agora)
+            if len(instantes) < self.limite:
+                return None
+            return max(instantes[0] + self.janela - agora, 0.0)
+
+    def registrar(self, chave: str) -> None:
+        agora = time.monotonic()
+        with self._lock:
+            self._recentes(chave, agora).append(agora)
+
+    def limpar(self, chave: str) -> None:
+        with self._lock:
+            self._tentativas.pop(chave, None)
@@ -0,0 +1,166 @@
+"""
+Cache do usuário autenticado (principal).
+
+Toda rota autenticada precisa do usuário do token; sem cache isso é um
+SELECT em `users` por requisição. O principal é uma cópia imutável dos
+campos usados na autorização, guardada num LRU do processo com TTL curto
+e, opcionalmente, no Redis (compartilhado entre workers e sobrevive a
+restart).
+
+`CRUDUser.update`/`remove` invalidam a entrada local e a do Redis. Os
+demais workers mantêm a cópia local até o TTL vencer, então uma
+desativação vale em todos os processos em no máximo USER_CACHE_TTL
+segundos.
+"""
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Optional, Tuple
+
+from app.core.config import settings
+
+try:
+    import redis
+    import redis.asyncio as redis_async
+except ImportError:  # Redis é opcional fora do Celery / USER_CACHE_REDIS
+    redis = None
+    redis_async = None
+
+logger = logging.getLogger(__name__)
+
+PREFIXO_REDIS = "erp:principal:"
+
+@dataclass(frozen=True)
+class Principal:
+    """Usuário autenticado, desligado da sessão do banco"""
+    id: int
+    email: str
+    full_name: Optional[str]
+    is_active: bool
+    is_superuser: bool
+
+    @classmethod
+    def do_usuario(cls, user) -> "Principal":
+        return cls(
+            id=user.id,
+            email=user.email,
+            full_name=user.full_name,
+            is_active=bool(user.is_active),
+            is_superuser=bool(user.is_superuser),
+        )
+
+# ==================== LRU LOCAL ====================
+
+_cache: "OrderedDict[int, Tuple[float, Principal]]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+def _obter_local(user_id: int) -> Optional[Principal]:
+    with _cache_lock:
+        entrada = _cache.get(user_id)
+        if entrada is None:
+            return None
+        expira_em, principal = entrada
+        if expira_em <= time.monotonic():
+            del _cache[user_id]
+            return None
+        _cache.move_to_end(user_id)
+        return principal
+
+def _guardar_local(principal: Principal) -> None:
+    with _cache_lock:
+        _cache[principal.id] = (time.monotonic() + settings.USER_CACHE_TTL, principal)
+        _cache.move_to_end(principal.id)
+        while len(_cache) > settings.USER_CACHE_TAMANHO:
+            _cache.popitem(last=False)
+
+# ==================== REDIS ====================
+
+_redis_cliente = None
+_redis_cliente_async = None
+
+def _usar_redis() -> bool:
+    return settings.USER_CACHE_REDIS and redis is not None
+
+def _redis():
+    global _redis_cliente
+    if _redis_cliente is None:
+        _redis_cliente = redis.Redis.from_url(settings.REDIS_URL, socket_timeout=0.25)
+    return _redis_cliente
+
+def _redis_async():
+    # O cliente asyncio fica preso ao event loop em que foi criado (o do worker)
+    global _redis_cliente_async
+    if _redis_cliente_async is None:
+        _redis_cliente_async = redis_async.Redis.from_url(settings.REDIS_URL, socket_timeout=0.25)
+    return _redis_cliente_async
+
+def _decodificar(valor: Optional[bytes]) -> Optional[Principal]:
+    return Principal(**json.loads(valor)) if valor else None
+
+def _codificar(principal: Principal) -> str:
+    return json.dumps(asdict(principal))
+
+# ==================== API ====================
+
+def obter(user_id: int) -> Optional[Principal]:
+    """Principal em cache (local, depois Redis) ou None"""
+    if settings.USER_CACHE_TTL <= 0:
+        return None
+    principal = _obter_local(user_id)
+    if principal is None and _usar_redis():
+        try:
+            principal = _decodificar(_redis().get(f"{PREFIXO_REDIS}{user_id}"))
+        except Exception as e:
+            logger.warning(f"Cache de usuários no Redis indisponível: {e}")
+        if principal is not None:
+            _guardar_local(principal)
+    return principal
+
+async def obter_async(user_id: int) -> Optional[Principal]:
+    """`obter` para as dependências async, sem bloquear o event loop no Redis"""
+    if settings.USER_CACHE_TTL <= 0:
+        return None
+    principal = _obter_local(user_id)
+    if principal is None and _usar_redis():
+        try:
+            principal = _decodificar(await _redis_async().get(f"{PREFIXO_REDIS}{user_id}"))
+        except Exception as e:
+            logger.warning(f"Cache de usuários no Redis indisponível: {e}")
+        if principal is not None:
+            _guardar_local(principal)
+    return principal
+
+def guardar(principal: Principal) -> Principal:
+    if settings.USER_CACHE_TTL <= 0:
+        return principal
+    _guardar_local(principal)
+    if _usar_redis():
+        try:
+            _redis().set(f"{PREFIXO_REDIS}{principal.id}", _codificar(principal), ex=settings.USER_CACHE_TTL)
+        except Exception as e:
+            logger.warning(f"Cache de usuários no Redis indisponível: {e}")
+    return principal
+
+async def guardar_async(principal: Principal) -> Principal:
+    if settings.USER_CACHE_TTL <= 0:
+        return principal
+    _guardar_local(principal)
+    if _usar_redis():
+        try:
+            await _redis_async().set(f"{PREFIXO_REDIS}{principal.id}", _codificar(principal), ex=settings.USER_CACHE_TTL)
+        except Exception as e:
+            logger.warning(f"Cache de usuários no Redis indisponível: {e}")
+    return principal
+
+def invalidar(user_id: int) -> None:
+    """Descartar o principal após alteração ou exclusão do usuário"""
+    with _cache_lock:
+        _cache.pop(user_id, None)
+    if _usar_redis():
+        try:
+            _redis().delete(f"{PREFIXO_REDIS}{user_id}")
+        except Exception as e:
+            logger.warning(f"Não foi possível invalidar o usuário {user_id} no Redis: {e}")
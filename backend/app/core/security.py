@@ -1,26 +1,83 @@
-from datetime import datetime, timedelta
-from typing import Any, Union
-from jose import jwt
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import timedelta
+from typing import Any, Callable, Dict, Optional, Tuple, Union
 from passlib.context import CryptContext
+from app.core import tokens
 from app.core.config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Hashes com custo diferente de BCRYPT_ROUNDS são regravados no próximo login
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS)
 
 def create_access_token(
     subject: Union[str, Any], expires_delta: timedelta = None
 ) -> str:
-    if expires_delta:
-        expire = datetime.utcnow() + expires_delta
-    else:
-        expire = datetime.utcnow() + timedelta(
-            minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
-        )
-    to_encode = {"exp": expire, "sub": str(subject)}
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
-    return encoded_jwt
+    if not expires_delta:
+        expires_delta = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    return tokens.emitir(subject, expires_delta)
+
+# ==================== HASH DE SENHAS ====================
+# O bcrypt custa centenas de ms de CPU por senha. Hash e verificação rodam
+# num pool próprio e limitado (o bcrypt libera o GIL), fora do event loop e
+# do threadpool das rotas; com a fila cheia a chamada é recusada na hora em
+# vez de empilhar logins e atrasar o resto da API.
+
+class FilaHashCheia(Exception):
+    """Pool de hash de senhas saturado; tente novamente em instantes"""
+
+_executor = ThreadPoolExecutor(max_workers=settings.HASH_WORKERS, thread_name_prefix="hash-senha")
+_metricas_lock = threading.Lock()
+_pendentes = 0
+_concluidas = 0
+_recusadas = 0
+_tempo_total = 0.0
+
+def _submeter(funcao: Callable, *args) -> Future:
+    global _pendentes, _recusadas
+    with _metricas_lock:
+        if _pendentes >= settings.HASH_WORKERS + settings.HASH_FILA_MAX:
+            _recusadas += 1
+            raise FilaHashCheia()
+        _pendentes += 1
+
+    def executar():
+        global _pendentes, _concluidas, _tempo_total
+        inicio = time.perf_counter()
+        try:
+            return funcao(*args)
+        finally:
+            with _metricas_lock:
+                _pendentes -= 1
+                _concluidas += 1
+                _tempo_total += time.perf_counter() - inicio
+
+    return _executor.submit(executar)
+
+def metricas_hash() -> Dict[str, Any]:
+    """Ocupação do pool de hash de senhas neste processo"""
+    with _metricas_lock:
+        pendentes, concluidas, recusadas, tempo_total = _pendentes, _concluidas, _recusadas, _tempo_total
+    return {
+        "workers": settings.HASH_WORKERS,
+        "em_execucao": min(pendentes, settings.HASH_WORKERS),
+        "na_fila": max(pendentes - settings.HASH_WORKERS, 0),
+        "concluidas": concluidas,
+        "recusadas": recusadas,
+        "tempo_medio_ms": round(tempo_total * 1000 / concluidas, 2) if concluidas else 0.0,
+    }
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return _submeter(pwd_context.verify, plain_password, hashed_password).result()
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
\ No newline at end of file
+    return _submeter(pwd_context.hash, password).result()
+
+def verificar_e_atualizar(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verificar a senha; com o custo do hash desatualizado retorna também o novo hash"""
+    return _submeter(pwd_context.verify_and_update, plain_password, hashed_password).result()
+
+async def verificar_e_atualizar_async(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """`verificar_e_atualizar` sem bloquear o event loop"""
+    return await asyncio.wrap_future(_submeter(pwd_context.verify_and_update, plain_password, hashed_password))
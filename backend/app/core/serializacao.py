@@ -0,0 +1,48 @@
+"""
+Serialização JSON das respostas da API.
+
+`RespostaJSON` é a classe de resposta padrão do app: gera o corpo com o
+orjson (em C, várias vezes mais rápido que o `json` da biblioteca padrão)
+e cai para o `json` se o pacote não estiver instalado. A saída segue a do
+Pydantic para os tipos que as projeções de linha entregam sem passar pelo
+schema: Decimal como texto, datas ISO 8601, UTC como "Z", Enum pelo valor.
+"""
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # sem orjson as respostas saem pelo json da biblioteca padrão
+    orjson = None
+
+def _padrao(valor: Any) -> Any:
+    if isinstance(valor, Decimal):
+        return str(valor)
+    raise TypeError(f"Tipo {type(valor).__name__} não serializável em JSON")
+
+def _padrao_stdlib(valor: Any) -> Any:
+    if isinstance(valor, datetime):
+        texto = valor.isoformat()
+        return texto[:-6] + "Z" if texto.endswith("+00:00") else texto
+    if isinstance(valor, date):
+        return valor.isoformat()
+    if isinstance(valor, Enum):
+        return valor.value
+    return _padrao(valor)
+
+def dumps(conteudo: Any) -> bytes:
+    """Conteúdo (tipos JSON, datas, Decimal, Enum) em JSON UTF-8 compacto"""
+    if orjson is not None:
+        return orjson.dumps(conteudo, default=_padrao, option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(
+        conteudo, default=_padrao_stdlib, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+class RespostaJSON(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
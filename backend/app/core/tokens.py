@@ -0,0 +1,215 @@
+"""
+Emissão e validação dos tokens de acesso (JWT).
+
+Validar a assinatura a cada requisição custa mais que o resto da
+autenticação. Cada token válido fica num LRU do processo, indexado pelo
+digest do token, até o `exp` do próprio token. Requisições seguintes com
+o mesmo token custam só a consulta ao dicionário e a checagem de
+revogação.
+
+A biblioteca JWT é escolhida por JWT_BACKEND: "pyjwt" (mais rápida),
+"jose" (python-jose), ou "auto" (PyJWT se instalado).
+
+Revogação (logout): o `jti` do token entra numa lista com validade até o
+`exp`. Fica no processo ou, com TOKEN_REVOGACAO_REDIS, no Redis
+compartilhado entre os workers. Sem Redis, o logout só vale no worker que
+o recebeu. Com o Redis configurado e fora do ar a lista não é ignorada:
+tokens com `jti` e o próprio logout falham com RevogacaoIndisponivel
+(503), em vez de aceitar tokens que podem ter sido revogados.
+"""
+import hashlib
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional, Tuple
+
+from pydantic import ValidationError
+
+from app.core.config import settings
+from app.schemas.token import TokenPayload
+
+try:
+    import jwt as pyjwt
+except ImportError:  # PyJWT é opcional; o python-jose atende sozinho
+    pyjwt = None
+from jose import JWTError, jwt as jose_jwt
+
+try:
+    import redis
+    import redis.asyncio as redis_async
+except ImportError:  # Redis é opcional fora do Celery / TOKEN_REVOGACAO_REDIS
+    redis = None
+    redis_async = None
+
+logger = logging.getLogger(__name__)
+
+PREFIXO_REDIS = "erp:token-revogado:"
+
+class TokenInvalido(Exception):
+    """Token com assinatura inválida, expirado, malformado ou revogado"""
+
+class RevogacaoIndisponivel(Exception):
+    """Lista de tokens revogados no Redis inacessível"""
+
+# ==================== BACKEND JWT ====================
+
+def _usar_pyjwt() -> bool:
+    if settings.JWT_BACKEND == "pyjwt":
+        if pyjwt is None:
+            raise RuntimeError("JWT_BACKEND=pyjwt exige o pacote PyJWT")
+        return True
+    return settings.JWT_BACKEND == "auto" and pyjwt is not None
+
+USAR_PYJWT = _usar_pyjwt()
+
+def _codificar(dados: Dict[str, Any]) -> str:
+    if USAR_PYJWT:
+        return pyjwt.encode(dados, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    return jose_jwt.encode(dados, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+
+def _decodificar(token: str) -> Dict[str, Any]:
+    try:
+        if USAR_PYJWT:
+            return pyjwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        return jose_jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except (JWTError, *((pyjwt.PyJWTError,) if pyjwt is not None else ())) as e:
+        raise TokenInvalido() from e
+
+def emitir(subject: Any, expires_delta: timedelta) -> str:
+    """Token de acesso com `jti` próprio, para poder ser revogado no logout"""
+    return _codificar({
+        "exp": datetime.utcnow() + expires_delta,
+        "sub": str(subject),
+        "jti": uuid.uuid4().hex,
+    })
+
+# ==================== CACHE DE TOKENS VALIDADOS ====================
+
+_cache: "OrderedDict[bytes, Tuple[float, TokenPayload]]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+def _digest(token: str) -> bytes:
+    return hashlib.blake2b(token.encode(), digest_size=20).digest()
+
+def _obter_local(digest: bytes) -> Optional[TokenPayload]:
+    with _cache_lock:
+        entrada = _cache.get(digest)
+        if entrada is None:
+            return None
+        expira_em, payload = entrada
+        if expira_em <= time.time():
+            del _cache[digest]
+            return None
+        _cache.move_to_end(digest)
+        return payload
+
+def _validar_assinatura(token: str) -> TokenPayload:
+    digest = _digest(token)
+    payload = _obter_local(digest)
+    if payload is not None:
+        return payload
+    dados = _decodificar(token)
+    try:
+        payload = TokenPayload(**dados)
+    except ValidationError as e:
+        raise TokenInvalido() from e
+    if payload.exp is not None and settings.TOKEN_CACHE_TAMANHO > 0:
+        with _cache_lock:
+            _cache[digest] = (float(payload.exp), payload)
+            _cache.move_to_end(digest)
+            while len(_cache) > settings.TOKEN_CACHE_TAMANHO:
+                _cache.popitem(last=False)
+    return payload
+
+# ==================== REVOGAÇÃO ====================
+
+# jti -> exp (epoch) do token revogado; some da lista quando o token expiraria
+_revogados: Dict[str, float] = {}
+_revogados_lock = threading.Lock()
+_redis_cliente = None
+_redis_cliente_async = None
+
+def _usar_redis() -> bool:
+    return settings.TOKEN_REVOGACAO_REDIS and redis is not None
+
+def _redis():
+    global _redis_cliente
+    if _redis_cliente is None:
+        _redis_cliente = redis.Redis.from_url(settings.REDIS_URL, socket_timeout=0.25)
+    return _redis_cliente
+
+def _redis_async():
+    global _redis_cliente_async
+    if _redis_cliente_async is None:
+        _redis_cliente_async = redis_async.Redis.from_url(settings.REDIS_URL, socket_timeout=0.25)
+    return _redis_cliente_async
+
+def _revogado_local(jti: str) -> bool:
+    expira_em = _revogados.get(jti)
+    return expira_em is not None and expira_em > time.time()
+
+def _revogar_local(jti: str, expira_em: float) -> None:
+    agora = time.time()
+    with _revogados_lock:
+        for chave in [chave for chave, exp in _revogados.items() if exp <= agora]:
+            del _revogados[chave]
+        _revogados[jti] = expira_em
+
+def _segundos_restantes(payload: TokenPayload) -> int:
+    return max(int(payload.exp - time.time()), 1) if payload.exp is not None else settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+
+# ==================== API ====================
+
+def validar(token: str) -> TokenPayload:
+    """
+    Payload do token válido e não revogado; TokenInvalido caso contrário e
+    RevogacaoIndisponivel se a lista no Redis não puder ser consultada.
+    """
+    payload = _validar_assinatura(token)
+    if payload.jti is not None:
+        if _revogado_local(payload.jti):
+            raise TokenInvalido()
+        if _usar_redis():
+            try:
+                revogado = _redis().exists(f"{PREFIXO_REDIS}{payload.jti}")
+            except redis.RedisError as e:
+                logger.warning(f"Lista de tokens revogados no Redis indisponível: {e}")
+                raise RevogacaoIndisponivel() from e
+            if revogado:
+                raise TokenInvalido()
+    return payload
+
+async def validar_async(token: str) -> TokenPayload:
+    """`validar` para as dependências async, sem bloquear o event loop no Redis"""
+    payload = _validar_assinatura(token)
+    if payload.jti is not None:
+        if _revogado_local(payload.jti):
+            raise TokenInvalido()
+        if _usar_redis():
+            try:
+                revogado = await _redis_async().exists(f"{PREFIXO_REDIS}{payload.jti}")
+            except redis.RedisError as e:
+                logger.warning(f"Lista de tokens revogados no Redis indisponível: {e}")
+                raise RevogacaoIndisponivel() from e
+            if revogado:
+                raise TokenInvalido()
+    return payload
+
+async def revogar_async(payload: TokenPayload) -> None:
+    """
+    Revogar o token até o seu `exp` (tokens sem `jti` só expiram);
+    RevogacaoIndisponivel se não foi possível gravar no Redis.
+    """
+    if payload.jti is None:
+        return
+    _revogar_local(payload.jti, time.time() + _segundos_restantes(payload))
+    if _usar_redis():
+        try:
+            await _redis_async().set(f"{PREFIXO_REDIS}{payload.jti}", 1, ex=_segundos_restantes(payload))
+        except redis.RedisError as e:
+            # Revogado só neste processo: os outros workers ainda aceitariam o token
+            logger.warning(f"Não foi possível revogar o token no Redis: {e}")
+            raise RevogacaoIndisponivel() from e
@@ -2,7 +2,10 @@ from app.crud.crud_user import crud_user
 from app.crud.crud_financeiro import (
     crud_conta_pagar, crud_conta_receber, crud_conta_corrente,
     crud_categoria, crud_cliente_fornecedor, crud_contato_cliente_fornecedor,
-    crud_anexo_cliente_fornecedor, crud_pagamento
+    crud_anexo_cliente_fornecedor, crud_pagamento,
+    crud_conta_pagar_async, crud_conta_corrente_async, crud_categoria_async, crud_pagamento_async
 )
 from app.crud.crud_empresa import empresa
+from app.crud.crud_banco import banco
 from app.crud.crud_integracao import integracao
+from app.crud.crud_job import crud_job, crud_execucao_rotina
@@ -1,7 +1,14 @@
-from typing import Any, Dict, Generic, List, Optional, Type, TypeVar, Union
+from typing import Any, Dict, Generic, List, Optional, Sequence, Tuple, Type, TypeVar, Union
 from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
+from sqlalchemy import Select, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Query, Session, load_only, selectinload
+from app.core import cache_respostas
+from app.db.pagination import (
+    ModoContagem, Pagina, count_total, count_total_async, paginate_keyset, paginate_keyset_async,
+    paginate_offset, paginate_offset_async
+)
 from app.db.session import Base
 
 ModelType = TypeVar("ModelType", bound=Base)
@@ -9,21 +16,86 @@ CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
 UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
 
 class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
+    # Colunas da ordenação estável usada na paginação por cursor (a última deve ser única)
+    keyset_columns: Tuple[str, ...] = ("id",)
+    # Recurso do cache de respostas (app.core.cache_respostas) invalidado pelas escritas
+    recurso_cache: Optional[str] = None
+
     def __init__(self, model: Type[ModelType]):
         self.model = model
 
+    def marcar_alteracao(self, db: Session) -> None:
+        if self.recurso_cache:
+            cache_respostas.marcar(db, self.recurso_cache)
+
+    def opcoes_campos(self, campos: Optional[Sequence[str]]) -> list:
+        """
+        Opções de carga para listar só `campos` (ver app.db.projecao.ler_campos):
+        load_only nas colunas (mais as da ordenação por cursor) e selectinload
+        nos relacionamentos pedidos. Sem `campos`, a entidade inteira.
+        """
+        if campos is None:
+            return []
+        mapper = inspect(self.model)
+        # Ordem estável: o SQL compilado fica no cache de statements do SQLAlchemy
+        colunas = [nome for nome in campos if nome in mapper.column_attrs]
+        colunas += [nome for nome in self.keyset_columns if nome not in colunas]
+        return [
+            load_only(*[getattr(self.model, nome) for nome in colunas]),
+            *[selectinload(getattr(self.model, nome)) for nome in campos if nome in mapper.relationships],
+        ]
+
     def get(self, db: Session, id: Any) -> Optional[ModelType]:
         return db.query(self.model).filter(self.model.id == id).first()
 
     def get_multi(
-        self, db: Session, *, skip: int = 0, limit: int = 100
+        self, db: Session, *, skip: int = 0, limit: int = 100, campos: Optional[Sequence[str]] = None
     ) -> List[ModelType]:
-        return db.query(self.model).offset(skip).limit(limit).all()
+        return db.query(self.model).options(*self.opcoes_campos(campos)).offset(skip).limit(limit).all()
+
+    def get_multi_keyset(
+        self,
+        db: Session,
+        *,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        query: Optional[Query] = None,
+        campos: Optional[Sequence[str]] = None
+    ) -> Tuple[List[ModelType], Optional[str]]:
+        """Página por cursor; retorna os itens e o cursor da próxima página (None no fim)"""
+        if query is None:
+            query = db.query(self.model)
+        columns = [getattr(self.model, name) for name in self.keyset_columns]
+        return paginate_keyset(query.options(*self.opcoes_campos(campos)), columns, cursor=cursor, limit=limit)
+
+    def get_page(
+        self,
+        db: Session,
+        *,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        count: ModoContagem = ModoContagem.EXACT,
+        query: Optional[Query] = None,
+        campos: Optional[Sequence[str]] = None
+    ) -> Pagina:
+        """
+        Página e total numa chamada só. Por OFFSET o total exato vem na mesma
+        consulta (COUNT(*) OVER()); por cursor o total exige contagem à parte,
+        por isso nas telas grandes prefira count=estimated ou none.
+        """
+        if query is None:
+            query = db.query(self.model)
+        if cursor is None:
+            return paginate_offset(query.options(*self.opcoes_campos(campos)), skip=skip, limit=limit, modo=count)
+        items, next_cursor = self.get_multi_keyset(db, cursor=cursor, limit=limit, query=query, campos=campos)
+        return Pagina(items, count_total(query, count), next_cursor)
 
     def create(self, db: Session, *, obj_in: CreateSchemaType) -> ModelType:
         obj_in_data = jsonable_encoder(obj_in)
         db_obj = self.model(**obj_in_data)
         db.add(db_obj)
+        self.marcar_alteracao(db)
         db.commit()
         db.refresh(db_obj)
         return db_obj
@@ -35,21 +107,141 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         db_obj: ModelType,
         obj_in: Union[UpdateSchemaType, Dict[str, Any]]
     ) -> ModelType:
-        obj_data = jsonable_encoder(db_obj)
         if isinstance(obj_in, dict):
             update_data = obj_in
         else:
             update_data = obj_in.dict(exclude_unset=True)
-        for field in obj_data:
-            if field in update_data:
-                setattr(db_obj, field, update_data[field])
+        alterados = self.campos_alterados(db_obj, update_data)
+        if not alterados:
+            # Nada mudou: sem UPDATE, sem commit e sem novo updated_at
+            return db_obj
+        for field, value in alterados.items():
+            setattr(db_obj, field, value)
         db.add(db_obj)
+        self.marcar_alteracao(db)
         db.commit()
         db.refresh(db_obj)
         return db_obj
 
+    @staticmethod
+    def campos_alterados(db_obj: ModelType, update_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Colunas de `update_data` cujo valor difere do que está no objeto"""
+        colunas = inspect(db_obj).mapper.column_attrs.keys()
+        return {
+            field: update_data[field]
+            for field in colunas
+            if field in update_data and getattr(db_obj, field) != update_data[field]
+        }
+
     def remove(self, db: Session, *, id: int) -> ModelType:
         obj = db.query(self.model).get(id)
         db.delete(obj)
+        self.marcar_alteracao(db)
         db.commit()
-        return obj
\ No newline at end of file
+        return obj
+
+class AsyncCRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
+    """
+    Variante do CRUDBase para as rotas async def, sobre AsyncSession.
+
+    Em async não há lazy load: relacionamentos lidos pelo schema de resposta
+    entram em `carregar` e vêm por selectinload (um SELECT ... IN por página).
+    """
+    keyset_columns: Tuple[str, ...] = ("id",)
+    carregar: Tuple[str, ...] = ()
+    recurso_cache: Optional[str] = None
+
+    def __init__(self, model: Type[ModelType]):
+        self.model = model
+
+    def marcar_alteracao(self, db: AsyncSession) -> None:
+        if self.recurso_cache:
+            cache_respostas.marcar(db, self.recurso_cache)
+
+    def _select(self) -> Select:
+        return select(self.model).options(
+            *[selectinload(getattr(self.model, nome)) for nome in self.carregar]
+        )
+
+    async def get(self, db: AsyncSession, id: Any) -> Optional[ModelType]:
+        return await db.scalar(self._select().filter(self.model.id == id))
+
+    async def get_multi(
+        self, db: AsyncSession, *, skip: int = 0, limit: int = 100, statement: Optional[Select] = None
+    ) -> List[ModelType]:
+        if statement is None:
+            statement = self._select()
+        return list((await db.scalars(statement.offset(skip).limit(limit))).all())
+
+    async def get_multi_keyset(
+        self,
+        db: AsyncSession,
+        *,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        statement: Optional[Select] = None
+    ) -> Tuple[List[ModelType], Optional[str]]:
+        """Página por cursor; retorna os itens e o cursor da próxima página (None no fim)"""
+        if statement is None:
+            statement = self._select()
+        columns = [getattr(self.model, name) for name in self.keyset_columns]
+        return await paginate_keyset_async(db, statement, columns, cursor=cursor, limit=limit)
+
+    async def get_page(
+        self,
+        db: AsyncSession,
+        *,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        count: ModoContagem = ModoContagem.EXACT,
+        statement: Optional[Select] = None
+    ) -> Pagina:
+        """Página e total numa chamada só (ver CRUDBase.get_page)"""
+        if statement is None:
+            statement = self._select()
+        if cursor is None:
+            return await paginate_offset_async(db, statement, skip=skip, limit=limit, modo=count)
+        items, next_cursor = await self.get_multi_keyset(db, cursor=cursor, limit=limit, statement=statement)
+        return Pagina(items, await count_total_async(db, statement, count), next_cursor)
+
+    async def _recarregar(self, db: AsyncSession, db_obj: ModelType) -> ModelType:
+        # Relê colunas geradas no banco e os relacionamentos de `carregar`
+        return await db.scalar(
+            self._select().filter(self.model.id == db_obj.id).execution_options(populate_existing=True)
+        )
+
+    async def create(self, db: AsyncSession, *, obj_in: CreateSchemaType) -> ModelType:
+        db_obj = self.model(**jsonable_encoder(obj_in))
+        db.add(db_obj)
+        self.marcar_alteracao(db)
+        await db.commit()
+        return await self._recarregar(db, db_obj)
+
+    async def update(
+        self,
+        db: AsyncSession,
+        *,
+        db_obj: ModelType,
+        obj_in: Union[UpdateSchemaType, Dict[str, Any]]
+    ) -> ModelType:
+        if isinstance(obj_in, dict):
+            update_data = obj_in
+        else:
+            update_data = obj_in.dict(exclude_unset=True)
+        alterados = CRUDBase.campos_alterados(db_obj, update_data)
+        if not alterados:
+            return db_obj
+        for field, value in alterados.items():
+            setattr(db_obj, field, value)
+        db.add(db_obj)
+        self.marcar_alteracao(db)
+        await db.commit()
+        return await self._recarregar(db, db_obj)
+
+    async def remove(self, db: AsyncSession, *, id: int) -> ModelType:
+        obj = await db.get(self.model, id)
+        await db.delete(obj)
+        self.marcar_alteracao(db)
+        await db.commit()
+        return obj
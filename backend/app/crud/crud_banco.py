@@ -0,0 +1,39 @@
+from typing import Optional
+from sqlalchemy import or_
+from sqlalchemy.orm import Query, Session
+
+from app.core import cache_respostas
+from app.crud.base import CRUDBase
+from app.db.pagination import ModoContagem, Pagina
+from app.models.banco import Banco
+from app.schemas.banco import BancoCreate, BancoUpdate
+
+class CRUDBanco(CRUDBase[Banco, BancoCreate, BancoUpdate]):
+    recurso_cache = cache_respostas.BANCOS
+
+    def get_by_codigo(self, db: Session, *, codigo: str) -> Optional[Banco]:
+        return db.query(Banco).filter(Banco.codigo == codigo).first()
+    
+    def _query_with_search(self, db: Session, *, search: Optional[str] = None) -> Query:
+        query = db.query(self.model)
+        
+        if search:
+            query = query.filter(or_(Banco.codigo.ilike(f"%{search}%"), Banco.nome.ilike(f"%{search}%")))
+        
+        return query
+    
+    def get_page_with_search(
+        self, 
+        db: Session, 
+        *, 
+        skip: int = 0, 
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        count: ModoContagem = ModoContagem.EXACT,
+        search: Optional[str] = None
+    ) -> Pagina:
+        """Página filtrada e total na mesma ida ao banco"""
+        query = self._query_with_search(db, search=search)
+        return self.get_page(db, skip=skip, limit=limit, cursor=cursor, count=count, query=query)
+
+banco = CRUDBanco(Banco)
@@ -1,12 +1,39 @@
-from typing import List, Optional
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple, Type
 from datetime import datetime, date
-from sqlalchemy.orm import Session
-from sqlalchemy import or_
+from pydantic import BaseModel
+from sqlalchemy import func
+from sqlalchemy.exc import DataError, IntegrityError, SQLAlchemyError
+from sqlalchemy.orm import Query, Session
 
+from app.core.config import settings
+from app.core.hashing import hash_conteudo
 from app.crud.base import CRUDBase
+from app.db.pagination import ModoContagem, Pagina
+from app.db.projecao import projetar
+from app.db.search import aplicar_busca
 from app.models.empresa import Empresa
 from app.schemas.empresa import EmpresaCreate, EmpresaUpdate, EmpresaOmieImport
 
+# Padrões aplicados na criação quando o Omie não envia o campo
+PADROES_OMIE = {
+    "codigo_pais": "1058",
+    "optante_simples_nacional": "N",
+    "tipo_atividade": "0",
+    "codigo_regime_tributario": "1",
+    "inativo": "N",
+    "bloqueado": "N",
+}
+
+# Na atualização, campo vazio no Omie mantém o valor atual
+MANTER_SE_VAZIO = tuple(PADROES_OMIE) + ("data_abertura",)
+
+class ResultadoUpsert(NamedTuple):
+    inseridas: List[Tuple[int, str]]  # (id, razão social)
+    atualizadas: List[Tuple[int, str]]
+    erros: List[str]
+    inalteradas: List[Tuple[int, str]]  # mesmo hash_omie, não regravadas
+    transitorios: List[str]  # erros que podem passar numa nova tentativa (também em `erros`)
+
 class CRUDEmpresa(CRUDBase[Empresa, EmpresaCreate, EmpresaUpdate]):
     def get_by_cnpj(self, db: Session, *, cnpj: str) -> Optional[Empresa]:
         return db.query(Empresa).filter(Empresa.cnpj == cnpj).first()
@@ -17,56 +44,42 @@ class CRUDEmpresa(CRUDBase[Empresa, EmpresaCreate, EmpresaUpdate]):
     def get_by_codigo_integracao(self, db: Session, *, codigo_cliente_integracao: str) -> Optional[Empresa]:
         return db.query(Empresa).filter(Empresa.codigo_cliente_integracao == codigo_cliente_integracao).first()
     
-    def get_multi_with_search(
-        self, 
-        db: Session, 
-        *, 
-        skip: int = 0, 
-        limit: int = 100,
-        search: Optional[str] = None,
-        ativo_apenas: bool = False
-    ) -> List[Empresa]:
+    def _query_with_search(
+        self, db: Session, *, search: Optional[str] = None, ativo_apenas: bool = False
+    ) -> Query:
         query = db.query(self.model)
         
         if ativo_apenas:
             query = query.filter(Empresa.inativo == "N")
         
-        if search:
-            search_filter = or_(
-                Empresa.razao_social.ilike(f"%{search}%"),
-                Empresa.nome_fantasia.ilike(f"%{search}%"),
-                Empresa.cnpj.ilike(f"%{search}%"),
-                Empresa.codigo_cliente_integracao.ilike(f"%{search}%")
-            )
-            query = query.filter(search_filter)
-        
-        return query.offset(skip).limit(limit).all()
+        return aplicar_busca(query, Empresa, search)
     
-    def count_with_search(
+    def get_page_with_search(
         self, 
         db: Session, 
         *, 
+        skip: int = 0, 
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        count: ModoContagem = ModoContagem.EXACT,
         search: Optional[str] = None,
-        ativo_apenas: bool = False
-    ) -> int:
-        query = db.query(self.model)
-        
-        if ativo_apenas:
-            query = query.filter(Empresa.inativo == "N")
-        
-        if search:
-            search_filter = or_(
-                Empresa.razao_social.ilike(f"%{search}%"),
-                Empresa.nome_fantasia.ilike(f"%{search}%"),
-                Empresa.cnpj.ilike(f"%{search}%"),
-                Empresa.codigo_cliente_integracao.ilike(f"%{search}%")
-            )
-            query = query.filter(search_filter)
-        
-        return query.count()
+        ativo_apenas: bool = False,
+        projecao: Optional[Type[BaseModel]] = None,
+        campos: Optional[Sequence[str]] = None
+    ) -> Pagina:
+        """
+        Página filtrada e total na mesma ida ao banco. Com `projecao` (schema
+        de resposta) os itens vêm como dicionários só com as colunas do schema,
+        ou só com `campos` (fields=) quando informados.
+        """
+        query = self._query_with_search(db, search=search, ativo_apenas=ativo_apenas)
+        if projecao is not None:
+            query = projetar(query, Empresa, projecao, campos)
+        return self.get_page(db, skip=skip, limit=limit, cursor=cursor, count=count, query=query)
     
-    def create_from_omie(self, db: Session, *, obj_in: EmpresaOmieImport) -> Empresa:
-        """Criar empresa a partir dos dados da API Omie"""
+    def _omie_to_dict(self, obj_in: EmpresaOmieImport) -> Dict[str, Any]:
+        """Mapear o registro do Omie para as colunas da tabela (sem aplicar padrões)"""
+        dados = obj_in.dict()
         # Converter data de abertura se fornecida
         data_abertura = None
         if obj_in.data_abertura:
@@ -75,46 +88,15 @@ class CRUDEmpresa(CRUDBase[Empresa, EmpresaCreate, EmpresaUpdate]):
                 data_abertura = datetime.strptime(obj_in.data_abertura, "%d/%m/%Y").date()
             except ValueError:
                 pass  # Ignora se não conseguir converter
-        
-        empresa_data = {
-            "codigo_cliente_omie": obj_in.codigo_cliente_omie,
-            "codigo_cliente_integracao": obj_in.codigo_cliente_integracao,
-            "razao_social": obj_in.razao_social,
-            "nome_fantasia": obj_in.nome_fantasia,
-            "cnpj": obj_in.cnpj,
-            "inscricao_estadual": obj_in.inscricao_estadual,
-            "inscricao_municipal": obj_in.inscricao_municipal,
-            "inscricao_suframa": obj_in.inscricao_suframa,
-            "endereco": obj_in.endereco,
-            "endereco_numero": obj_in.endereco_numero,
-            "bairro": obj_in.bairro,
-            "complemento": obj_in.complemento,
-            "cidade": obj_in.cidade,
-            "estado": obj_in.estado,
-            "cep": obj_in.cep,
-            "codigo_pais": obj_in.codigo_pais or "1058",
-            "telefone1_ddd": obj_in.telefone1_ddd,
-            "telefone1_numero": obj_in.telefone1_numero,
-            "telefone2_ddd": obj_in.telefone2_ddd,
-            "telefone2_numero": obj_in.telefone2_numero,
-            "fax_ddd": obj_in.fax_ddd,
-            "fax_numero": obj_in.fax_numero,
-            "email": obj_in.email,
-            "homepage": obj_in.homepage,
-            "optante_simples_nacional": obj_in.optante_simples_nacional or "N",
-            "data_abertura": data_abertura,
-            "cnae": obj_in.cnae,
-            "tipo_atividade": obj_in.tipo_atividade or "0",
-            "codigo_regime_tributario": obj_in.codigo_regime_tributario or "1",
-            "codigo_banco": obj_in.codigo_banco,
-            "agencia": obj_in.agencia,
-            "conta_corrente": obj_in.conta_corrente,
-            "doc_titular": obj_in.doc_titular,
-            "nome_titular": obj_in.nome_titular,
-            "observacoes": obj_in.observacoes,
-            "inativo": obj_in.inativo or "N",
-            "bloqueado": obj_in.bloqueado or "N"
-        }
+        dados["data_abertura"] = data_abertura
+        return dados
+    
+    def create_from_omie(self, db: Session, *, obj_in: EmpresaOmieImport) -> Empresa:
+        """Criar empresa a partir dos dados da API Omie"""
+        empresa_data = self._omie_to_dict(obj_in)
+        empresa_data["hash_omie"] = hash_conteudo(empresa_data)
+        for campo, padrao in PADROES_OMIE.items():
+            empresa_data[campo] = empresa_data[campo] or padrao
         
         db_obj = Empresa(**empresa_data)
         db.add(db_obj)
@@ -123,55 +105,146 @@ class CRUDEmpresa(CRUDBase[Empresa, EmpresaCreate, EmpresaUpdate]):
         return db_obj
     
     def update_from_omie(self, db: Session, *, db_obj: Empresa, obj_in: EmpresaOmieImport) -> Empresa:
-        """Atualizar empresa com dados da API Omie"""
-        # Converter data de abertura se fornecida
-        data_abertura = db_obj.data_abertura
-        if obj_in.data_abertura:
-            try:
-                # Formato esperado: DD/MM/AAAA
-                data_abertura = datetime.strptime(obj_in.data_abertura, "%d/%m/%Y").date()
-            except ValueError:
-                pass  # Mantém o valor atual se não conseguir converter
+        """Atualizar empresa com dados da API Omie; sem alteração no Omie não grava nada"""
+        update_data = self._omie_to_dict(obj_in)
+        update_data["hash_omie"] = hash_conteudo(update_data)
+        if db_obj.hash_omie == update_data["hash_omie"]:
+            return db_obj
+        del update_data["codigo_cliente_omie"]
+        # Campo vazio no Omie mantém o valor atual
+        for campo in MANTER_SE_VAZIO:
+            update_data[campo] = update_data[campo] or getattr(db_obj, campo)
+        
+        return self.update(db, db_obj=db_obj, obj_in=update_data)
+    
+    def bulk_upsert_from_omie(
+        self, db: Session, *, objs_in: List[EmpresaOmieImport], batch_size: Optional[int] = None
+    ) -> ResultadoUpsert:
+        """
+        Gravar empresas do Omie em lote, numa única transação.
+        
+        Os códigos já existentes são carregados com uma consulta por lote;
+        registros cujo hash_omie não mudou são pulados (`inalteradas`) e o
+        restante vira um INSERT ... ON CONFLICT (codigo_cliente_omie) DO
+        UPDATE. Se o lote falhar por outra restrição (CNPJ ou código de
+        integração duplicado), ele é regravado linha a linha dentro de
+        savepoints, de modo que só as linhas com problema entram em `erros`.
+        """
+        batch_size = batch_size or settings.OMIE_SYNC_BATCH_SIZE
+        resultado = ResultadoUpsert([], [], [], [], [])
+        
+        # Se o Omie repetir um código, vale o último registro
+        objs = list({obj.codigo_cliente_omie: obj for obj in objs_in}.values())
+        for inicio in range(0, len(objs), batch_size):
+            self._upsert_lote(db, objs[inicio:inicio + batch_size], resultado)
         
-        update_data = {
-            "codigo_cliente_integracao": obj_in.codigo_cliente_integracao,
-            "razao_social": obj_in.razao_social,
-            "nome_fantasia": obj_in.nome_fantasia,
-            "cnpj": obj_in.cnpj,
-            "inscricao_estadual": obj_in.inscricao_estadual,
-            "inscricao_municipal": obj_in.inscricao_municipal,
-            "inscricao_suframa": obj_in.inscricao_suframa,
-            "endereco": obj_in.endereco,
-            "endereco_numero": obj_in.endereco_numero,
-            "bairro": obj_in.bairro,
-            "complemento": obj_in.complemento,
-            "cidade": obj_in.cidade,
-            "estado": obj_in.estado,
-            "cep": obj_in.cep,
-            "codigo_pais": obj_in.codigo_pais or db_obj.codigo_pais,
-            "telefone1_ddd": obj_in.telefone1_ddd,
-            "telefone1_numero": obj_in.telefone1_numero,
-            "telefone2_ddd": obj_in.telefone2_ddd,
-            "telefone2_numero": obj_in.telefone2_numero,
-            "fax_ddd": obj_in.fax_ddd,
-            "fax_numero": obj_in.fax_numero,
-            "email": obj_in.email,
-            "homepage": obj_in.homepage,
-            "optante_simples_nacional": obj_in.optante_simples_nacional or db_obj.optante_simples_nacional,
-            "data_abertura": data_abertura,
-            "cnae": obj_in.cnae,
-            "tipo_atividade": obj_in.tipo_atividade or db_obj.tipo_atividade,
-            "codigo_regime_tributario": obj_in.codigo_regime_tributario or db_obj.codigo_regime_tributario,
-            "codigo_banco": obj_in.codigo_banco,
-            "agencia": obj_in.agencia,
-            "conta_corrente": obj_in.conta_corrente,
-            "doc_titular": obj_in.doc_titular,
-            "nome_titular": obj_in.nome_titular,
-            "observacoes": obj_in.observacoes,
-            "inativo": obj_in.inativo or db_obj.inativo,
-            "bloqueado": obj_in.bloqueado or db_obj.bloqueado
+        db.commit()
+        return resultado
+    
+    def _upsert_lote(self, db: Session, lote: List[EmpresaOmieImport], resultado: ResultadoUpsert) -> None:
+        codigos = [obj.codigo_cliente_omie for obj in lote]
+        existentes = {
+            codigo: (id, razao_social, hash_omie) for codigo, id, razao_social, hash_omie in
+            db.query(
+                Empresa.codigo_cliente_omie, Empresa.id, Empresa.razao_social, Empresa.hash_omie
+            ).filter(Empresa.codigo_cliente_omie.in_(codigos))
         }
+        cnpjs = [obj.cnpj for obj in lote if obj.cnpj]
+        donos_cnpj = {
+            cnpj: (codigo, razao_social) for cnpj, codigo, razao_social in
+            db.query(Empresa.cnpj, Empresa.codigo_cliente_omie, Empresa.razao_social)
+            .filter(Empresa.cnpj.in_(cnpjs))
+        } if cnpjs else {}
         
-        return self.update(db, db_obj=db_obj, obj_in=update_data)
+        linhas = []
+        for obj in lote:
+            linha = self._omie_to_dict(obj)
+            hash_omie = hash_conteudo(linha)
+            existente = existentes.get(obj.codigo_cliente_omie)
+            if existente and existente[2] == hash_omie:
+                resultado.inalteradas.append((existente[0], existente[1]))
+                continue
+            
+            dono = donos_cnpj.get(obj.cnpj) if obj.cnpj else None
+            if dono and dono[0] != obj.codigo_cliente_omie:
+                resultado.erros.append(f"CNPJ {obj.cnpj} já existe no sistema (Empresa: {dono[1]})")
+                continue
+            linha["hash_omie"] = hash_omie
+            if obj.codigo_cliente_omie in existentes:
+                # NULL faz o ON CONFLICT manter o valor atual (coalesce abaixo)
+                for campo in MANTER_SE_VAZIO:
+                    linha[campo] = linha[campo] or None
+            else:
+                for campo, padrao in PADROES_OMIE.items():
+                    linha[campo] = linha[campo] or padrao
+            linhas.append(linha)
+        
+        if not linhas:
+            return
+        
+        try:
+            with db.begin_nested():
+                gravadas = self._executar_upsert(db, linhas)
+        except SQLAlchemyError:
+            gravadas = []
+            for linha in linhas:
+                try:
+                    with db.begin_nested():
+                        gravadas.extend(self._executar_upsert(db, [linha]))
+                except SQLAlchemyError as e:
+                    erro = getattr(e, "orig", None) or e
+                    mensagem = f"Erro ao processar empresa {linha['razao_social']}: {erro}"
+                    resultado.erros.append(mensagem)
+                    # Restrição ou dado inválido falha de novo com o mesmo registro; o resto não
+                    if not isinstance(e, (IntegrityError, DataError)):
+                        resultado.transitorios.append(mensagem)
+        
+        for id, codigo, razao_social in gravadas:
+            destino = resultado.atualizadas if codigo in existentes else resultado.inseridas
+            destino.append((id, razao_social))
+    
+    def _executar_upsert(self, db: Session, linhas: List[Dict[str, Any]]) -> List[Tuple[int, int, str]]:
+        dialeto = db.get_bind().dialect.name
+        if dialeto == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        elif dialeto == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            return self._executar_upsert_orm(db, linhas)
+        
+        colunas = Empresa.__table__.c
+        stmt = insert(Empresa).values(linhas)
+        set_ = {
+            campo: stmt.excluded[campo] for campo in linhas[0] if campo != "codigo_cliente_omie"
+        }
+        for campo in MANTER_SE_VAZIO:
+            set_[campo] = func.coalesce(stmt.excluded[campo], colunas[campo])
+        set_["updated_at"] = func.now()
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[colunas.codigo_cliente_omie], set_=set_
+        ).returning(colunas.id, colunas.codigo_cliente_omie, colunas.razao_social)
+        return [tuple(row) for row in db.execute(stmt)]
+    
+    def _executar_upsert_orm(self, db: Session, linhas: List[Dict[str, Any]]) -> List[Tuple[int, int, str]]:
+        """Caminho genérico para bancos sem ON CONFLICT"""
+        codigos = [linha["codigo_cliente_omie"] for linha in linhas]
+        existentes = {
+            obj.codigo_cliente_omie: obj for obj in
+            db.query(Empresa).filter(Empresa.codigo_cliente_omie.in_(codigos))
+        }
+        objs = []
+        for linha in linhas:
+            db_obj = existentes.get(linha["codigo_cliente_omie"])
+            if db_obj is None:
+                db_obj = Empresa(**linha)
+                db.add(db_obj)
+            else:
+                for campo, valor in linha.items():
+                    if campo in MANTER_SE_VAZIO and not valor:
+                        continue
+                    setattr(db_obj, campo, valor)
+            objs.append(db_obj)
+        db.flush()
+        return [(obj.id, obj.codigo_cliente_omie, obj.razao_social) for obj in objs]
 
 empresa = CRUDEmpresa(Empresa)
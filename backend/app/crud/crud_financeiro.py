@@ -1,9 +1,17 @@
-from typing import List, Optional
-from sqlalchemy.orm import Session
-from app.crud.base import CRUDBase
+from datetime import date
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+from sqlalchemy import Select, case, delete, func, literal, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Query, Session
+from app.core import cache_respostas
+from app.crud.base import AsyncCRUDBase, CRUDBase
+from app.db.search import aplicar_busca
+from app.services import fluxo_caixa, saldos
 from app.models.financeiro import (
     ContaPagar, ContaReceber, ContaCorrente, Categoria, 
-    ClienteFornecedor, ContatoClienteFornecedor, AnexoClienteFornecedor, Pagamento
+    ClienteFornecedor, ContatoClienteFornecedor, AnexoClienteFornecedor, Pagamento,
+    StatusConta
 )
 from app.schemas.financeiro import (
     ContaPagarCreate, ContaPagarUpdate,
@@ -17,28 +25,47 @@ from app.schemas.financeiro import (
 )
 
 class CRUDContaPagar(CRUDBase[ContaPagar, ContaPagarCreate, ContaPagarUpdate]):
+    keyset_columns = ("data_vencimento", "id")
+    recurso_cache = cache_respostas.LANCAMENTOS
+
+    def _query_by_user(self, db: Session, *, user_id: int) -> Query:
+        return db.query(ContaPagar).filter(ContaPagar.user_id == user_id)
+
+    def get_for_update(self, db: Session, *, id: int) -> Optional[ContaPagar]:
+        """Carregar a conta travando a linha até o fim da transação (SELECT ... FOR UPDATE)"""
+        return db.query(ContaPagar).filter(ContaPagar.id == id).with_for_update().first()
+
     def get_multi_by_user(
         self, db: Session, *, user_id: int, skip: int = 0, limit: int = 100
     ) -> List[ContaPagar]:
         return (
-            db.query(ContaPagar)
-            .filter(ContaPagar.user_id == user_id)
+            self._query_by_user(db, user_id=user_id)
             .offset(skip)
             .limit(limit)
             .all()
         )
 
+    def get_multi_by_user_keyset(
+        self, db: Session, *, user_id: int, cursor: Optional[str] = None, limit: int = 100
+    ) -> Tuple[List[ContaPagar], Optional[str]]:
+        return self.get_multi_keyset(
+            db, cursor=cursor, limit=limit, query=self._query_by_user(db, user_id=user_id)
+        )
+
     def create_with_user(
         self, db: Session, *, obj_in: ContaPagarCreate, user_id: int
     ) -> ContaPagar:
         obj_in_data = obj_in.dict()
         db_obj = self.model(**obj_in_data, user_id=user_id)
         db.add(db_obj)
+        self.marcar_alteracao(db)
         db.commit()
         db.refresh(db_obj)
         return db_obj
 
 class CRUDContaReceber(CRUDBase[ContaReceber, ContaReceberCreate, ContaReceberUpdate]):
+    recurso_cache = cache_respostas.LANCAMENTOS
+
     def get_multi_by_user(
         self, db: Session, *, user_id: int, skip: int = 0, limit: int = 100
     ) -> List[ContaReceber]:
@@ -56,50 +83,143 @@ class CRUDContaReceber(CRUDBase[ContaReceber, ContaReceberCreate, ContaReceberUp
         obj_in_data = obj_in.dict()
         db_obj = self.model(**obj_in_data, user_id=user_id)
         db.add(db_obj)
+        self.marcar_alteracao(db)
         db.commit()
         db.refresh(db_obj)
         return db_obj
 
 class CRUDContaCorrente(CRUDBase[ContaCorrente, ContaCorrenteCreate, ContaCorrenteUpdate]):
+    # saldo_atual é mantido pelos lançamentos (app.services.saldos), não pelo cadastro
+    recurso_cache = cache_respostas.CONTAS_CORRENTE
+
+    def create(self, db: Session, *, obj_in: ContaCorrenteCreate) -> ContaCorrente:
+        obj_in_data = obj_in.dict()
+        obj_in_data["saldo_atual"] = obj_in_data["saldo_inicial"]
+        db_obj = self.model(**obj_in_data)
+        db.add(db_obj)
+        self.marcar_alteracao(db)
+        db.commit()
+        db.refresh(db_obj)
+        return db_obj
+
+    def update(
+        self, db: Session, *, db_obj: ContaCorrente, obj_in: Union[ContaCorrenteUpdate, Dict[str, Any]]
+    ) -> ContaCorrente:
+        if isinstance(obj_in, dict):
+            update_data = dict(obj_in)
+        else:
+            update_data = obj_in.dict(exclude_unset=True)
+        update_data.pop("saldo_atual", None)
+        novo_inicial = update_data.get("saldo_inicial")
+        if novo_inicial is not None and novo_inicial != db_obj.saldo_inicial:
+            # Relê o saldo com a linha travada: um lançamento simultâneo não se perde
+            db.query(ContaCorrente).filter(ContaCorrente.id == db_obj.id).with_for_update().populate_existing().first()
+            update_data["saldo_atual"] = (db_obj.saldo_atual or 0) + novo_inicial - (db_obj.saldo_inicial or 0)
+        return super().update(db, db_obj=db_obj, obj_in=update_data)
+
+    def get_saldo_em(self, db: Session, *, db_obj: ContaCorrente, data: date) -> Decimal:
+        return saldos.saldo_em(db, conta=db_obj, data=data)
+
+    def _query_ativas(self, db: Session) -> Query:
+        return db.query(ContaCorrente).filter(ContaCorrente.ativa == True)
+
     def get_ativas(self, db: Session, *, skip: int = 0, limit: int = 100) -> List[ContaCorrente]:
         return (
-            db.query(ContaCorrente)
-            .filter(ContaCorrente.ativa == True)
+            self._query_ativas(db)
             .offset(skip)
             .limit(limit)
             .all()
         )
 
+    def get_ativas_keyset(
+        self, db: Session, *, cursor: Optional[str] = None, limit: int = 100
+    ) -> Tuple[List[ContaCorrente], Optional[str]]:
+        return self.get_multi_keyset(db, cursor=cursor, limit=limit, query=self._query_ativas(db))
+
 class CRUDCategoria(CRUDBase[Categoria, CategoriaCreate, CategoriaUpdate]):
+    recurso_cache = cache_respostas.CATEGORIAS
+
+    def _query_ativas(self, db: Session) -> Query:
+        return db.query(Categoria).filter(Categoria.ativa == True)
+
     def get_ativas(self, db: Session, *, skip: int = 0, limit: int = 100) -> List[Categoria]:
         return (
-            db.query(Categoria)
-            .filter(Categoria.ativa == True)
+            self._query_ativas(db)
             .offset(skip)
             .limit(limit)
             .all()
         )
 
+    def get_ativas_keyset(
+        self, db: Session, *, cursor: Optional[str] = None, limit: int = 100
+    ) -> Tuple[List[Categoria], Optional[str]]:
+        return self.get_multi_keyset(db, cursor=cursor, limit=limit, query=self._query_ativas(db))
+
 class CRUDClienteFornecedor(CRUDBase[ClienteFornecedor, ClienteFornecedorCreate, ClienteFornecedorUpdate]):
-    def get_clientes(self, db: Session, *, skip: int = 0, limit: int = 100) -> List[ClienteFornecedor]:
+    # `campos` (fields=): só essas colunas e relacionamentos são carregados (CRUDBase.opcoes_campos)
+
+    def _query_with_search(
+        self, db: Session, *, search: Optional[str] = None, campos: Optional[Sequence[str]] = None
+    ) -> Query:
+        query = db.query(ClienteFornecedor).options(*self.opcoes_campos(campos))
+        return aplicar_busca(query, ClienteFornecedor, search)
+
+    def _query_clientes(
+        self, db: Session, *, search: Optional[str] = None, campos: Optional[Sequence[str]] = None
+    ) -> Query:
         return (
-            db.query(ClienteFornecedor)
+            self._query_with_search(db, search=search, campos=campos)
             .filter(ClienteFornecedor.eh_cliente == True)
             .filter(ClienteFornecedor.ativo == True)
-            .offset(skip)
-            .limit(limit)
-            .all()
         )
-    
-    def get_fornecedores(self, db: Session, *, skip: int = 0, limit: int = 100) -> List[ClienteFornecedor]:
+
+    def _query_fornecedores(
+        self, db: Session, *, search: Optional[str] = None, campos: Optional[Sequence[str]] = None
+    ) -> Query:
         return (
-            db.query(ClienteFornecedor)
+            self._query_with_search(db, search=search, campos=campos)
             .filter(ClienteFornecedor.eh_fornecedor == True)
             .filter(ClienteFornecedor.ativo == True)
-            .offset(skip)
-            .limit(limit)
-            .all()
         )
+
+    def get_multi_with_search(
+        self, db: Session, *, skip: int = 0, limit: int = 100, search: Optional[str] = None,
+        campos: Optional[Sequence[str]] = None
+    ) -> List[ClienteFornecedor]:
+        return self._query_with_search(db, search=search, campos=campos).offset(skip).limit(limit).all()
+
+    def get_multi_with_search_keyset(
+        self, db: Session, *, cursor: Optional[str] = None, limit: int = 100, search: Optional[str] = None,
+        campos: Optional[Sequence[str]] = None
+    ) -> Tuple[List[ClienteFornecedor], Optional[str]]:
+        query = self._query_with_search(db, search=search, campos=campos)
+        return self.get_multi_keyset(db, cursor=cursor, limit=limit, query=query)
+
+    def get_clientes(
+        self, db: Session, *, skip: int = 0, limit: int = 100, search: Optional[str] = None,
+        campos: Optional[Sequence[str]] = None
+    ) -> List[ClienteFornecedor]:
+        return self._query_clientes(db, search=search, campos=campos).offset(skip).limit(limit).all()
+    
+    def get_fornecedores(
+        self, db: Session, *, skip: int = 0, limit: int = 100, search: Optional[str] = None,
+        campos: Optional[Sequence[str]] = None
+    ) -> List[ClienteFornecedor]:
+        return self._query_fornecedores(db, search=search, campos=campos).offset(skip).limit(limit).all()
+
+    def get_clientes_keyset(
+        self, db: Session, *, cursor: Optional[str] = None, limit: int = 100, search: Optional[str] = None,
+        campos: Optional[Sequence[str]] = None
+    ) -> Tuple[List[ClienteFornecedor], Optional[str]]:
+        query = self._query_clientes(db, search=search, campos=campos)
+        return self.get_multi_keyset(db, cursor=cursor, limit=limit, query=query)
+
+    def get_fornecedores_keyset(
+        self, db: Session, *, cursor: Optional[str] = None, limit: int = 100, search: Optional[str] = None,
+        campos: Optional[Sequence[str]] = None
+    ) -> Tuple[List[ClienteFornecedor], Optional[str]]:
+        query = self._query_fornecedores(db, search=search, campos=campos)
+        return self.get_multi_keyset(db, cursor=cursor, limit=limit, query=query)
     
     def get_by_cpf_cnpj(self, db: Session, *, cpf_cnpj: str) -> Optional[ClienteFornecedor]:
         return db.query(ClienteFornecedor).filter(ClienteFornecedor.cpf_cnpj == cpf_cnpj).first()
@@ -125,6 +245,15 @@ class CRUDAnexoClienteFornecedor(CRUDBase[AnexoClienteFornecedor, AnexoClienteFo
         )
 
 class CRUDPagamento(CRUDBase[Pagamento, PagamentoCreate, PagamentoUpdate]):
+    """
+    Os pagamentos mantêm `valor_pago` e `status` da conta a pagar. Cada
+    operação roda numa única transação: quem chama trava a conta com
+    `crud_conta_pagar.get_for_update` antes, e o total é recalculado por um
+    UPDATE com SUM no banco, de modo que pagamentos simultâneos da mesma
+    conta são serializados e nenhum se perde.
+    """
+    recurso_cache = cache_respostas.LANCAMENTOS
+
     def get_by_conta_pagar(
         self, db: Session, *, conta_pagar_id: int
     ) -> List[Pagamento]:
@@ -133,6 +262,20 @@ class CRUDPagamento(CRUDBase[Pagamento, PagamentoCreate, PagamentoUpdate]):
             .filter(Pagamento.conta_pagar_id == conta_pagar_id)
             .all()
         )
+
+    def get_for_update(self, db: Session, *, id: int) -> Optional[Pagamento]:
+        """
+        Reler o pagamento travando a linha. Chamar depois de travar a conta a
+        pagar: os valores vêm do banco (não do identity map), então uma edição
+        ou exclusão concorrente já confirmada é vista aqui.
+        """
+        return (
+            db.query(Pagamento)
+            .filter(Pagamento.id == id)
+            .with_for_update()
+            .populate_existing()
+            .first()
+        )
     
     def create_with_user(
         self, db: Session, *, obj_in: PagamentoCreate, user_id: int
@@ -140,10 +283,146 @@ class CRUDPagamento(CRUDBase[Pagamento, PagamentoCreate, PagamentoUpdate]):
         obj_in_data = obj_in.dict()
         db_obj = self.model(**obj_in_data, user_id=user_id)
         db.add(db_obj)
+        db.flush()
+        self._recalcular_conta_pagar(db, conta_pagar_id=db_obj.conta_pagar_id)
+        saldos.movimentar(
+            db, conta_corrente_id=db_obj.conta_corrente_id, data=db_obj.data_pagamento, valor=-db_obj.valor
+        )
+        self.marcar_alteracao(db)
+        db.commit()
+        db.refresh(db_obj)
+        return db_obj
+
+    def update(
+        self, db: Session, *, db_obj: Pagamento, obj_in: Union[PagamentoUpdate, Dict[str, Any]]
+    ) -> Pagamento:
+        if isinstance(obj_in, dict):
+            update_data = obj_in
+        else:
+            update_data = obj_in.dict(exclude_unset=True)
+        alterados = self.campos_alterados(db_obj, update_data)
+        if not alterados:
+            return db_obj
+        anterior = (db_obj.conta_corrente_id, db_obj.data_pagamento, db_obj.valor)
+        for field, value in alterados.items():
+            setattr(db_obj, field, value)
+        db.flush()
+        if "valor" in alterados:
+            self._recalcular_conta_pagar(db, conta_pagar_id=db_obj.conta_pagar_id)
+        if alterados.keys() & {"valor", "data_pagamento", "conta_corrente_id"}:
+            # Estornar o lançamento antigo e lançar o novo
+            saldos.aplicar_lancamentos(db, [
+                anterior,
+                (db_obj.conta_corrente_id, db_obj.data_pagamento, -db_obj.valor),
+            ])
+        self.marcar_alteracao(db)
         db.commit()
         db.refresh(db_obj)
         return db_obj
 
+    def remove(self, db: Session, *, id: int) -> Optional[Pagamento]:
+        """Excluir e estornar o lançamento; None se outra transação já excluiu"""
+        obj = self.get_for_update(db, id=id)
+        if obj is None:
+            return None
+        excluidos = db.execute(
+            delete(Pagamento).where(Pagamento.id == id).execution_options(synchronize_session=False)
+        ).rowcount
+        if excluidos != 1:
+            # Sem linha excluída nada é estornado: o saldo não pode ser creditado duas vezes
+            db.rollback()
+            return None
+        db.expunge(obj)
+        self._recalcular_conta_pagar(db, conta_pagar_id=obj.conta_pagar_id)
+        saldos.movimentar(db, conta_corrente_id=obj.conta_corrente_id, data=obj.data_pagamento, valor=obj.valor)
+        self.marcar_alteracao(db)
+        db.commit()
+        return obj
+
+    def _recalcular_conta_pagar(self, db: Session, *, conta_pagar_id: int) -> None:
+        """Gravar a soma dos pagamentos e o status da conta num único UPDATE"""
+        total = (
+            select(func.coalesce(func.sum(Pagamento.valor), 0))
+            .where(Pagamento.conta_pagar_id == ContaPagar.id)
+            .scalar_subquery()
+        )
+        conta = db.get(ContaPagar, conta_pagar_id)
+        antes = fluxo_caixa.contribuicao(conta) if conta is not None else None
+        tipo_status = ContaPagar.status.type
+        status = case(
+            (total >= ContaPagar.valor_original, literal(StatusConta.PAGO, tipo_status)),
+            # Estorno de uma conta quitada a reabre; vencida/cancelada continua como está
+            (ContaPagar.status == StatusConta.PAGO, literal(StatusConta.PENDENTE, tipo_status)),
+            else_=ContaPagar.status
+        )
+        db.execute(
+            update(ContaPagar)
+            .where(ContaPagar.id == conta_pagar_id)
+            .values(valor_pago=total, status=status)
+            .execution_options(synchronize_session="fetch")
+        )
+        # O UPDATE não passa pelo flush do ORM, então o fluxo de caixa é ajustado aqui
+        if conta is not None:
+            fluxo_caixa.registrar_alteracao(db, antes, fluxo_caixa.contribuicao(conta))
+
+# ==================== ASYNC ====================
+# Leituras das listagens e detalhes servidos pelas rotas async def
+
+class AsyncCRUDContaPagar(AsyncCRUDBase[ContaPagar, ContaPagarCreate, ContaPagarUpdate]):
+    keyset_columns = ("data_vencimento", "id")
+    recurso_cache = cache_respostas.LANCAMENTOS
+    # O schema de resposta inclui os pagamentos de cada conta
+    carregar = ("pagamentos",)
+
+    def _select_by_user(self, *, user_id: int) -> Select:
+        return self._select().filter(ContaPagar.user_id == user_id)
+
+    async def get_multi_by_user(
+        self, db: AsyncSession, *, user_id: int, skip: int = 0, limit: int = 100
+    ) -> List[ContaPagar]:
+        return await self.get_multi(db, skip=skip, limit=limit, statement=self._select_by_user(user_id=user_id))
+
+    async def get_multi_by_user_keyset(
+        self, db: AsyncSession, *, user_id: int, cursor: Optional[str] = None, limit: int = 100
+    ) -> Tuple[List[ContaPagar], Optional[str]]:
+        return await self.get_multi_keyset(
+            db, cursor=cursor, limit=limit, statement=self._select_by_user(user_id=user_id)
+        )
+
+class AsyncCRUDContaCorrente(AsyncCRUDBase[ContaCorrente, ContaCorrenteCreate, ContaCorrenteUpdate]):
+    recurso_cache = cache_respostas.CONTAS_CORRENTE
+
+    def _select_ativas(self) -> Select:
+        return self._select().filter(ContaCorrente.ativa == True)
+
+    async def get_ativas(self, db: AsyncSession, *, skip: int = 0, limit: int = 100) -> List[ContaCorrente]:
+        return await self.get_multi(db, skip=skip, limit=limit, statement=self._select_ativas())
+
+    async def get_ativas_keyset(
+        self, db: AsyncSession, *, cursor: Optional[str] = None, limit: int = 100
+    ) -> Tuple[List[ContaCorrente], Optional[str]]:
+        return await self.get_multi_keyset(db, cursor=cursor, limit=limit, statement=self._select_ativas())
+
+class AsyncCRUDCategoria(AsyncCRUDBase[Categoria, CategoriaCreate, CategoriaUpdate]):
+    recurso_cache = cache_respostas.CATEGORIAS
+
+    def _select_ativas(self) -> Select:
+        return self._select().filter(Categoria.ativa == True)
+
+    async def get_ativas(self, db: AsyncSession, *, skip: int = 0, limit: int = 100) -> List[Categoria]:
+        return await self.get_multi(db, skip=skip, limit=limit, statement=self._select_ativas())
+
+    async def get_ativas_keyset(
+        self, db: AsyncSession, *, cursor: Optional[str] = None, limit: int = 100
+    ) -> Tuple[List[Categoria], Optional[str]]:
+        return await self.get_multi_keyset(db, cursor=cursor, limit=limit, statement=self._select_ativas())
+
+class AsyncCRUDPagamento(AsyncCRUDBase[Pagamento, PagamentoCreate, PagamentoUpdate]):
+    # Escritas ficam no CRUDPagamento: recalculam a conta e os saldos na mesma transação
+
+    async def get_by_conta_pagar(self, db: AsyncSession, *, conta_pagar_id: int) -> List[Pagamento]:
+        return list((await db.scalars(self._select().filter(Pagamento.conta_pagar_id == conta_pagar_id))).all())
+
 # Instâncias dos CRUDs
 crud_conta_pagar = CRUDContaPagar(ContaPagar)
 crud_conta_receber = CRUDContaReceber(ContaReceber)
@@ -153,3 +432,8 @@ crud_cliente_fornecedor = CRUDClienteFornecedor(ClienteFornecedor)
 crud_contato_cliente_fornecedor = CRUDContatoClienteFornecedor(ContatoClienteFornecedor)
 crud_anexo_cliente_fornecedor = CRUDAnexoClienteFornecedor(AnexoClienteFornecedor)
 crud_pagamento = CRUDPagamento(Pagamento)
+
+crud_conta_pagar_async = AsyncCRUDContaPagar(ContaPagar)
+crud_conta_corrente_async = AsyncCRUDContaCorrente(ContaCorrente)
+crud_categoria_async = AsyncCRUDCategoria(Categoria)
+crud_pagamento_async = AsyncCRUDPagamento(Pagamento)
@@ -1,10 +1,11 @@
 from typing import List, Optional, Dict, Any
 from datetime import datetime
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Query, Session
 from sqlalchemy import or_
 
 from app.crud.base import CRUDBase
-from app.models.integracao import Integracao
+from app.db.pagination import ModoContagem, Pagina
+from app.models.integracao import Integracao, SincronizacaoWatermark
 from app.schemas.integracao import IntegracaoCreate, IntegracaoUpdate
 
 class CRUDIntegracao(CRUDBase[Integracao, IntegracaoCreate, IntegracaoUpdate]):
@@ -17,16 +18,14 @@ class CRUDIntegracao(CRUDBase[Integracao, IntegracaoCreate, IntegracaoUpdate]):
     def get_ativas(self, db: Session) -> List[Integracao]:
         return db.query(Integracao).filter(Integracao.ativo == True).all()
     
-    def get_multi_with_search(
-        self, 
-        db: Session, 
-        *, 
-        skip: int = 0, 
-        limit: int = 100,
+    def _query_with_search(
+        self,
+        db: Session,
+        *,
         search: Optional[str] = None,
         tipo: Optional[str] = None,
         ativo_apenas: bool = False
-    ) -> List[Integracao]:
+    ) -> Query:
         query = db.query(self.model)
         
         if ativo_apenas:
@@ -43,33 +42,23 @@ class CRUDIntegracao(CRUDBase[Integracao, IntegracaoCreate, IntegracaoUpdate]):
             )
             query = query.filter(search_filter)
         
-        return query.offset(skip).limit(limit).all()
+        return query
     
-    def count_with_search(
+    def get_page_with_search(
         self, 
         db: Session, 
         *, 
+        skip: int = 0, 
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        count: ModoContagem = ModoContagem.EXACT,
         search: Optional[str] = None,
         tipo: Optional[str] = None,
         ativo_apenas: bool = False
-    ) -> int:
-        query = db.query(self.model)
-        
-        if ativo_apenas:
-            query = query.filter(Integracao.ativo == True)
-        
-        if tipo:
-            query = query.filter(Integracao.tipo == tipo)
-        
-        if search:
-            search_filter = or_(
-                Integracao.nome.ilike(f"%{search}%"),
-                Integracao.descricao.ilike(f"%{search}%"),
-                Integracao.tipo.ilike(f"%{search}%")
-            )
-            query = query.filter(search_filter)
-        
-        return query.count()
+    ) -> Pagina:
+        """Página filtrada e total na mesma ida ao banco"""
+        query = self._query_with_search(db, search=search, tipo=tipo, ativo_apenas=ativo_apenas)
+        return self.get_page(db, skip=skip, limit=limit, cursor=cursor, count=count, query=query)
     
     def marcar_como_testado(self, db: Session, *, db_obj: Integracao, sucesso: bool = True) -> Integracao:
         """Marcar integração como testada"""
@@ -85,6 +74,29 @@ class CRUDIntegracao(CRUDBase[Integracao, IntegracaoCreate, IntegracaoUpdate]):
         db.refresh(db_obj)
         return db_obj
     
+    def get_watermark(self, db: Session, *, integracao_id: int, entidade: str) -> Optional[datetime]:
+        """Início (UTC) da última sincronização sem erros transitórios da entidade"""
+        return db.query(SincronizacaoWatermark.sincronizado_ate).filter(
+            SincronizacaoWatermark.integracao_id == integracao_id,
+            SincronizacaoWatermark.entidade == entidade
+        ).scalar()
+    
+    def set_watermark(
+        self, db: Session, *, integracao_id: int, entidade: str, sincronizado_ate: datetime
+    ) -> SincronizacaoWatermark:
+        """Gravar a marca d'água da entidade após uma sincronização sem erros transitórios"""
+        watermark = db.query(SincronizacaoWatermark).filter(
+            SincronizacaoWatermark.integracao_id == integracao_id,
+            SincronizacaoWatermark.entidade == entidade
+        ).first()
+        if watermark is None:
+            watermark = SincronizacaoWatermark(integracao_id=integracao_id, entidade=entidade)
+            db.add(watermark)
+        watermark.sincronizado_ate = sincronizado_ate
+        db.commit()
+        db.refresh(watermark)
+        return watermark
+    
     def get_integracao_omie(self, db: Session) -> Optional[Integracao]:
         """Buscar integração do Omie ativa"""
         return db.query(Integracao).filter(
@@ -0,0 +1,174 @@
+from typing import Any, Dict, List, Optional
+from datetime import datetime, timedelta
+from sqlalchemy import and_, func, or_, update
+from sqlalchemy.orm import Session
+
+from app.crud.base import CRUDBase
+from app.models.job import ExecucaoRotina, Job, StatusJob, STATUS_FINAIS
+from app.schemas.job import JobCreate
+
+class CRUDJob(CRUDBase[Job, JobCreate, JobCreate]):
+    keyset_columns = ("id",)
+
+    def criar(
+        self,
+        db: Session,
+        *,
+        tipo: str,
+        parametros: Optional[Dict[str, Any]] = None,
+        user_id: Optional[int] = None,
+        max_tentativas: int = 3
+    ) -> Job:
+        db_obj = Job(
+            tipo=tipo,
+            status=StatusJob.PENDENTE.value,
+            parametros=parametros or {},
+            resultado={},
+            progresso_atual=0,
+            tentativas=0,
+            max_tentativas=max_tentativas,
+            cancelamento_solicitado=False,
+            user_id=user_id
+        )
+        db.add(db_obj)
+        db.commit()
+        db.refresh(db_obj)
+        return db_obj
+
+    def get_multi_by_user(
+        self, db: Session, *, user_id: Optional[int] = None, status: Optional[str] = None,
+        skip: int = 0, limit: int = 100
+    ) -> List[Job]:
+        """Jobs mais recentes primeiro; sem user_id lista de todos os usuários"""
+        query = db.query(Job)
+        if user_id is not None:
+            query = query.filter(Job.user_id == user_id)
+        if status:
+            query = query.filter(Job.status == status)
+        return query.order_by(Job.id.desc()).offset(skip).limit(limit).all()
+
+    def get_nao_finalizados(self, db: Session) -> List[Job]:
+        """Jobs pendentes ou interrompidos durante a execução"""
+        return (
+            db.query(Job)
+            .filter(Job.status.notin_(STATUS_FINAIS))
+            .order_by(Job.id)
+            .all()
+        )
+
+    def iniciar(self, db: Session, *, id: int, tempo_maximo: int) -> Optional[Job]:
+        """
+        Reservar o job para esta execução com um UPDATE condicional: só passa
+        se estiver pendente ou "executando" há mais de `tempo_maximo` segundos
+        (tentativa abandonada). Entregas duplicadas do mesmo job disputam a
+        mesma linha e só uma recebe o job; as demais recebem None.
+        """
+        agora = datetime.utcnow()
+        resultado = db.execute(
+            update(Job)
+            .where(
+                Job.id == id,
+                or_(
+                    Job.status == StatusJob.PENDENTE.value,
+                    and_(
+                        Job.status == StatusJob.EXECUTANDO.value,
+                        Job.iniciado_em < agora - timedelta(seconds=tempo_maximo),
+                    ),
+                ),
+            )
+            .values(
+                status=StatusJob.EXECUTANDO.value,
+                tentativas=func.coalesce(Job.tentativas, 0) + 1,
+                iniciado_em=agora,
+                mensagem=None,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        if resultado.rowcount != 1:
+            return None
+        return db.query(Job).filter(Job.id == id).populate_existing().first()
+
+    def atualizar_progresso(
+        self,
+        db: Session,
+        *,
+        db_obj: Job,
+        atual: Optional[int] = None,
+        total: Optional[int] = None,
+        contadores: Optional[Dict[str, Any]] = None
+    ) -> Job:
+        if atual is not None:
+            db_obj.progresso_atual = atual
+        if total is not None:
+            db_obj.progresso_total = total
+        if contadores:
+            # Reatribuir o dict para o SQLAlchemy detectar a alteração do JSON
+            db_obj.resultado = {**(db_obj.resultado or {}), **contadores}
+        db.commit()
+        db.refresh(db_obj)
+        return db_obj
+
+    def finalizar(
+        self,
+        db: Session,
+        *,
+        db_obj: Job,
+        status: StatusJob,
+        mensagem: Optional[str] = None,
+        resultado: Optional[Dict[str, Any]] = None
+    ) -> Job:
+        db_obj.status = status.value
+        db_obj.mensagem = mensagem
+        if resultado is not None:
+            db_obj.resultado = {**(db_obj.resultado or {}), **resultado}
+        db_obj.finalizado_em = datetime.utcnow()
+        db.commit()
+        db.refresh(db_obj)
+        return db_obj
+
+    def reagendar(self, db: Session, *, db_obj: Job, mensagem: str) -> Job:
+        """Voltar para a fila após uma falha que ainda tem tentativas"""
+        db_obj.status = StatusJob.PENDENTE.value
+        db_obj.mensagem = mensagem
+        db.commit()
+        db.refresh(db_obj)
+        return db_obj
+
+    def solicitar_cancelamento(self, db: Session, *, db_obj: Job) -> Job:
+        """Pendente é cancelado na hora; em execução é interrompido no próximo ponto de verificação"""
+        if db_obj.status == StatusJob.PENDENTE.value:
+            return self.finalizar(db, db_obj=db_obj, status=StatusJob.CANCELADO, mensagem="Cancelado pelo usuário")
+        db_obj.cancelamento_solicitado = True
+        db.commit()
+        db.refresh(db_obj)
+        return db_obj
+
+    def cancelamento_solicitado(self, db: Session, *, id: int) -> bool:
+        return bool(
+            db.query(Job.cancelamento_solicitado).filter(Job.id == id).scalar()
+        )
+
+class CRUDExecucaoRotina(CRUDBase[ExecucaoRotina, JobCreate, JobCreate]):
+    def get_recentes(
+        self, db: Session, *, rotina: Optional[str] = None, skip: int = 0, limit: int = 100
+    ) -> List[ExecucaoRotina]:
+        query = db.query(ExecucaoRotina)
+        if rotina:
+            query = query.filter(ExecucaoRotina.rotina == rotina)
+        return query.order_by(ExecucaoRotina.id.desc()).offset(skip).limit(limit).all()
+
+    def concluida_desde(self, db: Session, *, rotina: str, desde: datetime) -> bool:
+        """Se a rotina já tem execução concluída a partir de `desde` (UTC)"""
+        return db.query(
+            db.query(ExecucaoRotina.id)
+            .filter(
+                ExecucaoRotina.rotina == rotina,
+                ExecucaoRotina.status == StatusJob.CONCLUIDO.value,
+                ExecucaoRotina.iniciado_em >= desde,
+            )
+            .exists()
+        ).scalar()
+
+crud_job = CRUDJob(Job)
+crud_execucao_rotina = CRUDExecucaoRotina(ExecucaoRotina)
@@ -1,6 +1,9 @@
 from typing import Any, Dict, Optional, Union
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.core.security import get_password_hash, verify_password
+from app.core import principal
+from app.core.security import get_password_hash, verificar_e_atualizar, verificar_e_atualizar_async
 from app.crud.base import CRUDBase
 from app.models.user import User
 from app.schemas.user import UserCreate, UserUpdate
@@ -32,14 +35,40 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
             hashed_password = get_password_hash(update_data["password"])
             del update_data["password"]
             update_data["hashed_password"] = hashed_password
-        return super().update(db, db_obj=db_obj, obj_in=update_data)
+        user = super().update(db, db_obj=db_obj, obj_in=update_data)
+        # Nome, ativo e superusuário vêm do principal em cache nas próximas requisições
+        principal.invalidar(user.id)
+        return user
+
+    def remove(self, db: Session, *, id: int) -> User:
+        user = super().remove(db, id=id)
+        principal.invalidar(id)
+        return user
 
     def authenticate(self, db: Session, *, email: str, password: str) -> Optional[User]:
         user = self.get_by_email(db, email=email)
         if not user:
             return None
-        if not verify_password(password, user.hashed_password):
+        valida, novo_hash = verificar_e_atualizar(password, user.hashed_password)
+        if not valida:
+            return None
+        if novo_hash:
+            # Custo do bcrypt mudou (BCRYPT_ROUNDS): regrava com o novo custo
+            user.hashed_password = novo_hash
+            db.commit()
+        return user
+
+    async def authenticate_async(self, db: AsyncSession, *, email: str, password: str) -> Optional[User]:
+        """`authenticate` para o login async: o bcrypt roda no pool de hash, fora do event loop"""
+        user = await db.scalar(select(User).filter(User.email == email))
+        if not user:
+            return None
+        valida, novo_hash = await verificar_e_atualizar_async(password, user.hashed_password)
+        if not valida:
             return None
+        if novo_hash:
+            user.hashed_password = novo_hash
+            await db.commit()
         return user
 
     def is_active(self, user: User) -> bool:
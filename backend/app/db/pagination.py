@@ -0,0 +1,219 @@
+import base64
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from sqlalchemy import Select, func, select, text, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Query, Session
+
+class ModoContagem(str, Enum):
+    EXACT = "exact"  # COUNT(*) OVER() na mesma consulta da página
+    ESTIMATED = "estimated"  # estimativa do planejador do Postgres
+    NONE = "none"  # sem total
+
+class Pagina(NamedTuple):
+    items: List[Any]
+    total: Optional[int]
+    next_cursor: Optional[str] = None
+
+class CursorInvalido(ValueError):
+    """Cursor de paginação malformado ou gerado para outra ordenação"""
+
+def _serializar_valor(value: Any) -> Any:
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+def _converter_valor(column, value: Any) -> Any:
+    python_type = column.type.python_type
+    if value is None or isinstance(value, python_type):
+        return value
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+    return python_type(value)
+
+def encode_cursor(columns: Sequence, obj: Any) -> str:
+    """Gerar cursor opaco a partir dos valores da chave de ordenação do último item"""
+    # Entidade ORM ou linha projetada em dicionário (app.db.projecao)
+    ler = obj.get if isinstance(obj, dict) else lambda chave: getattr(obj, chave)
+    values = [_serializar_valor(ler(column.key)) for column in columns]
+    raw = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(columns: Sequence, cursor: str) -> List[Any]:
+    """Decodificar cursor opaco nos valores tipados da chave de ordenação"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise CursorInvalido(cursor)
+        return [_converter_valor(column, value) for column, value in zip(columns, values)]
+    except CursorInvalido:
+        raise
+    except (ValueError, TypeError) as e:
+        raise CursorInvalido(cursor) from e
+
+def paginate_keyset(
+    query: Query, columns: Sequence, *, cursor: Optional[str] = None, limit: int = 100
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    Paginar por chave (keyset) em vez de OFFSET.
+
+    A ordenação é feita pelas colunas informadas (a última deve ser única, em
+    geral o id) e a página seguinte começa logo após a tupla do último item,
+    de forma que o banco faz um seek no índice independente da profundidade.
+    Um cursor vazio ou None retorna a primeira página. Qualquer ordenação
+    prévia da consulta é substituída pela chave.
+    """
+    items = _consulta_keyset(query, columns, cursor, limit).all()
+    return _fatiar_keyset(items, columns, limit)
+
+def _consulta_keyset(consulta, columns: Sequence, cursor: Optional[str], limit: int):
+    """Ordenar pela chave, partir do cursor e buscar um item a mais (Query ou Select)"""
+    consulta = consulta.order_by(None).order_by(*columns)
+    if cursor:
+        values = decode_cursor(columns, cursor)
+        if len(columns) == 1:
+            consulta = consulta.filter(columns[0] > values[0])
+        else:
+            consulta = consulta.filter(tuple_(*columns) > tuple_(*values))
+    return consulta.limit(limit + 1)
+
+def _fatiar_keyset(items: List[Any], columns: Sequence, limit: int) -> Tuple[List[Any], Optional[str]]:
+    if len(items) <= limit:
+        return items, None
+    items = items[:limit]
+    return items, encode_cursor(columns, items[-1])
+
+def _estimate_count(query: Query) -> Optional[int]:
+    """
+    Total aproximado sem varrer a tabela: pg_class.reltuples quando não há
+    filtro, senão as linhas estimadas pelo EXPLAIN da própria consulta.
+    Retorna None fora do Postgres ou se a tabela nunca foi analisada.
+    """
+    return _estimar_total(query.session, query.order_by(None).statement)
+
+def _estimar_total(session: Session, statement: Select) -> Optional[int]:
+    bind = session.get_bind()
+    if bind.dialect.name != "postgresql":
+        return None
+
+    if statement.whereclause is None and len(statement.get_final_froms()) == 1:
+        table = statement.get_final_froms()[0]
+        reltuples = session.execute(
+            text("SELECT reltuples FROM pg_class WHERE oid = CAST(:tabela AS regclass)"),
+            {"tabela": table.name},
+        ).scalar()
+        return int(reltuples) if reltuples is not None and reltuples >= 0 else None
+
+    compiled = statement.compile(dialect=bind.dialect, compile_kwargs={"render_postcompile": True})
+    params = compiled.params
+    if compiled.positional:
+        # asyncpg usa parâmetros posicionais ($1, $2...)
+        params = tuple(params[nome] for nome in compiled.positiontup)
+    plan = session.connection().exec_driver_sql(
+        f"EXPLAIN (FORMAT JSON) {compiled}", params
+    ).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+def count_total(query: Query, modo: ModoContagem = ModoContagem.EXACT) -> Optional[int]:
+    """Total de registros da consulta conforme o modo de contagem pedido"""
+    if modo == ModoContagem.NONE:
+        return None
+    if modo == ModoContagem.ESTIMATED:
+        estimate = _estimate_count(query)
+        if estimate is not None:
+            return estimate
+    return query.order_by(None).count()
+
+def paginate_offset(
+    query: Query, *, skip: int = 0, limit: int = 100, modo: ModoContagem = ModoContagem.EXACT
+) -> Pagina:
+    """
+    Página por OFFSET com o total na mesma ida ao banco.
+
+    No modo exato o total vem de COUNT(*) OVER() junto de cada linha; só
+    quando a página volta vazia com skip > 0 (além do fim) é preciso contar
+    separadamente.
+    """
+    if modo != ModoContagem.EXACT:
+        items = query.offset(skip).limit(limit).all()
+        return Pagina(items, count_total(query, modo))
+
+    rows = (
+        query.add_columns(func.count().over().label("total_registros"))
+        .offset(skip)
+        .limit(limit)
+        .all()
+    )
+    if rows:
+        return Pagina([row[0] for row in rows], rows[0][-1])
+    return Pagina([], count_total(query) if skip > 0 else 0)
+
+def paginated_response(
+    items: List[Any],
+    total: Optional[int],
+    *,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    next_cursor: Optional[str] = None
+) -> Dict[str, Any]:
+    """Corpo padrão das listagens paginadas consumidas pelo frontend"""
+    return {
+        "items": items,
+        "total": total,
+        "page": (skip // limit) + 1 if cursor is None else None,
+        "limit": limit,
+        "totalPages": (total + limit - 1) // limit if total is not None else None,
+        "next_cursor": next_cursor
+    }
+
+
+# ==================== ASYNC ====================
+# Mesmas paginações para as rotas async, sobre select() e AsyncSession
+
+async def paginate_keyset_async(
+    db: AsyncSession, statement: Select, columns: Sequence, *, cursor: Optional[str] = None, limit: int = 100
+) -> Tuple[List[Any], Optional[str]]:
+    """Versão assíncrona de `paginate_keyset`"""
+    items = list((await db.scalars(_consulta_keyset(statement, columns, cursor, limit))).all())
+    return _fatiar_keyset(items, columns, limit)
+
+async def count_total_async(
+    db: AsyncSession, statement: Select, modo: ModoContagem = ModoContagem.EXACT
+) -> Optional[int]:
+    """Versão assíncrona de `count_total`"""
+    if modo == ModoContagem.NONE:
+        return None
+    statement = statement.order_by(None)
+    if modo == ModoContagem.ESTIMATED:
+        estimate = await db.run_sync(_estimar_total, statement)
+        if estimate is not None:
+            return estimate
+    return await db.scalar(select(func.count()).select_from(statement.subquery()))
+
+async def paginate_offset_async(
+    db: AsyncSession, statement: Select, *, skip: int = 0, limit: int = 100,
+    modo: ModoContagem = ModoContagem.EXACT
+) -> Pagina:
+    """Versão assíncrona de `paginate_offset`"""
+    if modo != ModoContagem.EXACT:
+        items = (await db.scalars(statement.offset(skip).limit(limit))).all()
+        return Pagina(list(items), await count_total_async(db, statement, modo))
+
+    rows = (await db.execute(
+        statement.add_columns(func.count().over().label("total_registros")).offset(skip).limit(limit)
+    )).all()
+    if rows:
+        return Pagina([row[0] for row in rows], rows[0][-1])
+    return Pagina([], await count_total_async(db, statement) if skip > 0 else 0)
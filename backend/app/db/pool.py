@@ -0,0 +1,81 @@
+"""
+Pool de conexões com métricas por processo.
+
+`PoolMedido` (engine síncrono) e `PoolMedidoAsync` (engine assíncrono) são
+os pools com fila do SQLAlchemy cronometrando a obtenção de cada conexão:
+quanto tempo as requisições esperaram por uma conexão livre (ou pela
+abertura de uma extra) e quantas desistiram por timeout. Junto com o
+estado do pool (em uso, ociosas, overflow) isso mostra se os workers estão
+enfileirando no pool; cada processo publica os próprios números em /health.
+"""
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict
+
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+class _MedicaoPool:
+    """Acumula o tempo de espera por conexão de um pool com fila"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._metricas_lock = threading.Lock()
+        self._obtencoes = 0
+        self._timeouts = 0
+        self._espera_total = 0.0
+        self._espera_max = 0.0
+
+    def _do_get(self):
+        inicio = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            with self._metricas_lock:
+                self._timeouts += 1
+            logger.warning(f"Timeout aguardando conexão do pool ({self.status()})")
+            raise
+        finally:
+            espera = time.perf_counter() - inicio
+            with self._metricas_lock:
+                self._obtencoes += 1
+                self._espera_total += espera
+                self._espera_max = max(self._espera_max, espera)
+            if espera * 1000 >= settings.DB_POOL_ALERTA_ESPERA_MS:
+                logger.warning(f"Conexão do pool obtida após {espera * 1000:.0f} ms ({self.status()})")
+
+    def metricas(self) -> Dict[str, Any]:
+        with self._metricas_lock:
+            obtencoes, timeouts = self._obtencoes, self._timeouts
+            espera_total, espera_max = self._espera_total, self._espera_max
+        return {
+            "tamanho": self.size(),
+            "em_uso": self.checkedout(),
+            "ociosas": self.checkedin(),
+            # Negativo enquanto o pool ainda não abriu todas as conexões base
+            "overflow": self.overflow(),
+            "obtencoes": obtencoes,
+            "timeouts": timeouts,
+            "espera_media_ms": round(espera_total * 1000 / obtencoes, 2) if obtencoes else 0.0,
+            "espera_max_ms": round(espera_max * 1000, 2),
+        }
+
+class PoolMedido(_MedicaoPool, QueuePool):
+    pass
+
+class PoolMedidoAsync(_MedicaoPool, AsyncAdaptedQueuePool):
+    pass
+
+def metricas_pool(engine: Engine) -> Dict[str, Any]:
+    """Estado e tempos de espera do pool do engine neste processo"""
+    metricas: Dict[str, Any] = {"pid": os.getpid(), "pool": type(engine.pool).__name__}
+    if isinstance(engine.pool, _MedicaoPool):
+        metricas.update(engine.pool.metricas())
+    return metricas
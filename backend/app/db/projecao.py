@@ -0,0 +1,120 @@
+"""
+Projeção de linhas direto em dicionários, para listas somente leitura.
+
+Carregar a entidade ORM inteira e depois validá-la num schema Pydantic
+(`from_attributes`) custa mais que a própria consulta em páginas grandes.
+`projetar` troca as entidades da consulta pelas colunas do schema de
+resposta: o banco devolve só essas colunas e cada linha já sai como
+dicionário pronto para o `RespostaJSON`, sem identity map nem validação.
+
+Vale para schemas cujos campos são todos colunas do modelo (sem
+relacionamentos aninhados); os tipos saem como o Pydantic os serializaria
+(ver app.core.serializacao), inclusive campos `float` sobre colunas
+Numeric.
+
+Campos esparsos (`?fields=id,razao_social,cnpj`): `ler_campos` valida o
+pedido contra o schema de resposta. A projeção seleciona só essas colunas;
+no caminho ORM o CRUD carrega as entidades com `load_only` e
+`modelo_parcial` gera (uma vez por conjunto de campos) o schema reduzido
+que as serializa.
+"""
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Type, get_args
+
+from pydantic import BaseModel, ConfigDict, TypeAdapter, create_model
+from sqlalchemy import inspect
+from sqlalchemy.orm import Bundle, Query
+
+class LinhaDict(Bundle):
+    """Bundle que entrega cada linha como dicionário {campo: valor}"""
+    single_entity = True
+
+    def __init__(self, name: str, *exprs, flutuantes: Sequence[str] = (), **kw):
+        super().__init__(name, *exprs, **kw)
+        self.flutuantes = frozenset(flutuantes)
+
+    def create_row_processor(self, query, procs, labels):
+        flutuantes = [label in self.flutuantes for label in labels]
+        if not any(flutuantes):
+            def proc(row):
+                return dict(zip(labels, [p(row) for p in procs]))
+            return proc
+
+        def proc_flutuantes(row):
+            return {
+                label: float(valor) if flutuante and valor is not None else valor
+                for label, flutuante, valor in zip(labels, flutuantes, [p(row) for p in procs])
+            }
+        return proc_flutuantes
+
+def _e_float(anotacao: Any) -> bool:
+    return anotacao is float or float in get_args(anotacao)
+
+@lru_cache(maxsize=None)
+def _colunas(model: type, campos: Tuple[str, ...], schema: Optional[Type[BaseModel]]) -> Tuple[list, Tuple[str, ...]]:
+    mapper = inspect(model)
+    faltando = [campo for campo in campos if campo not in mapper.column_attrs]
+    if faltando:
+        raise ValueError(f"Campos sem coluna em {model.__name__}: {', '.join(faltando)}")
+    flutuantes = tuple(
+        campo for campo in campos
+        if schema is not None and _e_float(schema.model_fields[campo].annotation)
+    )
+    return [getattr(model, campo) for campo in campos], flutuantes
+
+def linha_dict(
+    model: type, schema: Type[BaseModel], campos: Optional[Sequence[str]] = None
+) -> LinhaDict:
+    """Bundle com as colunas do schema (ou só `campos`, na ordem do schema)"""
+    nomes = tuple(
+        nome for nome in schema.model_fields if campos is None or nome in campos
+    )
+    colunas, flutuantes = _colunas(model, nomes, schema)
+    return LinhaDict(model.__tablename__, *colunas, flutuantes=flutuantes)
+
+def projetar(
+    query: Query, model: type, schema: Type[BaseModel], campos: Optional[Sequence[str]] = None
+) -> Query:
+    """A mesma consulta (filtros e ordenação) devolvendo dicionários em vez de entidades"""
+    return query.with_entities(linha_dict(model, schema, campos))
+
+# ==================== CAMPOS ESPARSOS (fields=) ====================
+
+class CamposInvalidos(ValueError):
+    """`fields` com campos que não existem no schema de resposta"""
+
+    def __init__(self, campos: Sequence[str]):
+        super().__init__(f"Campos inválidos: {', '.join(campos)}")
+        self.campos = list(campos)
+
+def ler_campos(fields: Optional[str], schema: Type[BaseModel]) -> Optional[Tuple[str, ...]]:
+    """
+    Campos pedidos em `fields` ("id,razao_social,cnpj"), na ordem do schema e
+    sempre com o `id`; None quando `fields` não foi informado (schema inteiro).
+    """
+    if fields is None:
+        return None
+    pedidos = {campo.strip() for campo in fields.split(",") if campo.strip()}
+    desconhecidos = sorted(pedidos - schema.model_fields.keys())
+    if desconhecidos:
+        raise CamposInvalidos(desconhecidos)
+    pedidos.add("id")
+    return tuple(nome for nome in schema.model_fields if nome in pedidos)
+
+@lru_cache(maxsize=256)
+def modelo_parcial(schema: Type[BaseModel], campos: Tuple[str, ...]) -> TypeAdapter:
+    """
+    Lista do schema reduzida aos `campos` (mesmos tipos, validações e
+    padrões), gerada uma vez por conjunto de campos.
+    """
+    modelo = create_model(
+        f"{schema.__name__}Parcial",
+        __config__=ConfigDict(from_attributes=True),
+        **{nome: (schema.model_fields[nome].annotation, schema.model_fields[nome]) for nome in campos},
+    )
+    return TypeAdapter(List[modelo])
+
+def serializar_campos(itens: Sequence[Any], schema: Type[BaseModel], campos: Tuple[str, ...]) -> List[Dict[str, Any]]:
+    """Entidades (carregadas só com `campos`) como dicionários JSON do schema parcial"""
+    adaptador = modelo_parcial(schema, campos)
+    return adaptador.dump_python(adaptador.validate_python(itens, from_attributes=True), mode="json")
@@ -0,0 +1,224 @@
+"""
+Busca textual indexada para as telas com caixa de pesquisa.
+
+No Postgres usa um índice GIN pg_trgm sobre uma expressão normalizada
+(minúsculas e sem acentos via unaccent) e ordena por word_similarity; no
+SQLite de desenvolvimento usa uma tabela FTS5 (unicode61 sem diacríticos)
+mantida por triggers e ordena por bm25. Sem o índice criado, cai no
+ilike('%termo%') original.
+
+O FTS5 só casa palavras inteiras ou pelo início: termos com números (um
+trecho do CNPJ, "Loja 2") ou palavras curtas continuam no ilike por
+substring no SQLite, que também compara o documento só com dígitos.
+"""
+import logging
+import re
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import column, func, literal_column, or_, select, table, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Query
+
+logger = logging.getLogger(__name__)
+
+class IndiceBusca(NamedTuple):
+    tabela: str
+    colunas: Tuple[str, ...]
+    documento: Optional[str] = None  # CNPJ/CPF, indexado também só com dígitos
+
+INDICES_BUSCA: Dict[str, IndiceBusca] = {
+    "empresas": IndiceBusca(
+        "empresas", ("razao_social", "nome_fantasia", "cnpj", "codigo_cliente_integracao"), "cnpj"
+    ),
+    "clientes_fornecedores": IndiceBusca(
+        "clientes_fornecedores", ("nome", "nome_fantasia", "cpf_cnpj", "email"), "cpf_cnpj"
+    ),
+}
+
+# (url do banco, tabela) -> índice disponível
+_disponivel: Dict[Tuple[str, str], bool] = {}
+
+def _nome_indice(indice: IndiceBusca) -> str:
+    return f"ix_{indice.tabela}_busca_trgm"
+
+def _nome_fts(indice: IndiceBusca) -> str:
+    return f"{indice.tabela}_busca"
+
+# ==================== POSTGRES ====================
+
+def _expressao_pg(indice: IndiceBusca, prefixo: str = "") -> str:
+    partes = [f"coalesce({prefixo}{nome}, '')" for nome in indice.colunas]
+    if indice.documento:
+        partes.append(f"regexp_replace(coalesce({prefixo}{indice.documento}, ''), '\\D', '', 'g')")
+    concatenado = " || ' ' || ".join(partes)
+    return f"f_unaccent(lower({concatenado}))"
+
+def _criar_indices_postgres(engine: Engine) -> None:
+    # CREATE INDEX CONCURRENTLY não roda dentro de transação
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS unaccent"))
+        # unaccent() é STABLE; índices de expressão exigem uma função IMMUTABLE
+        conn.execute(text(
+            "CREATE OR REPLACE FUNCTION f_unaccent(text) RETURNS text "
+            "LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT AS "
+            "$$ SELECT public.unaccent('public.unaccent'::regdictionary, $1) $$"
+        ))
+        for indice in INDICES_BUSCA.values():
+            if conn.execute(text("SELECT to_regclass(:nome)"), {"nome": indice.tabela}).scalar() is None:
+                continue  # tabela ainda não criada
+            conn.exec_driver_sql(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {_nome_indice(indice)} "
+                f"ON {indice.tabela} USING gin ({_expressao_pg(indice)} gin_trgm_ops)"
+            )
+
+def _buscar_postgres(query: Query, model, indice: IndiceBusca, termo: str) -> Query:
+    expressao = literal_column(_expressao_pg(indice, prefixo=f"{indice.tabela}."))
+    termo_normalizado = func.f_unaccent(func.lower(termo))
+    padrao = re.sub(r"([\\%_])", r"\\\1", termo)
+    return (
+        query.filter(expressao.like("%" + func.f_unaccent(func.lower(padrao)) + "%"))
+        .order_by(func.word_similarity(termo_normalizado, expressao).desc(), model.id)
+    )
+
+# ==================== SQLITE ====================
+
+def _criar_indices_sqlite(engine: Engine) -> None:
+    with engine.begin() as conn:
+        for indice in INDICES_BUSCA.values():
+            fts = _nome_fts(indice)
+            existentes = {
+                nome for (nome,) in conn.execute(
+                    text("SELECT name FROM sqlite_master WHERE type = 'table' AND name IN (:tabela, :fts)"),
+                    {"tabela": indice.tabela, "fts": fts},
+                )
+            }
+            # Tabela ainda não criada ou índice já existente
+            if indice.tabela not in existentes or fts in existentes:
+                continue
+
+            colunas_fts = list(indice.colunas) + (["documento"] if indice.documento else [])
+            conn.exec_driver_sql(
+                f"CREATE VIRTUAL TABLE {fts} USING fts5("
+                f"{', '.join(colunas_fts)}, tokenize = 'unicode61 remove_diacritics 2')"
+            )
+
+            def valores(alias: str) -> str:
+                partes = [f"{alias}.{nome}" for nome in indice.colunas]
+                if indice.documento:
+                    doc = f"{alias}.{indice.documento}"
+                    partes.append(f"replace(replace(replace({doc}, '.', ''), '/', ''), '-', '')")
+                return ", ".join(partes)
+
+            insert = f"INSERT INTO {fts} (rowid, {', '.join(colunas_fts)})"
+            conn.exec_driver_sql(
+                f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {indice.tabela} BEGIN "
+                f"{insert} VALUES (new.id, {valores('new')}); END"
+            )
+            conn.exec_driver_sql(
+                f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {indice.tabela} BEGIN "
+                f"DELETE FROM {fts} WHERE rowid = old.id; END"
+            )
+            conn.exec_driver_sql(
+                f"CREATE TRIGGER {fts}_au AFTER UPDATE ON {indice.tabela} BEGIN "
+                f"DELETE FROM {fts} WHERE rowid = old.id; "
+                f"{insert} VALUES (new.id, {valores('new')}); END"
+            )
+            # Popular com os registros já existentes
+            conn.exec_driver_sql(
+                f"{insert} SELECT {indice.tabela}.id, {valores(indice.tabela)} FROM {indice.tabela}"
+            )
+
+# Palavras mais curtas que isso casariam prefixos demais; vão pelo ilike
+TAMANHO_MINIMO_FTS = 3
+
+def _usa_substring(termo: str) -> bool:
+    """Termo que o FTS5 não casa: números (em qualquer posição) ou palavras curtas"""
+    return any(
+        palavra.isdigit() or len(palavra) < TAMANHO_MINIMO_FTS for palavra in re.findall(r"\w+", termo)
+    )
+
+def _buscar_substring(query: Query, model, indice: IndiceBusca, termo: str) -> Query:
+    condicoes = [getattr(model, nome).ilike(f"%{termo}%") for nome in indice.colunas]
+    if indice.documento and re.fullmatch(r"[\d.\-/\s]+", termo):
+        # Trecho de CNPJ/CPF com ou sem pontuação
+        documento = getattr(model, indice.documento)
+        digitos = func.replace(func.replace(func.replace(documento, ".", ""), "/", ""), "-", "")
+        condicoes.append(digitos.like("%" + re.sub(r"\D", "", termo) + "%"))
+    return query.filter(or_(*condicoes))
+
+def _termo_fts(termo: str) -> Optional[str]:
+    # Cada palavra vira um prefixo entre aspas; isso também neutraliza a sintaxe do FTS5
+    palavras = re.findall(r"\w+", termo)
+    if not palavras:
+        return None
+    return " ".join(f'"{palavra}"*' for palavra in palavras)
+
+def _buscar_sqlite(query: Query, model, indice: IndiceBusca, termo: str) -> Query:
+    if _usa_substring(termo):
+        return _buscar_substring(query, model, indice, termo)
+    expressao = _termo_fts(termo)
+    if expressao is None:
+        return query
+    fts = _nome_fts(indice)
+    tabela_fts = table(fts, column("rowid"))
+    # bm25() só pode ser chamada na consulta que faz o MATCH, por isso a subconsulta
+    ranking = (
+        select(tabela_fts.c.rowid, func.bm25(literal_column(fts)).label("rank"))
+        .where(literal_column(fts).op("MATCH")(expressao))
+        .subquery()
+    )
+    return (
+        query.join(ranking, ranking.c.rowid == model.id)
+        .order_by(ranking.c.rank, model.id)
+    )
+
+# ==================== API ====================
+
+def ensure_search_indexes(engine: Engine) -> bool:
+    """Criar (se faltarem) os índices de busca; retorna False se não foi possível"""
+    try:
+        if engine.dialect.name == "postgresql":
+            _criar_indices_postgres(engine)
+        elif engine.dialect.name == "sqlite":
+            _criar_indices_sqlite(engine)
+        else:
+            return False
+    except Exception as e:
+        logger.warning(f"Índices de busca não criados, usando ilike: {e}")
+        return False
+    _disponivel.clear()
+    return True
+
+def _indice_disponivel(query: Query, indice: IndiceBusca) -> bool:
+    bind = query.session.get_bind()
+    chave = (str(bind.url), indice.tabela)
+    if chave not in _disponivel:
+        if bind.dialect.name == "postgresql":
+            sql, nome = "SELECT to_regclass(:nome) IS NOT NULL", _nome_indice(indice)
+        elif bind.dialect.name == "sqlite":
+            sql, nome = "SELECT count(*) > 0 FROM sqlite_master WHERE name = :nome", _nome_fts(indice)
+        else:
+            _disponivel[chave] = False
+            return False
+        _disponivel[chave] = bool(query.session.execute(text(sql), {"nome": nome}).scalar())
+    return _disponivel[chave]
+
+def aplicar_busca(query: Query, model, termo: Optional[str]) -> Query:
+    """
+    Filtrar a consulta pelo termo e ordenar por relevância.
+
+    A ordenação por relevância só vale na paginação por OFFSET; a paginação
+    por cursor substitui a ordenação pela chave do cursor.
+    """
+    if not termo:
+        return query
+    indice = INDICES_BUSCA[model.__tablename__]
+
+    if _indice_disponivel(query, indice):
+        if query.session.get_bind().dialect.name == "postgresql":
+            return _buscar_postgres(query, model, indice, termo)
+        return _buscar_sqlite(query, model, indice, termo)
+
+    colunas: List = [getattr(model, nome) for nome in indice.colunas]
+    return query.filter(or_(*[coluna.ilike(f"%{termo}%") for coluna in colunas]))
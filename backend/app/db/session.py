@@ -1,11 +1,72 @@
+from typing import Any, Dict
+
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
+from app.db.pool import PoolMedido, PoolMedidoAsync
+
+# Drivers assíncronos usados pelo engine das rotas async
+DRIVERS_ASYNC = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}
+
+def url_async(url: str) -> str:
+    """A mesma URL com o driver assíncrono do banco (asyncpg / aiosqlite)"""
+    url = make_url(url)
+    return url.set(drivername=f"{url.get_backend_name()}+{DRIVERS_ASYNC[url.get_backend_name()]}").render_as_string(
+        hide_password=False
+    )
+
+def opcoes_engine(url: str) -> Dict[str, Any]:
+    """Argumentos do create_engine para a URL: pool, timeouts e modo PgBouncer"""
+    url = make_url(url)
+    driver = url.get_driver_name()
+    poolclass = PoolMedidoAsync if driver in DRIVERS_ASYNC.values() else PoolMedido
+    if url.get_backend_name() != "postgresql":
+        # SQLite de desenvolvimento: arquivo usa o pool com fila (medido), memória o pool do dialeto
+        return {"poolclass": poolclass} if url.database not in (None, "", ":memory:") else {}
 
-engine = create_engine(settings.DATABASE_URL)
+    connect_args: Dict[str, Any] = {}
+    parametros_sessao: Dict[str, str] = {}
+    if settings.DB_STATEMENT_TIMEOUT_MS and not settings.DB_PGBOUNCER:
+        # Em modo transação o PgBouncer recusa parâmetros de sessão na conexão
+        parametros_sessao["statement_timeout"] = str(settings.DB_STATEMENT_TIMEOUT_MS)
+
+    if driver == "asyncpg":
+        connect_args["server_settings"] = {"application_name": settings.DB_APPLICATION_NAME, **parametros_sessao}
+        if settings.DB_PGBOUNCER:
+            # Prepared statements ficam na conexão do servidor, que o PgBouncer troca a cada transação
+            connect_args["statement_cache_size"] = 0
+            connect_args["prepared_statement_cache_size"] = 0
+    else:
+        connect_args["application_name"] = settings.DB_APPLICATION_NAME
+        if parametros_sessao:
+            connect_args["options"] = " ".join(f"-c {nome}={valor}" for nome, valor in parametros_sessao.items())
+        if settings.DB_PGBOUNCER and driver == "psycopg":
+            # psycopg 3 prepara comandos repetidos no servidor; o psycopg2 nunca prepara
+            connect_args["prepare_threshold"] = None
+
+    return {
+        "poolclass": poolclass,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "connect_args": connect_args,
+    }
+
+# Único registro de modelos do processo; engine síncrono para as rotas def, jobs e scripts
+engine = create_engine(settings.DATABASE_URL, **opcoes_engine(settings.DATABASE_URL))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Engine assíncrono das rotas async def: a espera pelo banco não ocupa o threadpool.
+# Sem expirar no commit, os objetos seguem legíveis sem novo SELECT (lazy load não existe em async)
+ASYNC_DATABASE_URL = url_async(settings.DATABASE_URL)
+async_engine = create_async_engine(ASYNC_DATABASE_URL, **opcoes_engine(ASYNC_DATABASE_URL))
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
 
 def get_db():
@@ -13,4 +74,4 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
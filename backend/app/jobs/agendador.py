@@ -0,0 +1,108 @@
+"""
+Rotinas agendadas.
+
+No backend "celery" o agendamento é do Celery beat (`beat_schedule` em
+`celery_app`); nos demais uma thread do próprio processo roda a rotina no
+startup (recupera o dia perdido com a API parada) e depois todo dia em
+`settings.VENCIMENTOS_HORARIO`.
+
+Com vários processos da API cada um tem a sua thread, então a execução
+agendada é coordenada pelo banco: no PostgreSQL um advisory lock deixa só
+um processo rodar a rotina por vez, e quem chega depois pula a execução se
+já houver uma concluída hoje em `execucoes_rotinas`. A execução manual
+(job `marcar_vencidos`) não passa por essa checagem.
+"""
+import logging
+import threading
+import zlib
+from contextlib import contextmanager
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Iterator, Optional
+
+from sqlalchemy import func, select
+
+from app import crud
+from app.core.config import settings
+from app.db.session import SessionLocal, engine
+from app.services.vencimentos import ROTINA_MARCAR_VENCIDOS, executar_marcacao
+
+logger = logging.getLogger(__name__)
+
+_parar = threading.Event()
+_thread: Optional[threading.Thread] = None
+
+def horario_vencimentos() -> time:
+    """Horário diário da marcação dos vencidos ("HH:MM")"""
+    hora, minuto = settings.VENCIMENTOS_HORARIO.split(":")
+    return time(int(hora), int(minuto))
+
+def proxima_execucao(agora: datetime, horario: time) -> datetime:
+    proxima = datetime.combine(agora.date(), horario)
+    if proxima <= agora:
+        proxima += timedelta(days=1)
+    return proxima
+
+def _inicio_do_dia_utc(dia: date) -> datetime:
+    """Meia-noite local de `dia` em UTC sem fuso, como gravado em `iniciado_em`"""
+    return datetime.combine(dia, time.min).astimezone(timezone.utc).replace(tzinfo=None)
+
+@contextmanager
+def _lock_rotina(rotina: str) -> Iterator[bool]:
+    """
+    Advisory lock da rotina no PostgreSQL, mantido numa conexão própria
+    (a sessão da rotina faz vários commits). Em outros bancos não há lock.
+    """
+    if engine.dialect.name != "postgresql":
+        yield True
+        return
+    chave = zlib.crc32(rotina.encode())
+    with engine.connect() as conexao:
+        obtido = conexao.execute(select(func.pg_try_advisory_lock(chave))).scalar()
+        conexao.commit()
+        try:
+            yield bool(obtido)
+        finally:
+            if obtido:
+                conexao.execute(select(func.pg_advisory_unlock(chave)))
+                conexao.commit()
+
+def rodar_marcacao_vencidos() -> None:
+    """Execução agendada: uma por dia, mesmo com vários processos"""
+    with _lock_rotina(ROTINA_MARCAR_VENCIDOS) as obtido:
+        if not obtido:
+            logger.info("Marcação dos vencidos já em execução em outro processo")
+            return
+        db = SessionLocal()
+        try:
+            if crud.crud_execucao_rotina.concluida_desde(
+                db, rotina=ROTINA_MARCAR_VENCIDOS, desde=_inicio_do_dia_utc(date.today())
+            ):
+                logger.info("Marcação dos vencidos já concluída hoje")
+                return
+            executar_marcacao(db)
+        finally:
+            db.close()
+
+def _loop() -> None:
+    horario = horario_vencimentos()
+    while not _parar.is_set():
+        try:
+            rodar_marcacao_vencidos()
+        except Exception:
+            logger.exception("Erro inesperado na rotina de vencimentos")
+        espera = (proxima_execucao(datetime.now(), horario) - datetime.now()).total_seconds()
+        _parar.wait(max(espera, 1))
+
+def iniciar_agendador() -> bool:
+    """Iniciar a thread das rotinas (só fora do Celery e do modo inline)"""
+    global _thread
+    from app.jobs.fila import BACKEND_THREAD, backend_jobs
+    if backend_jobs() != BACKEND_THREAD or (_thread is not None and _thread.is_alive()):
+        return False
+    _parar.clear()
+    _thread = threading.Thread(target=_loop, name="agendador", daemon=True)
+    _thread.start()
+    return True
+
+def parar_agendador() -> None:
+    _parar.set()
@@ -0,0 +1,51 @@
+"""
+Aplicação Celery dos jobs (worker: `celery -A app.jobs.celery_app worker`,
+rotinas agendadas: `celery -A app.jobs.celery_app beat`).
+
+Só o id do job trafega pelo Redis. Com acks tardios a mensagem só é
+confirmada depois da execução, então um worker que morre no meio devolve
+o job para a fila em vez de perdê-lo. O visibility_timeout do Redis fica
+acima de JOBS_TEMPO_MAXIMO: uma mensagem não confirmada só é reentregue
+depois que a tentativa que a recebeu já não pode estar rodando (e o
+runner reserva o job antes de executar, ver app.jobs.runner).
+"""
+from app.core.config import settings
+
+try:
+    from celery import Celery
+    from celery.schedules import crontab
+except ImportError:  # Celery é opcional fora do backend "celery"
+    Celery = None
+
+celery_app = None
+
+if Celery is not None:
+    celery_app = Celery("erp", broker=settings.REDIS_URL)
+    celery_app.conf.update(
+        task_acks_late=True,
+        task_reject_on_worker_lost=True,
+        worker_prefetch_multiplier=1,
+        task_ignore_result=True,
+        broker_connection_retry_on_startup=True,
+        broker_transport_options={"visibility_timeout": settings.JOBS_TEMPO_MAXIMO + 3600},
+    )
+
+    hora_vencimentos, minuto_vencimentos = settings.VENCIMENTOS_HORARIO.split(":")
+    celery_app.conf.beat_schedule = {
+        "marcar-vencidos": {
+            "task": "rotinas.marcar_vencidos",
+            "schedule": crontab(hour=int(hora_vencimentos), minute=int(minuto_vencimentos)),
+        },
+    }
+
+    @celery_app.task(name="jobs.executar")
+    def executar(job_id: int) -> None:
+        from app.jobs.runner import executar_job
+        executar_job(job_id)
+
+    @celery_app.task(name="rotinas.marcar_vencidos")
+    def marcar_vencidos() -> None:
+        from app.jobs.agendador import rodar_marcacao_vencidos
+        rodar_marcacao_vencidos()
+
+app = celery_app
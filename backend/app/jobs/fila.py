@@ -0,0 +1,107 @@
+"""
+Enfileiramento de jobs.
+
+O backend vem de `settings.JOBS_BACKEND`:
+  - "celery": worker separado via Redis (produção);
+  - "thread": pool de threads no próprio processo da API, retomado no
+    startup a partir da tabela `jobs` (desenvolvimento sem Redis);
+  - "inline": executa na hora, dentro da chamada (testes).
+"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+from sqlalchemy.orm import Session
+
+from app import crud
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.jobs.celery_app import celery_app
+from app.models.job import Job, StatusJob
+
+logger = logging.getLogger(__name__)
+
+BACKEND_CELERY = "celery"
+BACKEND_THREAD = "thread"
+BACKEND_INLINE = "inline"
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+def backend_jobs() -> str:
+    backend = settings.JOBS_BACKEND
+    if backend == BACKEND_CELERY and celery_app is None:
+        logger.warning("Celery não instalado; jobs executados em threads no próprio processo")
+        return BACKEND_THREAD
+    return backend
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="jobs")
+        return _executor
+
+def _executar_em_thread(job_id: int) -> None:
+    from app.jobs.runner import executar_job
+    try:
+        executar_job(job_id)
+    except Exception:
+        logger.exception(f"Erro inesperado ao executar o job {job_id}")
+
+def despachar(db: Session, job: Job, *, atraso: float = 0) -> None:
+    """Entregar o job ao backend configurado (atraso em segundos)"""
+    backend = backend_jobs()
+    if backend == BACKEND_CELERY:
+        task = celery_app.send_task("jobs.executar", args=[job.id], countdown=atraso or None)
+        job.task_id = task.id
+        db.commit()
+    elif backend == BACKEND_THREAD:
+        if atraso:
+            timer = threading.Timer(atraso, _get_executor().submit, args=(_executar_em_thread, job.id))
+            timer.daemon = True
+            timer.start()
+        else:
+            _get_executor().submit(_executar_em_thread, job.id)
+    else:
+        # Sem espera: nos testes as retentativas acontecem em sequência
+        from app.jobs.runner import executar_job
+        executar_job(job.id)
+
+def enfileirar(
+    db: Session, *, tipo: str, parametros: Optional[Dict[str, Any]] = None, user_id: Optional[int] = None
+) -> Job:
+    """Registrar o job e entregá-lo para execução"""
+    job = crud.crud_job.criar(
+        db, tipo=tipo, parametros=parametros, user_id=user_id,
+        max_tentativas=settings.JOBS_MAX_TENTATIVAS
+    )
+    despachar(db, job)
+    db.refresh(job)
+    return job
+
+def cancelar(db: Session, job: Job) -> Job:
+    """Cancelar na hora se ainda não começou; senão o handler para no próximo lote"""
+    job = crud.crud_job.solicitar_cancelamento(db, db_obj=job)
+    if job.status == StatusJob.CANCELADO.value and job.task_id and backend_jobs() == BACKEND_CELERY:
+        celery_app.control.revoke(job.task_id)
+    return job
+
+def retomar_jobs_pendentes() -> int:
+    """
+    Redespachar jobs que ficaram pendentes ou em execução quando o processo
+    parou. Só vale para o backend "thread": no Celery a fila do Redis já
+    guarda essas entregas.
+    """
+    if backend_jobs() != BACKEND_THREAD:
+        return 0
+    db = SessionLocal()
+    try:
+        jobs = crud.crud_job.get_nao_finalizados(db)
+        for job in jobs:
+            logger.info(f"Retomando job {job.id} ({job.tipo})")
+            despachar(db, job)
+        return len(jobs)
+    finally:
+        db.close()
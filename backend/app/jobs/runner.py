@@ -0,0 +1,133 @@
+"""
+Execução de jobs registrados na tabela `jobs`.
+
+O estado fica no banco, não no processo: quem executa (worker Celery,
+thread ou chamada direta) só recebe o id do job. Falhas voltam para a fila
+com backoff até `max_tentativas`; o cancelamento é um flag gravado no job
+e verificado pelo handler a cada etapa (ex.: após cada lote gravado).
+
+Cada tentativa começa reservando o job (`crud_job.iniciar`, UPDATE
+condicional): se a mesma mensagem chegar duas vezes (redelivery do broker,
+retomada no startup de vários workers), só uma execução roda. A entrega
+que perde a disputa para um job ainda em execução volta para a fila para
+quando a tentativa atual estourar JOBS_TEMPO_MAXIMO, o que cobre o worker
+que morreu no meio do job.
+"""
+import logging
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Optional
+
+from app import crud
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.job import Job, StatusJob, STATUS_FINAIS
+
+logger = logging.getLogger(__name__)
+
+# Espera antes de nova tentativa: 30s, 60s, 120s...
+ATRASO_BASE_RETENTATIVA = 30
+
+class JobCancelado(Exception):
+    """Cancelamento solicitado durante a execução"""
+
+class ErroDefinitivo(Exception):
+    """Falha que não adianta repetir (parâmetros ou credenciais inválidos)"""
+
+class ContextoJob:
+    """Acesso do handler aos parâmetros, ao progresso e ao cancelamento do job"""
+
+    def __init__(self, db, job: Job):
+        # Sessão só para o controle do job; o handler abre a sua para os dados
+        self._db = db
+        self._job = job
+        self.job_id = job.id
+        self.parametros: Dict[str, Any] = dict(job.parametros or {})
+
+    def progresso(self, atual: Optional[int] = None, total: Optional[int] = None, **contadores) -> None:
+        crud.crud_job.atualizar_progresso(
+            self._db, db_obj=self._job, atual=atual, total=total, contadores=contadores
+        )
+        self.verificar_cancelamento()
+
+    def verificar_cancelamento(self) -> None:
+        if crud.crud_job.cancelamento_solicitado(self._db, id=self.job_id):
+            raise JobCancelado()
+
+# tipo do job -> handler; o retorno do handler é gravado em `resultado`
+TAREFAS: Dict[str, Callable[[ContextoJob], Optional[Dict[str, Any]]]] = {}
+
+def tarefa(tipo: str):
+    """Registrar um handler de job"""
+    def registrar(handler):
+        TAREFAS[tipo] = handler
+        return handler
+    return registrar
+
+def _segundos_ate_abandono(job: Job) -> float:
+    """Tempo até a tentativa em execução passar de JOBS_TEMPO_MAXIMO"""
+    iniciado_em = job.iniciado_em
+    if iniciado_em is None:
+        return 0
+    if iniciado_em.tzinfo is not None:
+        iniciado_em = iniciado_em.astimezone(timezone.utc).replace(tzinfo=None)
+    decorrido = (datetime.utcnow() - iniciado_em).total_seconds()
+    return max(settings.JOBS_TEMPO_MAXIMO - decorrido, 0)
+
+def executar_job(job_id: int) -> None:
+    """Executar uma tentativa do job (chamado pelo worker)"""
+    # Garante que os handlers estão registrados também no worker Celery
+    from app.jobs import tarefas  # noqa: F401
+    from app.jobs.fila import BACKEND_INLINE, backend_jobs, despachar
+
+    db = SessionLocal()
+    try:
+        job = crud.crud_job.get(db, id=job_id)
+        if job is None or job.status in STATUS_FINAIS:
+            # Cancelado enquanto aguardava ou entregue de novo após concluir
+            return
+
+        handler = TAREFAS.get(job.tipo)
+        if handler is None:
+            crud.crud_job.finalizar(db, db_obj=job, status=StatusJob.ERRO, mensagem=f"Tipo de job desconhecido: {job.tipo}")
+            return
+
+        reservado = crud.crud_job.iniciar(db, id=job_id, tempo_maximo=settings.JOBS_TEMPO_MAXIMO)
+        if reservado is None:
+            job = crud.crud_job.get(db, id=job_id)
+            if job is not None and job.status == StatusJob.EXECUTANDO.value and backend_jobs() != BACKEND_INLINE:
+                # Outra entrega está executando: conferir de novo quando ela puder ter sido abandonada
+                atraso = _segundos_ate_abandono(job) + 1
+                logger.info(f"Job {job_id} já em execução; nova verificação em {atraso:.0f}s")
+                despachar(db, job, atraso=atraso)
+            return
+        job = reservado
+        if job.cancelamento_solicitado:
+            # Pedido durante a tentativa anterior (que falhou ou foi abandonada)
+            crud.crud_job.finalizar(db, db_obj=job, status=StatusJob.CANCELADO, mensagem="Cancelado pelo usuário")
+            return
+
+        logger.info(f"Job {job.id} ({job.tipo}): tentativa {job.tentativas}/{job.max_tentativas}")
+        try:
+            resultado = handler(ContextoJob(db, job))
+        except JobCancelado:
+            db.rollback()
+            crud.crud_job.finalizar(db, db_obj=job, status=StatusJob.CANCELADO, mensagem="Cancelado pelo usuário")
+            logger.info(f"Job {job.id} cancelado")
+            return
+        except Exception as e:
+            db.rollback()
+            mensagem = str(e) or repr(e)
+            if isinstance(e, ErroDefinitivo) or job.tentativas >= job.max_tentativas:
+                crud.crud_job.finalizar(db, db_obj=job, status=StatusJob.ERRO, mensagem=mensagem)
+                logger.exception(f"Job {job.id} falhou: {mensagem}")
+                return
+            atraso = ATRASO_BASE_RETENTATIVA * 2 ** (job.tentativas - 1)
+            crud.crud_job.reagendar(db, db_obj=job, mensagem=mensagem)
+            logger.warning(f"Job {job.id} falhou ({mensagem}); nova tentativa em {atraso}s")
+            despachar(db, job, atraso=atraso)
+            return
+
+        crud.crud_job.finalizar(db, db_obj=job, status=StatusJob.CONCLUIDO, resultado=resultado or {})
+        logger.info(f"Job {job.id} concluído")
+    finally:
+        db.close()
@@ -0,0 +1,89 @@
+"""Handlers dos jobs disponíveis"""
+import asyncio
+from typing import Any, Dict
+
+from app import crud
+from app.db.session import SessionLocal
+from app.jobs.runner import ContextoJob, ErroDefinitivo, tarefa
+from app.models.job import StatusJob
+from app.services.omie import OmieClient, OmieErro, fechar_http_client
+from app.services.vencimentos import ROTINA_MARCAR_VENCIDOS, executar_marcacao
+from app.services.omie_sync import (
+    MODO_COMPLETO, MODO_DELTA, ResultadoSincronizacao,
+    sincronizar_empresas, sincronizar_empresas_integracao
+)
+
+IMPORTAR_EMPRESAS_OMIE = "importar_empresas_omie"
+
+def _contadores(resultado: ResultadoSincronizacao) -> Dict[str, Any]:
+    return {
+        "total_processados": resultado.total_processados,
+        "total_importados": resultado.total_importados,
+        "total_atualizados": resultado.total_atualizados,
+        "total_sem_alteracao": resultado.total_sem_alteracao,
+        "total_erros": resultado.total_erros,
+        "paginas": resultado.paginas,
+    }
+
+@tarefa(IMPORTAR_EMPRESAS_OMIE)
+def importar_empresas_omie(ctx: ContextoJob) -> Dict[str, Any]:
+    """
+    Importar as empresas do Omie. Parâmetros: `integracao_id` (usa a
+    marca d'água da integração; `modo` delta ou completo) ou
+    `app_key`/`app_secret` (importação completa avulsa).
+    """
+    parametros = ctx.parametros
+    registros_por_pagina = int(parametros.get("registros_por_pagina", 50))
+
+    def ao_gravar_lote(resultado: ResultadoSincronizacao) -> None:
+        ctx.progresso(atual=resultado.total_processados, **_contadores(resultado))
+
+    async def executar() -> ResultadoSincronizacao:
+        db = SessionLocal()
+        try:
+            if parametros.get("integracao_id"):
+                integracao = crud.integracao.get(db, id=parametros["integracao_id"])
+                if integracao is None:
+                    raise ErroDefinitivo("Integração não encontrada")
+                modo = parametros.get("modo", MODO_DELTA)
+                if modo not in (MODO_DELTA, MODO_COMPLETO):
+                    raise ErroDefinitivo(f"Modo de sincronização inválido: {modo}")
+                resultado = await sincronizar_empresas_integracao(
+                    db, integracao, modo=modo, registros_por_pagina=registros_por_pagina,
+                    ao_gravar_lote=ao_gravar_lote
+                )
+                crud.integracao.atualizar_ultima_sincronizacao(db, db_obj=integracao)
+                return resultado
+
+            if not parametros.get("app_key") or not parametros.get("app_secret"):
+                raise ErroDefinitivo("Informe integracao_id ou app_key e app_secret")
+            client = OmieClient(parametros["app_key"], parametros["app_secret"])
+            return await sincronizar_empresas(
+                db, client, registros_por_pagina=registros_por_pagina, ao_gravar_lote=ao_gravar_lote
+            )
+        finally:
+            db.close()
+            # asyncio.run fecha o loop; o cliente HTTP dele não serve para a próxima execução
+            await fechar_http_client()
+
+    try:
+        resultado = asyncio.run(executar())
+    except OmieErro as e:
+        if e.transitorio:
+            raise
+        raise ErroDefinitivo(str(e)) from e
+
+    # Os primeiros erros ajudam a diagnosticar sem inflar a linha do job
+    return {**_contadores(resultado), "modo": resultado.modo, "erros": resultado.erros[:50]}
+
+@tarefa(ROTINA_MARCAR_VENCIDOS)
+def marcar_vencidos(ctx: ContextoJob) -> Dict[str, Any]:
+    """Executar agora a rotina diária de marcação dos títulos vencidos"""
+    db = SessionLocal()
+    try:
+        execucao = executar_marcacao(db)
+        if execucao.status != StatusJob.CONCLUIDO.value:
+            raise RuntimeError(execucao.mensagem)
+        return {**(execucao.contadores or {}), "execucao_id": execucao.id, "duracao_ms": execucao.duracao_ms}
+    finally:
+        db.close()
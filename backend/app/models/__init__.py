@@ -2,7 +2,10 @@ from app.db.session import Base
 from app.models.user import User
 from app.models.financeiro import (
     ContaPagar, ContaReceber, ContaCorrente, Categoria, 
-    ClienteFornecedor, ContatoClienteFornecedor, AnexoClienteFornecedor, Pagamento
+    ClienteFornecedor, ContatoClienteFornecedor, AnexoClienteFornecedor, Pagamento,
+    SaldoDiario, FluxoCaixaDiario
 )
 from app.models.empresa import Empresa
-from app.models.integracao import Integracao
+from app.models.banco import Banco
+from app.models.integracao import Integracao, SincronizacaoWatermark
+from app.models.job import Job, StatusJob, ExecucaoRotina
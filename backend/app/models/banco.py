@@ -0,0 +1,16 @@
+from datetime import datetime
+from sqlalchemy import Boolean, Column, Integer, String, DateTime
+from app.db.session import Base
+
+class Banco(Base):
+    __tablename__ = "bancos"
+
+    id = Column(Integer, primary_key=True, index=True)
+    codigo = Column(String(10), unique=True, index=True, nullable=False)
+    nome = Column(String(100), nullable=False)
+    nome_fantasia = Column(String(100))
+    site = Column(String(255))
+    ativo = Column(Boolean, default=True)
+    # Tabela herdada do main.py: datas sem fuso, preenchidas pela aplicação
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
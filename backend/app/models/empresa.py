@@ -58,6 +58,9 @@ class Empresa(Base):
     inativo = Column(String(1), default="N")  # S/N
     bloqueado = Column(String(1), default="N")  # S/N
     
+    # Hash dos dados recebidos do Omie (sincronização ignora registros sem alteração)
+    hash_omie = Column(String(64))
+    
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Date, Boolean, ForeignKey, DateTime, Enum, Text, Numeric
+from sqlalchemy import Column, Integer, String, Float, Date, Boolean, ForeignKey, DateTime, Enum, Text, Numeric, UniqueConstraint, Index, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
@@ -23,6 +23,15 @@ class TipoPagamento(enum.Enum):
     PIX = "pix"
     CHEQUE = "cheque"
 
+def _enum_valores(enum_cls):
+    # Gravar o valor ("pendente") e não o nome do membro ("PENDENTE"), como os schemas enviam
+    return Enum(enum_cls, values_callable=lambda membros: [membro.value for membro in membros])
+
+def _indice_pendentes(tabela: str) -> Index:
+    # Índice parcial: a rotina de vencimentos só procura entre os títulos pendentes
+    pendente = text(f"status = '{StatusConta.PENDENTE.value}'")
+    return Index(f"ix_{tabela}_vencimento_pendente", "data_vencimento", postgresql_where=pendente, sqlite_where=pendente)
+
 # Modelo para Categorias
 class Categoria(Base):
     __tablename__ = "categorias"
@@ -41,7 +50,7 @@ class ClienteFornecedor(Base):
     id = Column(Integer, primary_key=True, index=True)
     nome = Column(String(200), nullable=False)
     nome_fantasia = Column(String(200))
-    tipo_pessoa = Column(Enum(TipoPessoa), nullable=False)
+    tipo_pessoa = Column(_enum_valores(TipoPessoa), nullable=False)
     cpf_cnpj = Column(String(18), unique=True, index=True)
     rg_ie = Column(String(20))
     im = Column(String(20))  # Inscrição Municipal
@@ -115,6 +124,15 @@ class AnexoClienteFornecedor(Base):
 
 class ContaPagar(Base):
     __tablename__ = "contas_pagar"
+    __table_args__ = (
+        # Listagem do usuário, ordenada pela chave do keyset (data_vencimento, id)
+        Index("ix_contas_pagar_user_vencimento", "user_id", "data_vencimento", "id"),
+        Index("ix_contas_pagar_status_vencimento", "status", "data_vencimento"),
+        Index("ix_contas_pagar_fornecedor_status", "fornecedor_id", "status"),
+        Index("ix_contas_pagar_categoria_id", "categoria_id"),
+        Index("ix_contas_pagar_conta_corrente_id", "conta_corrente_id"),
+        _indice_pendentes("contas_pagar"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     descricao = Column(String, nullable=False)
@@ -126,7 +144,7 @@ class ContaPagar(Base):
     data_vencimento = Column(Date, nullable=False)
     data_emissao = Column(Date)
     numero_documento = Column(String(50))
-    status = Column(Enum(StatusConta), default=StatusConta.PENDENTE)
+    status = Column(_enum_valores(StatusConta), default=StatusConta.PENDENTE)
     observacoes = Column(Text)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -141,16 +159,24 @@ class ContaPagar(Base):
 # Modelo para Pagamentos
 class Pagamento(Base):
     __tablename__ = "pagamentos"
+    __table_args__ = (
+        # Pagamentos da conta e soma do valor_pago
+        Index("ix_pagamentos_conta_pagar_id", "conta_pagar_id"),
+        # Reconstrução dos saldos diários da conta corrente
+        Index("ix_pagamentos_conta_corrente_data", "conta_corrente_id", "data_pagamento"),
+        Index("ix_pagamentos_data_pagamento", "data_pagamento"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     conta_pagar_id = Column(Integer, ForeignKey("contas_pagar.id"), nullable=False)
     conta_corrente_id = Column(Integer, ForeignKey("contas_corrente.id"))
     valor = Column(Numeric(15, 2), nullable=False)
     data_pagamento = Column(Date, nullable=False)
-    tipo_pagamento = Column(Enum(TipoPagamento), nullable=False)
+    tipo_pagamento = Column(_enum_valores(TipoPagamento), nullable=False)
     numero_documento = Column(String(50))  # Número do cheque, comprovante, etc.
     observacoes = Column(Text)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     user_id = Column(Integer, ForeignKey("users.id"))
 
     # Relacionamentos
@@ -160,6 +186,12 @@ class Pagamento(Base):
 
 class ContaReceber(Base):
     __tablename__ = "contas_receber"
+    __table_args__ = (
+        Index("ix_contas_receber_user_vencimento", "user_id", "data_vencimento", "id"),
+        Index("ix_contas_receber_status_vencimento", "status", "data_vencimento"),
+        Index("ix_contas_receber_data_recebimento", "data_recebimento"),
+        _indice_pendentes("contas_receber"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     descricao = Column(String, nullable=False)
@@ -167,7 +199,7 @@ class ContaReceber(Base):
     valor = Column(Float, nullable=False)
     data_vencimento = Column(Date, nullable=False)
     data_recebimento = Column(Date)
-    status = Column(Enum(StatusConta), default=StatusConta.PENDENTE)
+    status = Column(_enum_valores(StatusConta), default=StatusConta.PENDENTE)
     observacoes = Column(String)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -195,3 +227,30 @@ class ContaCorrente(Base):
     ativa = Column(Boolean, default=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+# Saldo de fechamento de cada dia com movimento, por conta corrente
+class SaldoDiario(Base):
+    __tablename__ = "saldos_diarios"
+    __table_args__ = (UniqueConstraint("conta_corrente_id", "data"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    conta_corrente_id = Column(Integer, ForeignKey("contas_corrente.id", ondelete="CASCADE"), nullable=False)
+    data = Column(Date, nullable=False)
+    movimento = Column(Numeric(15, 2), nullable=False, default=0)  # Soma dos lançamentos do dia
+    acumulado = Column(Numeric(15, 2), nullable=False, default=0)  # Soma dos lançamentos até o dia (sem o saldo inicial)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    conta_corrente = relationship("ContaCorrente", backref="saldos_diarios")
+
+# Valores em aberto por dia de vencimento, base da projeção do fluxo de caixa
+class FluxoCaixaDiario(Base):
+    __tablename__ = "fluxo_caixa_diario"
+    __table_args__ = (UniqueConstraint("data", "conta_corrente_id", "categoria_id"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    data = Column(Date, nullable=False)
+    # 0 = sem conta corrente / sem categoria (NULL não entraria na chave única)
+    conta_corrente_id = Column(Integer, nullable=False, default=0)
+    categoria_id = Column(Integer, nullable=False, default=0)
+    entradas = Column(Numeric(15, 2), nullable=False, default=0)  # Contas a receber em aberto
+    saidas = Column(Numeric(15, 2), nullable=False, default=0)  # Saldo a pagar das contas a pagar
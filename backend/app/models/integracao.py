@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, Integer, String, DateTime, Text, JSON
+from sqlalchemy import Boolean, Column, Integer, String, DateTime, Text, JSON, ForeignKey, UniqueConstraint
 from sqlalchemy.sql import func
 from app.db.session import Base
 
@@ -27,3 +27,17 @@ class Integracao(Base):
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+class SincronizacaoWatermark(Base):
+    """Marca d'água da última sincronização bem-sucedida por integração e entidade"""
+    __tablename__ = "sincronizacao_watermarks"
+    __table_args__ = (UniqueConstraint("integracao_id", "entidade"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    integracao_id = Column(Integer, ForeignKey("integracoes.id", ondelete="CASCADE"), nullable=False)
+    entidade = Column(String(50), nullable=False)  # ex: "empresas"
+    sincronizado_ate = Column(DateTime, nullable=False)  # UTC, início da última sincronização sem erros transitórios
+    
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -0,0 +1,55 @@
+import enum
+from sqlalchemy import Boolean, Column, Integer, String, DateTime, Text, JSON, ForeignKey
+from sqlalchemy.sql import func
+from app.db.session import Base
+
+class StatusJob(str, enum.Enum):
+    PENDENTE = "pendente"
+    EXECUTANDO = "executando"
+    CONCLUIDO = "concluido"
+    ERRO = "erro"
+    CANCELADO = "cancelado"
+
+STATUS_FINAIS = (StatusJob.CONCLUIDO.value, StatusJob.ERRO.value, StatusJob.CANCELADO.value)
+
+# Modelo para tarefas de longa duração executadas fora dos workers da API
+class Job(Base):
+    __tablename__ = "jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    tipo = Column(String(50), nullable=False)  # ex: "importar_empresas_omie"
+    status = Column(String(20), nullable=False, default=StatusJob.PENDENTE.value, index=True)
+    parametros = Column(JSON)
+    resultado = Column(JSON)  # Contadores de progresso e resumo final
+    mensagem = Column(Text)  # Último erro ou mensagem de status
+    
+    # Progresso
+    progresso_atual = Column(Integer, default=0)
+    progresso_total = Column(Integer)
+    
+    # Controle de execução
+    tentativas = Column(Integer, default=0)
+    max_tentativas = Column(Integer, default=3)
+    cancelamento_solicitado = Column(Boolean, default=False)
+    task_id = Column(String(155))  # Id da task no Celery
+    
+    user_id = Column(Integer, ForeignKey("users.id"))
+    
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    iniciado_em = Column(DateTime(timezone=True))
+    finalizado_em = Column(DateTime(timezone=True))
+
+# Histórico das rotinas agendadas (ex.: marcação dos títulos vencidos)
+class ExecucaoRotina(Base):
+    __tablename__ = "execucoes_rotinas"
+
+    id = Column(Integer, primary_key=True, index=True)
+    rotina = Column(String(50), nullable=False, index=True)  # ex: "marcar_vencidos"
+    status = Column(String(20), nullable=False)  # concluido | erro
+    contadores = Column(JSON)  # Linhas afetadas por tabela
+    mensagem = Column(Text)
+    duracao_ms = Column(Integer)
+    iniciado_em = Column(DateTime(timezone=True), nullable=False)
+    finalizado_em = Column(DateTime(timezone=True))
@@ -2,7 +2,7 @@ from app.schemas.user import User, UserCreate, UserUpdate, UserInDB
 from app.schemas.financeiro import (
     ContaPagar, ContaPagarCreate, ContaPagarUpdate,
     ContaReceber, ContaReceberCreate, ContaReceberUpdate,
-    ContaCorrente, ContaCorrenteCreate, ContaCorrenteUpdate,
+    ContaCorrente, ContaCorrenteCreate, ContaCorrenteUpdate, SaldoContaCorrente,
     Categoria, CategoriaCreate, CategoriaUpdate,
     ClienteFornecedor, ClienteFornecedorCreate, ClienteFornecedorUpdate,
     ContatoClienteFornecedor, ContatoClienteFornecedorCreate,
@@ -13,8 +13,14 @@ from app.schemas.financeiro import (
 from app.schemas.empresa import (
     Empresa, EmpresaCreate, EmpresaUpdate, EmpresaOmieImport, EmpresaImportResponse
 )
+from app.schemas.banco import Banco, BancoCreate, BancoUpdate
 from app.schemas.integracao import (
     Integracao, IntegracaoCreate, IntegracaoUpdate, IntegracaoPublic, 
-    IntegracaoTeste, SincronizacaoRequest, SincronizacaoResponse
+    IntegracaoTeste, SincronizacaoRequest, SincronizacaoResponse, SincronizacaoIniciada
 )
+from app.schemas.job import Job, JobCreate, ExecucaoRotina
 from app.schemas.token import Token, TokenPayload
+from app.schemas.relatorio import (
+    FluxoCaixa, SerieFluxoCaixa, PeriodoFluxo, PeriodoFluxoCaixa, AgrupamentoFluxoCaixa,
+    Aging, ResumoAging, CategoriaAging, FaixasAging, FaixaAging, DRE, LinhaDRE
+)
@@ -0,0 +1,27 @@
+from typing import Optional
+from datetime import datetime
+from pydantic import BaseModel, Field
+
+class BancoBase(BaseModel):
+    codigo: str = Field(..., min_length=1, max_length=10)
+    nome: str = Field(..., min_length=1, max_length=100)
+    nome_fantasia: Optional[str] = Field(None, max_length=100)
+    site: Optional[str] = Field(None, max_length=255)
+    ativo: bool = True
+
+class BancoCreate(BancoBase):
+    pass
+
+class BancoUpdate(BaseModel):
+    nome: Optional[str] = Field(None, min_length=1, max_length=100)
+    nome_fantasia: Optional[str] = Field(None, max_length=100)
+    site: Optional[str] = Field(None, max_length=255)
+    ativo: Optional[bool] = None
+
+class Banco(BancoBase):
+    id: int
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
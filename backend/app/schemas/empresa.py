@@ -160,6 +160,7 @@ class EmpresaOmieImport(BaseModel):
 class EmpresaImportResponse(BaseModel):
     total_importadas: int
     total_atualizadas: int
+    total_sem_alteracao: int = 0
     total_erros: int
     empresas_importadas: list[str]
     empresas_atualizadas: list[str]
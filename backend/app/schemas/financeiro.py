@@ -300,3 +300,8 @@ class ContaCorrente(ContaCorrenteBase):
 
     class Config:
         from_attributes = True
+
+class SaldoContaCorrente(BaseModel):
+    conta_corrente_id: int
+    data: Optional[date] = None  # None: saldo atual, com todos os lançamentos
+    saldo: Decimal
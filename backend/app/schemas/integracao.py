@@ -93,11 +93,18 @@ class SincronizacaoRequest(BaseModel):
     tipo_dados: str  # "empresas", "clientes", "fornecedores", etc.
     parametros: Optional[Dict[str, Any]] = None
 
+# A sincronização roda como job: acompanhe em GET /jobs/{job_id}
+class SincronizacaoIniciada(BaseModel):
+    message: str
+    job_id: int
+    status: str
+
 class SincronizacaoResponse(BaseModel):
     sucesso: bool
     total_processados: int
     total_importados: int
     total_atualizados: int
+    total_sem_alteracao: int = 0  # Registros iguais aos já gravados (nenhum UPDATE)
     total_erros: int
     mensagens: list[str]
     detalhes: Optional[Dict[str, Any]] = None
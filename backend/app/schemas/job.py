@@ -0,0 +1,50 @@
+from typing import Optional, Dict, Any
+from datetime import datetime
+from pydantic import BaseModel, Field, field_validator
+
+# Parâmetros que nunca voltam nas respostas
+PARAMETROS_SENSIVEIS = ("app_secret", "token", "password")
+
+class JobCreate(BaseModel):
+    tipo: str = Field(..., min_length=1, max_length=50)
+    parametros: Optional[Dict[str, Any]] = None
+
+class Job(BaseModel):
+    id: int
+    tipo: str
+    status: str
+    parametros: Optional[Dict[str, Any]] = None
+    resultado: Optional[Dict[str, Any]] = None
+    mensagem: Optional[str] = None
+    progresso_atual: int = 0
+    progresso_total: Optional[int] = None
+    tentativas: int = 0
+    max_tentativas: int = 3
+    cancelamento_solicitado: bool = False
+    user_id: Optional[int] = None
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+    iniciado_em: Optional[datetime] = None
+    finalizado_em: Optional[datetime] = None
+
+    @field_validator("parametros")
+    def ocultar_sensiveis(cls, v: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        if not v:
+            return v
+        return {k: ("***" if k in PARAMETROS_SENSIVEIS else valor) for k, valor in v.items()}
+
+    class Config:
+        from_attributes = True
+
+class ExecucaoRotina(BaseModel):
+    id: int
+    rotina: str
+    status: str
+    contadores: Optional[Dict[str, Any]] = None
+    mensagem: Optional[str] = None
+    duracao_ms: Optional[int] = None
+    iniciado_em: datetime
+    finalizado_em: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,81 @@
+from typing import Dict, Optional, List
+from datetime import date
+from decimal import Decimal
+from enum import Enum
+from pydantic import BaseModel
+
+class PeriodoFluxoCaixa(str, Enum):
+    DIARIO = "diario"
+    SEMANAL = "semanal"
+    MENSAL = "mensal"
+
+class AgrupamentoFluxoCaixa(str, Enum):
+    NENHUM = "nenhum"
+    CONTA_CORRENTE = "conta_corrente"
+    CATEGORIA = "categoria"
+
+class PeriodoFluxo(BaseModel):
+    inicio: date  # Primeiro dia do período (segunda-feira na visão semanal)
+    entradas: Decimal
+    saidas: Decimal
+    saldo: Decimal  # Saldo projetado ao fim do período
+
+class SerieFluxoCaixa(BaseModel):
+    conta_corrente_id: Optional[int] = None
+    categoria_id: Optional[int] = None
+    saldo_inicial: Decimal
+    total_entradas: Decimal
+    total_saidas: Decimal
+    saldo_final: Decimal
+    periodos: List[PeriodoFluxo] = []
+
+class FluxoCaixa(BaseModel):
+    data_inicio: date
+    data_fim: date
+    periodo: PeriodoFluxoCaixa
+    agrupar_por: AgrupamentoFluxoCaixa
+    series: List[SerieFluxoCaixa] = []
+
+class FaixaAging(BaseModel):
+    valor: float
+    quantidade: int
+
+class FaixasAging(BaseModel):
+    a_vencer: FaixaAging
+    vencidos_0_30: FaixaAging
+    vencidos_31_60: FaixaAging
+    vencidos_61_90: FaixaAging
+    vencidos_90_mais: FaixaAging
+
+class CategoriaAging(BaseModel):
+    categoria_id: Optional[int] = None
+    faixas: FaixasAging
+
+class ResumoAging(BaseModel):
+    faixas: FaixasAging
+    total: float
+    quantidade: int
+    categorias: Optional[List[CategoriaAging]] = None  # Só com por_categoria (contas a pagar)
+
+class Aging(BaseModel):
+    data_base: date
+    pagar: ResumoAging
+    receber: ResumoAging
+
+class LinhaDRE(BaseModel):
+    tipo: str  # receita | despesa
+    categoria_id: Optional[int] = None
+    categoria: str
+    valores: Dict[str, float]  # Por mês (AAAA-MM)
+    total: float
+
+class DRE(BaseModel):
+    data_inicio: date
+    data_fim: date
+    meses: List[str]
+    linhas: List[LinhaDRE] = []
+    receitas: Dict[str, float]
+    despesas: Dict[str, float]
+    resultado: Dict[str, float]
+    total_receitas: float
+    total_despesas: float
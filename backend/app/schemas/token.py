@@ -1,9 +1,15 @@
 from typing import Optional
 from pydantic import BaseModel
+from app.schemas.user import User
 
 class Token(BaseModel):
     access_token: str
     token_type: str
+    # Usuário autenticado, guardado pelo frontend junto com o token
+    user: Optional[User] = None
 
 class TokenPayload(BaseModel):
-    sub: Optional[int] = None
\ No newline at end of file
+    sub: Optional[int] = None
+    exp: Optional[int] = None
+    # Identificador do token, usado na revogação (logout)
+    jti: Optional[str] = None
@@ -0,0 +1,246 @@
+"""
+Relatórios analíticos (aging e DRE por categoria) calculados com pandas.
+
+Os títulos e pagamentos vêm de um único SELECT (UNION ALL) lido em
+streaming, em blocos, direto para arrays colunares; faixas e totais saem
+de operações vetorizadas e group-bys, sem carregar objetos do ORM.
+
+Os resultados ficam em cache no processo, com as versões dos lançamentos
+e das categorias (app.core.cache_respostas) na chave: as escritas marcam o
+recurso e a versão sobe no commit, então qualquer inclusão, alteração ou
+exclusão invalida o cache sem nenhuma consulta extra. Sem
+CACHE_RESPOSTAS_REDIS as versões são do processo, e os outros workers
+recalculam ao fim de CACHE_RESPOSTAS_TTL segundos.
+"""
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+from sqlalchemy import Float, cast, func, literal, or_, select, union_all
+from sqlalchemy.orm import Session
+
+from app.core import cache_respostas
+from app.core.config import settings
+from app.models.financeiro import Categoria, ContaPagar, ContaReceber, Pagamento, StatusConta
+
+ORIGEM_PAGAR = "pagar"  # saldo a pagar em aberto, por vencimento
+ORIGEM_RECEBER = "receber"  # conta a receber em aberto, por vencimento
+ORIGEM_PAGAMENTO = "pagamento"  # saída realizada, por data do pagamento
+ORIGEM_RECEBIMENTO = "recebimento"  # entrada realizada, por data do recebimento
+
+FAIXAS_AGING = ("a_vencer", "vencidos_0_30", "vencidos_31_60", "vencidos_61_90", "vencidos_90_mais")
+
+TAMANHO_BLOCO = 100_000
+TAMANHO_CACHE = 32
+
+STATUS_FECHADOS = (StatusConta.PAGO.value, StatusConta.CANCELADO.value)
+
+class RelatorioIndisponivel(Exception):
+    """Dependência opcional do relatório (pandas) não instalada"""
+
+def _pandas():
+    try:
+        import pandas as pd
+    except ImportError as e:
+        raise RelatorioIndisponivel("Relatórios analíticos exigem o pacote pandas") from e
+    return pd
+
+# ==================== CACHE ====================
+
+_cache: "OrderedDict[Hashable, Any]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+def marca_dados() -> Optional[Tuple[int, int]]:
+    """Versões dos dados usados pelos relatórios; None sem versão (Redis indisponível)"""
+    versoes = (
+        cache_respostas.versao(cache_respostas.LANCAMENTOS),
+        cache_respostas.versao(cache_respostas.CATEGORIAS),
+    )
+    return None if None in versoes else versoes
+
+def _em_cache(chave: Hashable, calcular):
+    if chave is None:
+        return calcular()
+    agora = time.monotonic()
+    with _cache_lock:
+        if chave in _cache:
+            resultado, expira_em = _cache[chave]
+            if expira_em > agora:
+                _cache.move_to_end(chave)
+                return resultado
+            del _cache[chave]
+    resultado = calcular()
+    with _cache_lock:
+        _cache[chave] = (resultado, agora + settings.CACHE_RESPOSTAS_TTL)
+        while len(_cache) > TAMANHO_CACHE:
+            _cache.popitem(last=False)
+    return resultado
+
+# ==================== LEITURA COLUNAR ====================
+
+def _select_lancamentos(origens: Tuple[str, ...], data_inicio: Optional[date], data_fim: Optional[date]):
+    partes = []
+    if ORIGEM_PAGAR in origens:
+        partes.append(
+            select(
+                literal(ORIGEM_PAGAR).label("origem"),
+                func.coalesce(ContaPagar.categoria_id, 0).label("categoria_id"),
+                ContaPagar.data_vencimento.label("data"),
+                cast(ContaPagar.valor_original - func.coalesce(ContaPagar.valor_pago, 0), Float).label("valor"),
+            ).where(or_(ContaPagar.status.is_(None), ContaPagar.status.notin_(STATUS_FECHADOS)))
+        )
+    if ORIGEM_RECEBER in origens:
+        partes.append(
+            select(
+                literal(ORIGEM_RECEBER).label("origem"),
+                literal(0).label("categoria_id"),
+                ContaReceber.data_vencimento.label("data"),
+                cast(ContaReceber.valor, Float).label("valor"),
+            ).where(
+                or_(ContaReceber.status.is_(None), ContaReceber.status.notin_(STATUS_FECHADOS)),
+                ContaReceber.data_recebimento.is_(None),
+            )
+        )
+    if ORIGEM_PAGAMENTO in origens:
+        filtro = [Pagamento.data_pagamento.between(data_inicio, data_fim)] if data_inicio else []
+        partes.append(
+            select(
+                literal(ORIGEM_PAGAMENTO).label("origem"),
+                func.coalesce(ContaPagar.categoria_id, 0).label("categoria_id"),
+                Pagamento.data_pagamento.label("data"),
+                cast(Pagamento.valor, Float).label("valor"),
+            )
+            .join(ContaPagar, ContaPagar.id == Pagamento.conta_pagar_id)
+            .where(*filtro)
+        )
+    if ORIGEM_RECEBIMENTO in origens:
+        filtro = [ContaReceber.data_recebimento.between(data_inicio, data_fim)] if data_inicio else []
+        partes.append(
+            select(
+                literal(ORIGEM_RECEBIMENTO).label("origem"),
+                literal(0).label("categoria_id"),
+                ContaReceber.data_recebimento.label("data"),
+                cast(ContaReceber.valor, Float).label("valor"),
+            ).where(
+                ContaReceber.data_recebimento.isnot(None),
+                or_(ContaReceber.status.is_(None), ContaReceber.status != StatusConta.CANCELADO),
+                *filtro
+            )
+        )
+    return partes[0] if len(partes) == 1 else union_all(*partes)
+
+def carregar_lancamentos(
+    db: Session,
+    origens: Tuple[str, ...],
+    *,
+    data_inicio: Optional[date] = None,
+    data_fim: Optional[date] = None
+):
+    """DataFrame (origem, categoria_id, data, valor) lido em streaming, em blocos"""
+    pd = _pandas()
+    colunas: Dict[str, List[Any]] = {"origem": [], "categoria_id": [], "data": [], "valor": []}
+    resultado = db.connection().execution_options(stream_results=True, yield_per=TAMANHO_BLOCO).execute(
+        _select_lancamentos(origens, data_inicio, data_fim)
+    )
+    for bloco in resultado.partitions():
+        origem, categoria_id, data, valor = zip(*bloco)
+        colunas["origem"].extend(origem)
+        colunas["categoria_id"].extend(categoria_id)
+        colunas["data"].extend(data)
+        colunas["valor"].extend(valor)
+
+    return pd.DataFrame({
+        "origem": pd.Categorical(colunas["origem"], categories=list(origens)),
+        "categoria_id": pd.array(colunas["categoria_id"], dtype="int64"),
+        "data": pd.to_datetime(pd.Series(colunas["data"], dtype="object")),
+        "valor": pd.array(colunas["valor"], dtype="float64"),
+    })
+
+# ==================== AGING ====================
+
+def aging(db: Session, *, data_base: date, por_categoria: bool = False) -> Dict[str, Any]:
+    """Saldo em aberto das contas a pagar/receber por faixa de atraso em `data_base`"""
+    marca = marca_dados()
+    chave = ("aging", data_base, por_categoria, marca) if marca else None
+    return _em_cache(chave, lambda: _calcular_aging(db, data_base, por_categoria))
+
+def _calcular_aging(db: Session, data_base: date, por_categoria: bool) -> Dict[str, Any]:
+    pd = _pandas()
+    df = carregar_lancamentos(db, (ORIGEM_PAGAR, ORIGEM_RECEBER))
+    df = df[df["valor"] > 0]
+    dias = (pd.Timestamp(data_base) - df["data"]).dt.days
+    df = df.assign(faixa=pd.cut(
+        dias, bins=[-float("inf"), 0, 30, 60, 90, float("inf")], labels=list(FAIXAS_AGING)
+    ))
+
+    def totais(agrupado) -> Dict[str, Dict[str, Any]]:
+        tabela = agrupado["valor"].agg(["sum", "count"])
+        return {
+            faixa: {"valor": round(float(linha["sum"]), 2), "quantidade": int(linha["count"])}
+            for faixa, linha in tabela.iterrows()
+        }
+
+    resultado: Dict[str, Any] = {"data_base": data_base}
+    for origem in (ORIGEM_PAGAR, ORIGEM_RECEBER):
+        parte = df[df["origem"] == origem]
+        faixas = totais(parte.groupby("faixa", observed=False))
+        resultado[origem] = {
+            "faixas": faixas,
+            "total": round(float(parte["valor"].sum()), 2),
+            "quantidade": int(len(parte)),
+        }
+        if por_categoria and origem == ORIGEM_PAGAR:
+            resultado[origem]["categorias"] = [
+                {"categoria_id": int(categoria_id) or None, "faixas": totais(grupo.groupby("faixa", observed=False))}
+                for categoria_id, grupo in parte.groupby("categoria_id")
+            ]
+    return resultado
+
+# ==================== DRE ====================
+
+def dre(db: Session, *, data_inicio: date, data_fim: date) -> Dict[str, Any]:
+    """Receitas e despesas realizadas por categoria e mês (regime de caixa)"""
+    marca = marca_dados()
+    chave = ("dre", data_inicio, data_fim, marca) if marca else None
+    return _em_cache(chave, lambda: _calcular_dre(db, data_inicio, data_fim))
+
+def _calcular_dre(db: Session, data_inicio: date, data_fim: date) -> Dict[str, Any]:
+    pd = _pandas()
+    df = carregar_lancamentos(
+        db, (ORIGEM_RECEBIMENTO, ORIGEM_PAGAMENTO), data_inicio=data_inicio, data_fim=data_fim
+    )
+    meses = [str(p) for p in pd.period_range(data_inicio, data_fim, freq="M")]
+    df = df.assign(mes=df["data"].dt.to_period("M").astype(str))
+    tabela = df.pivot_table(
+        index=["origem", "categoria_id"], columns="mes", values="valor",
+        aggfunc="sum", fill_value=0.0, observed=True
+    ).reindex(columns=meses, fill_value=0.0)
+
+    nomes = dict(db.query(Categoria.id, Categoria.nome).all())
+    linhas = []
+    for (origem, categoria_id), valores in tabela.iterrows():
+        linhas.append({
+            "tipo": "receita" if origem == ORIGEM_RECEBIMENTO else "despesa",
+            "categoria_id": int(categoria_id) or None,
+            "categoria": nomes.get(int(categoria_id), "Sem categoria"),
+            "valores": {mes: round(float(v), 2) for mes, v in valores.items()},
+            "total": round(float(valores.sum()), 2),
+        })
+
+    por_mes = df.pivot_table(
+        index="origem", columns="mes", values="valor", aggfunc="sum", fill_value=0.0, observed=False
+    ).reindex(index=[ORIGEM_RECEBIMENTO, ORIGEM_PAGAMENTO], columns=meses, fill_value=0.0)
+    receitas, despesas = por_mes.loc[ORIGEM_RECEBIMENTO], por_mes.loc[ORIGEM_PAGAMENTO]
+    return {
+        "data_inicio": data_inicio,
+        "data_fim": data_fim,
+        "meses": meses,
+        "linhas": linhas,
+        "receitas": {mes: round(float(v), 2) for mes, v in receitas.items()},
+        "despesas": {mes: round(float(v), 2) for mes, v in despesas.items()},
+        "resultado": {mes: round(float(v), 2) for mes, v in (receitas - despesas).items()},
+        "total_receitas": round(float(receitas.sum()), 2),
+        "total_despesas": round(float(despesas.sum()), 2),
+    }
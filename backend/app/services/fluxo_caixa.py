@@ -0,0 +1,264 @@
+"""
+Projeção do fluxo de caixa.
+
+A tabela `fluxo_caixa_diario` guarda, por dia de vencimento, conta corrente
+e categoria, quanto há em aberto a receber (entradas) e a pagar (saídas).
+Ela é mantida de forma incremental: antes de cada flush, cada conta a
+pagar/receber nova, alterada ou removida tem sua contribuição antiga
+estornada e a nova somada, na mesma transação. Assim a projeção lê no
+máximo uma linha por dia e grupo em vez de varrer todos os títulos.
+"""
+from collections import defaultdict
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import event, func, inspect, or_
+from sqlalchemy.orm import Session
+
+from app.models.financeiro import (
+    ContaCorrente, ContaPagar, ContaReceber, FluxoCaixaDiario, StatusConta
+)
+
+PERIODO_DIARIO = "diario"
+PERIODO_SEMANAL = "semanal"
+PERIODO_MENSAL = "mensal"
+
+AGRUPAR_NENHUM = "nenhum"
+AGRUPAR_CONTA_CORRENTE = "conta_corrente"
+AGRUPAR_CATEGORIA = "categoria"
+
+# Títulos que não entram mais na projeção
+STATUS_FECHADOS = (StatusConta.PAGO.value, StatusConta.CANCELADO.value)
+
+class Contribuicao(NamedTuple):
+    data: date
+    conta_corrente_id: int
+    categoria_id: int
+    entradas: Decimal
+    saidas: Decimal
+
+Chave = Tuple[date, int, int]
+
+# ==================== CONTRIBUIÇÃO DE CADA TÍTULO ====================
+
+def _valor_status(status) -> Optional[str]:
+    return getattr(status, "value", status)
+
+def _contribuicao(obj, valor) -> Optional[Contribuicao]:
+    """Contribuição do título lendo os atributos por `valor(nome)`"""
+    if _valor_status(valor("status")) in STATUS_FECHADOS or valor("data_vencimento") is None:
+        return None
+    if isinstance(obj, ContaPagar):
+        aberto = Decimal(valor("valor_original") or 0) - Decimal(valor("valor_pago") or 0)
+        if aberto <= 0:
+            return None
+        return Contribuicao(
+            valor("data_vencimento"), valor("conta_corrente_id") or 0, valor("categoria_id") or 0,
+            Decimal(0), aberto
+        )
+    if valor("data_recebimento") is not None:
+        return None
+    aberto = Decimal(str(valor("valor") or 0))
+    if aberto <= 0:
+        return None
+    # Contas a receber ainda não têm conta corrente nem categoria
+    return Contribuicao(valor("data_vencimento"), 0, 0, aberto, Decimal(0))
+
+def contribuicao(obj) -> Optional[Contribuicao]:
+    """Contribuição atual do título"""
+    return _contribuicao(obj, lambda nome: getattr(obj, nome))
+
+def _contribuicao_anterior(obj) -> Optional[Contribuicao]:
+    """Contribuição do título como estava no banco antes das alterações pendentes"""
+    estado = inspect(obj)
+
+    def valor(nome):
+        historico = estado.attrs[nome].history
+        if historico.deleted:
+            return historico.deleted[0]
+        return getattr(obj, nome)
+    return _contribuicao(obj, valor)
+
+# ==================== MANUTENÇÃO DA TABELA ====================
+
+def _somar(deltas: Dict[Chave, List[Decimal]], contrib: Optional[Contribuicao], sinal: int) -> None:
+    if contrib is None:
+        return
+    delta = deltas[(contrib.data, contrib.conta_corrente_id, contrib.categoria_id)]
+    delta[0] += sinal * contrib.entradas
+    delta[1] += sinal * contrib.saidas
+
+def _gravar_deltas(db: Session, deltas: Dict[Chave, List[Decimal]]) -> None:
+    linhas = [
+        {"data": data, "conta_corrente_id": conta, "categoria_id": categoria, "entradas": entradas, "saidas": saidas}
+        for (data, conta, categoria), (entradas, saidas) in sorted(deltas.items())
+        if entradas or saidas
+    ]
+    if not linhas:
+        return
+    conexao = db.connection()
+    dialeto = conexao.dialect.name
+    if dialeto in ("postgresql", "sqlite"):
+        if dialeto == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        tabela = FluxoCaixaDiario.__table__
+        for linha in linhas:
+            stmt = insert(tabela).values(**linha)
+            conexao.execute(stmt.on_conflict_do_update(
+                index_elements=["data", "conta_corrente_id", "categoria_id"],
+                set_={
+                    "entradas": tabela.c.entradas + stmt.excluded.entradas,
+                    "saidas": tabela.c.saidas + stmt.excluded.saidas,
+                }
+            ))
+        return
+
+    tabela = FluxoCaixaDiario.__table__
+    for linha in linhas:
+        resultado = conexao.execute(
+            tabela.update()
+            .where(
+                tabela.c.data == linha["data"],
+                tabela.c.conta_corrente_id == linha["conta_corrente_id"],
+                tabela.c.categoria_id == linha["categoria_id"],
+            )
+            .values(entradas=tabela.c.entradas + linha["entradas"], saidas=tabela.c.saidas + linha["saidas"])
+        )
+        if resultado.rowcount == 0:
+            conexao.execute(tabela.insert().values(**linha))
+
+def registrar_alteracao(db: Session, antes: Optional[Contribuicao], depois: Optional[Contribuicao]) -> None:
+    """Aplicar a diferença de um título alterado fora do ORM (ex.: UPDATE em massa)"""
+    if antes == depois:
+        return
+    deltas: Dict[Chave, List[Decimal]] = defaultdict(lambda: [Decimal(0), Decimal(0)])
+    _somar(deltas, antes, -1)
+    _somar(deltas, depois, 1)
+    _gravar_deltas(db, deltas)
+
+@event.listens_for(Session, "before_flush")
+def _atualizar_fluxo_caixa(session: Session, flush_context, instances) -> None:
+    deltas: Dict[Chave, List[Decimal]] = defaultdict(lambda: [Decimal(0), Decimal(0)])
+    for obj in session.new:
+        if isinstance(obj, (ContaPagar, ContaReceber)):
+            _somar(deltas, contribuicao(obj), 1)
+    for obj in session.dirty:
+        if isinstance(obj, (ContaPagar, ContaReceber)) and session.is_modified(obj):
+            _somar(deltas, _contribuicao_anterior(obj), -1)
+            _somar(deltas, contribuicao(obj), 1)
+    for obj in session.deleted:
+        if isinstance(obj, (ContaPagar, ContaReceber)):
+            _somar(deltas, _contribuicao_anterior(obj), -1)
+    if deltas:
+        _gravar_deltas(session, deltas)
+
+def reconstruir_fluxo_caixa(db: Session) -> None:
+    """Refazer a tabela a partir dos títulos em aberto (carga inicial e correções), sem commit"""
+    db.query(FluxoCaixaDiario).delete(synchronize_session=False)
+    deltas: Dict[Chave, List[Decimal]] = defaultdict(lambda: [Decimal(0), Decimal(0)])
+    for modelo in (ContaPagar, ContaReceber):
+        abertos = or_(modelo.status.is_(None), modelo.status.notin_(STATUS_FECHADOS))
+        for obj in db.query(modelo).filter(abertos).yield_per(1000):
+            _somar(deltas, contribuicao(obj), 1)
+    _gravar_deltas(db, deltas)
+
+# ==================== PROJEÇÃO ====================
+
+def _inicio_periodo(data: date, periodo: str) -> date:
+    if periodo == PERIODO_SEMANAL:
+        return data - timedelta(days=data.weekday())
+    if periodo == PERIODO_MENSAL:
+        return data.replace(day=1)
+    return data
+
+def _saldos_contas(db: Session, conta_corrente_id: Optional[int]) -> Dict[int, Decimal]:
+    query = db.query(ContaCorrente.id, ContaCorrente.saldo_atual).filter(ContaCorrente.ativa == True)
+    if conta_corrente_id is not None:
+        query = query.filter(ContaCorrente.id == conta_corrente_id)
+    return {id: Decimal(saldo or 0) for id, saldo in query.all()}
+
+def projetar(
+    db: Session,
+    *,
+    data_inicio: date,
+    data_fim: date,
+    periodo: str = PERIODO_DIARIO,
+    agrupar_por: str = AGRUPAR_NENHUM,
+    conta_corrente_id: Optional[int] = None,
+    categoria_id: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """
+    Entradas, saídas e saldo projetado por período, uma série por grupo
+    (só os períodos com movimento são listados).
+
+    O saldo de partida é o saldo atual das contas correntes mais o que
+    venceu antes de `data_inicio` e continua em aberto. Por categoria (ou
+    filtrando uma categoria) não há saldo de conta: a série parte do que
+    está em atraso.
+    """
+    coluna_grupo = {
+        AGRUPAR_CONTA_CORRENTE: FluxoCaixaDiario.conta_corrente_id,
+        AGRUPAR_CATEGORIA: FluxoCaixaDiario.categoria_id,
+    }.get(agrupar_por)
+    colunas_grupo = [coluna_grupo] if coluna_grupo is not None else []
+
+    # A tabela só tem valores em aberto, então os dias anteriores ao início são poucos
+    query = db.query(
+        FluxoCaixaDiario.data, *colunas_grupo,
+        func.sum(FluxoCaixaDiario.entradas), func.sum(FluxoCaixaDiario.saidas)
+    ).filter(FluxoCaixaDiario.data <= data_fim)
+    if conta_corrente_id is not None:
+        query = query.filter(FluxoCaixaDiario.conta_corrente_id == conta_corrente_id)
+    if categoria_id is not None:
+        query = query.filter(FluxoCaixaDiario.categoria_id == categoria_id)
+    linhas = query.group_by(FluxoCaixaDiario.data, *colunas_grupo).all()
+
+    saldos_iniciais: Dict[int, Decimal] = defaultdict(Decimal)
+    if agrupar_por != AGRUPAR_CATEGORIA and categoria_id is None:
+        saldos = _saldos_contas(db, conta_corrente_id)
+        if agrupar_por == AGRUPAR_CONTA_CORRENTE:
+            saldos_iniciais.update(saldos)
+        else:
+            saldos_iniciais[0] = sum(saldos.values(), Decimal(0))
+
+    periodos: Dict[int, Dict[date, List[Decimal]]] = defaultdict(
+        lambda: defaultdict(lambda: [Decimal(0), Decimal(0)])
+    )
+    for linha in linhas:
+        if coluna_grupo is not None:
+            data, grupo, entradas, saidas = linha
+        else:
+            (data, entradas, saidas), grupo = linha, 0
+        entradas, saidas = Decimal(entradas or 0), Decimal(saidas or 0)
+        if data < data_inicio:
+            saldos_iniciais[grupo] += entradas - saidas
+            continue
+        valores = periodos[grupo][_inicio_periodo(data, periodo)]
+        valores[0] += entradas
+        valores[1] += saidas
+
+    campo_grupo = {
+        AGRUPAR_CONTA_CORRENTE: "conta_corrente_id", AGRUPAR_CATEGORIA: "categoria_id"
+    }.get(agrupar_por)
+    series = []
+    for grupo in sorted(set(saldos_iniciais) | set(periodos)):
+        saldo = saldos_iniciais[grupo]
+        serie: Dict[str, Any] = {}
+        if campo_grupo:
+            serie[campo_grupo] = grupo or None
+        serie["saldo_inicial"] = saldo
+        pontos = []
+        total_entradas = total_saidas = Decimal(0)
+        for inicio, (entradas, saidas) in sorted(periodos[grupo].items()):
+            saldo += entradas - saidas
+            total_entradas += entradas
+            total_saidas += saidas
+            pontos.append({"inicio": inicio, "entradas": entradas, "saidas": saidas, "saldo": saldo})
+        serie.update(
+            total_entradas=total_entradas, total_saidas=total_saidas, saldo_final=saldo, periodos=pontos
+        )
+        series.append(serie)
+    return series
@@ -0,0 +1,310 @@
+"""
+Cliente da API do Omie.
+
+Todas as chamadas compartilham um httpx.AsyncClient de vida longa (keep-alive
+e HTTP/2 quando o pacote h2 está instalado), então o handshake TLS é pago uma
+vez por processo e não a cada página. As listagens leem `total_de_paginas` na
+primeira página e buscam as demais em paralelo, limitadas por um semáforo e
+por um limite de requisições por segundo, com retentativas e backoff
+exponencial para falhas transitórias.
+"""
+import asyncio
+import logging
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import httpx
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+OMIE_BASE_URL = "https://app.omie.com.br/api/v1/"
+
+# Falhas do Omie que valem nova tentativa (servidor ocupado/consumo redundante)
+FAULTS_TRANSITORIAS = ("SOAP-ENV:Server", "REDUNDANT", "MISUSE_API_PROCESS")
+STATUS_TRANSITORIOS = (429, 502, 503, 504)
+
+# Os filtros de data do Omie usam o horário de Brasília (sem horário de verão desde 2019)
+FUSO_OMIE = timezone(timedelta(hours=-3))
+
+class OmieErro(Exception):
+    """Erro retornado pela API do Omie (faultstring)"""
+
+    def __init__(self, faultstring: str, faultcode: Optional[str] = None):
+        super().__init__(f"Erro da API Omie: {faultstring}")
+        self.faultstring = faultstring
+        self.faultcode = faultcode
+
+    @property
+    def transitorio(self) -> bool:
+        codigo = self.faultcode or ""
+        return any(marca in codigo for marca in FAULTS_TRANSITORIAS)
+
+    @property
+    def sem_registros(self) -> bool:
+        # Listagem vazia (comum na sincronização incremental) vem como fault 5113
+        return (self.faultcode or "").endswith("5113") or "Não existem registros" in self.faultstring
+
+# ==================== CLIENTE HTTP COMPARTILHADO ====================
+
+# Um cliente por event loop: conexões do pool ficam presas ao loop que as abriu
+_clientes_http: Dict[int, httpx.AsyncClient] = {}
+
+def _http2_disponivel() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+def get_http_client() -> httpx.AsyncClient:
+    """Cliente httpx compartilhado do event loop atual"""
+    loop_id = id(asyncio.get_running_loop())
+    client = _clientes_http.get(loop_id)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            http2=_http2_disponivel(),
+            limits=httpx.Limits(
+                max_connections=settings.OMIE_MAX_CONCORRENCIA * 2,
+                max_keepalive_connections=settings.OMIE_MAX_CONCORRENCIA,
+                keepalive_expiry=60.0,
+            ),
+            timeout=httpx.Timeout(30.0, connect=10.0),
+        )
+        _clientes_http[loop_id] = client
+    return client
+
+async def fechar_http_client() -> None:
+    """Fechar o cliente compartilhado do loop atual (shutdown da aplicação)"""
+    client = _clientes_http.pop(id(asyncio.get_running_loop()), None)
+    if client is not None:
+        await client.aclose()
+
+# ==================== LIMITE DE TAXA ====================
+
+class LimitadorTaxa:
+    """Espaça as requisições para no máximo `por_segundo` por segundo"""
+
+    def __init__(self, por_segundo: float):
+        self.intervalo = 1.0 / por_segundo if por_segundo > 0 else 0.0
+        self._proxima = 0.0
+        self._lock = asyncio.Lock()
+
+    async def aguardar(self) -> None:
+        if not self.intervalo:
+            return
+        async with self._lock:
+            agora = time.monotonic()
+            espera = self._proxima - agora
+            self._proxima = max(agora, self._proxima) + self.intervalo
+        if espera > 0:
+            await asyncio.sleep(espera)
+
+# ==================== CLIENTE OMIE ====================
+
+class OmieClient:
+    def __init__(
+        self,
+        app_key: str,
+        app_secret: str,
+        *,
+        base_url: Optional[str] = None,
+        timeout: float = 30.0,
+        max_retries: int = 3,
+        concorrencia: Optional[int] = None,
+        requisicoes_por_segundo: Optional[float] = None,
+        http_client: Optional[httpx.AsyncClient] = None
+    ):
+        self.app_key = app_key
+        self.app_secret = app_secret
+        self.base_url = base_url or OMIE_BASE_URL
+        if not self.base_url.endswith("/"):
+            self.base_url += "/"
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.concorrencia = concorrencia or settings.OMIE_MAX_CONCORRENCIA
+        self.requisicoes_por_segundo = (
+            requisicoes_por_segundo or settings.OMIE_REQUISICOES_POR_SEGUNDO
+        )
+        self._http_client = http_client
+        self._semaforo: Optional[asyncio.Semaphore] = None
+        self._limitador: Optional[LimitadorTaxa] = None
+
+    @classmethod
+    def from_integracao(cls, integracao, **kwargs) -> "OmieClient":
+        """Montar o cliente a partir de uma Integracao, honrando configuracoes_extras"""
+        extras = integracao.configuracoes_extras or {}
+        kwargs.setdefault("timeout", float(extras.get("timeout", 30)))
+        kwargs.setdefault("max_retries", int(extras.get("max_retries", 3)))
+        if "max_concorrencia" in extras:
+            kwargs.setdefault("concorrencia", int(extras["max_concorrencia"]))
+        if "requisicoes_por_segundo" in extras:
+            kwargs.setdefault("requisicoes_por_segundo", float(extras["requisicoes_por_segundo"]))
+        return cls(
+            integracao.app_key, integracao.app_secret, base_url=integracao.base_url, **kwargs
+        )
+
+    @property
+    def http_client(self) -> httpx.AsyncClient:
+        return self._http_client or get_http_client()
+
+    def _controles(self):
+        # Criados sob demanda para ficarem no event loop de quem usa o cliente
+        if self._semaforo is None:
+            self._semaforo = asyncio.Semaphore(self.concorrencia)
+            self._limitador = LimitadorTaxa(self.requisicoes_por_segundo)
+        return self._semaforo, self._limitador
+
+    def _backoff(self, tentativa: int, retry_after: Optional[str] = None) -> float:
+        if retry_after:
+            try:
+                return min(float(retry_after), 60.0)
+            except ValueError:
+                pass
+        return min(0.5 * 2 ** tentativa, 10.0) + random.uniform(0, 0.25)
+
+    async def chamar(self, endpoint: str, call: str, param: Dict[str, Any]) -> Dict[str, Any]:
+        """Executar uma chamada da API (ex.: endpoint="geral/empresas/", call="ListarEmpresas")"""
+        semaforo, limitador = self._controles()
+        payload = {
+            "call": call,
+            "app_key": self.app_key,
+            "app_secret": self.app_secret,
+            "param": [param],
+        }
+        url = f"{self.base_url}{endpoint}"
+
+        tentativa = 0
+        while True:
+            retry_after = None
+            try:
+                async with semaforo:
+                    await limitador.aguardar()
+                    response = await self.http_client.post(url, json=payload, timeout=self.timeout)
+                retry_after = response.headers.get("Retry-After")
+
+                data = None
+                try:
+                    data = response.json()
+                except ValueError:
+                    pass
+                if isinstance(data, dict) and "faultstring" in data:
+                    raise OmieErro(data["faultstring"], data.get("faultcode"))
+                if response.status_code in STATUS_TRANSITORIOS:
+                    raise httpx.HTTPStatusError(
+                        f"HTTP {response.status_code}", request=response.request, response=response
+                    )
+                response.raise_for_status()
+                return data
+            except OmieErro as e:
+                if not e.transitorio or tentativa >= self.max_retries:
+                    raise
+                erro = e
+            except httpx.HTTPStatusError as e:
+                if e.response.status_code not in STATUS_TRANSITORIOS or tentativa >= self.max_retries:
+                    raise
+                erro = e
+            except httpx.TransportError as e:
+                if tentativa >= self.max_retries:
+                    raise
+                erro = e
+
+            espera = self._backoff(tentativa, retry_after)
+            tentativa += 1
+            logger.warning(
+                f"Omie {call}: {erro!r}; nova tentativa {tentativa}/{self.max_retries} em {espera:.1f}s"
+            )
+            await asyncio.sleep(espera)
+
+    # ==================== EMPRESAS ====================
+
+    @staticmethod
+    def _filtro_alteracao(alterado_desde: Optional[datetime]) -> Dict[str, Any]:
+        """Parâmetros de filtro por data de inclusão/alteração (datetime em UTC)"""
+        if alterado_desde is None:
+            return {}
+        if alterado_desde.tzinfo is None:
+            alterado_desde = alterado_desde.replace(tzinfo=timezone.utc)
+        local = alterado_desde.astimezone(FUSO_OMIE)
+        return {
+            "filtrar_por_data_de": local.strftime("%d/%m/%Y"),
+            "filtrar_por_hora_de": local.strftime("%H:%M:%S"),
+        }
+
+    async def listar_empresas_pagina(
+        self,
+        pagina: int = 1,
+        registros_por_pagina: int = 50,
+        alterado_desde: Optional[datetime] = None
+    ) -> Dict[str, Any]:
+        return await self.chamar("geral/empresas/", "ListarEmpresas", {
+            "pagina": pagina,
+            "registros_por_pagina": registros_por_pagina,
+            "apenas_importado_api": "N",
+            **self._filtro_alteracao(alterado_desde),
+        })
+
+    async def iterar_paginas_empresas(
+        self,
+        registros_por_pagina: int = 50,
+        janela: Optional[int] = None,
+        alterado_desde: Optional[datetime] = None
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Gerar as listas `empresas_cadastro` de cada página. A primeira página
+        informa `total_de_paginas`; as demais são buscadas em paralelo e
+        entregues na ordem em que chegam.
+
+        No máximo `janela` páginas ficam pendentes (em voo ou aguardando o
+        consumidor): uma nova só é pedida quando outra é entregue, então um
+        consumidor lento segura o download em vez de acumular páginas.
+        Com `alterado_desde` (UTC) só vêm os registros incluídos ou alterados
+        a partir desse momento.
+        """
+        janela = janela or self.concorrencia * 2
+        try:
+            primeira = await self.listar_empresas_pagina(1, registros_por_pagina, alterado_desde)
+        except OmieErro as e:
+            if e.sem_registros:
+                return
+            raise
+        yield primeira.get("empresas_cadastro", [])
+
+        total_paginas = int(primeira.get("total_de_paginas") or 1)
+        paginas = iter(range(2, total_paginas + 1))
+        pendentes = set()
+
+        def pedir_proximas() -> None:
+            while len(pendentes) < janela:
+                pagina = next(paginas, None)
+                if pagina is None:
+                    return
+                pendentes.add(asyncio.ensure_future(
+                    self.listar_empresas_pagina(pagina, registros_por_pagina, alterado_desde)
+                ))
+
+        try:
+            pedir_proximas()
+            while pendentes:
+                prontas, _ = await asyncio.wait(pendentes, return_when=asyncio.FIRST_COMPLETED)
+                for tarefa in prontas:
+                    pendentes.discard(tarefa)
+                    yield tarefa.result().get("empresas_cadastro", [])
+                    pedir_proximas()
+        finally:
+            for tarefa in pendentes:
+                tarefa.cancel()
+            await asyncio.gather(*pendentes, return_exceptions=True)
+
+    async def listar_todas_empresas(
+        self, registros_por_pagina: int = 50, alterado_desde: Optional[datetime] = None
+    ) -> List[Dict[str, Any]]:
+        empresas: List[Dict[str, Any]] = []
+        async for pagina in self.iterar_paginas_empresas(
+            registros_por_pagina, alterado_desde=alterado_desde
+        ):
+            empresas.extend(pagina)
+        return empresas
@@ -0,0 +1,200 @@
+"""
+Pipeline de sincronização de empresas do Omie.
+
+Três etapas ligadas por filas limitadas, rodando ao mesmo tempo:
+
+    páginas da API -> validação (EmpresaOmieImport) -> gravação em lote
+
+Quando o banco fica para trás, as filas enchem e o download das páginas
+espera (backpressure), então a memória fica limitada a alguns lotes
+independente do tamanho do cadastro e a gravação sobrepõe a rede.
+"""
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Callable, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app import crud
+from app.core.config import settings
+from app.schemas.empresa import EmpresaOmieImport
+from app.services.omie import OmieClient
+
+logger = logging.getLogger(__name__)
+
+_FIM = None  # sentinela de fim de fila
+
+ENTIDADE_EMPRESAS = "empresas"
+MODO_DELTA = "delta"
+MODO_COMPLETO = "completo"
+
+# Folga para diferenças de relógio com o Omie; o hash evita regravar a sobreposição
+MARGEM_WATERMARK = timedelta(minutes=5)
+
+class ResultadoSincronizacao:
+    def __init__(self):
+        self.total_processados = 0
+        self.total_importados = 0
+        self.total_atualizados = 0
+        self.total_sem_alteracao = 0
+        self.paginas = 0
+        self.erros: List[str] = []
+        # Erros que podem não se repetir (ex.: falha de banco numa linha); os
+        # demais (validação, CNPJ duplicado) voltam a falhar com o mesmo registro
+        self.erros_transitorios = 0
+        self.modo = MODO_COMPLETO
+        self.alterado_desde: Optional[datetime] = None
+
+    @property
+    def total_erros(self) -> int:
+        return len(self.erros)
+
+async def _produzir_paginas(
+    client: OmieClient, registros_por_pagina: int, fila_paginas: asyncio.Queue,
+    resultado: ResultadoSincronizacao
+) -> None:
+    async for empresas in client.iterar_paginas_empresas(
+        registros_por_pagina, alterado_desde=resultado.alterado_desde
+    ):
+        resultado.paginas += 1
+        await fila_paginas.put(empresas)
+
+async def _validar(
+    fila_paginas: asyncio.Queue, fila_lotes: asyncio.Queue,
+    resultado: ResultadoSincronizacao, batch_size: int
+) -> None:
+    lote: List[EmpresaOmieImport] = []
+    while True:
+        empresas = await fila_paginas.get()
+        if empresas is _FIM:
+            break
+        for empresa_data in empresas:
+            resultado.total_processados += 1
+            try:
+                lote.append(EmpresaOmieImport(**empresa_data))
+            except Exception as e:
+                resultado.erros.append(
+                    f"Erro ao processar empresa {empresa_data.get('razao_social', 'N/A')}: {str(e)}"
+                )
+            if len(lote) >= batch_size:
+                await fila_lotes.put(lote)
+                lote = []
+    if lote:
+        await fila_lotes.put(lote)
+
+async def _gravar(
+    db: Session, fila_lotes: asyncio.Queue, resultado: ResultadoSincronizacao,
+    ao_gravar_lote: Optional[Callable[[ResultadoSincronizacao], None]] = None
+) -> None:
+    while True:
+        lote = await fila_lotes.get()
+        if lote is _FIM:
+            break
+        # O upsert é síncrono; numa thread ele não trava o event loop e o
+        # download das próximas páginas continua enquanto o lote é gravado
+        gravado = await asyncio.to_thread(
+            crud.empresa.bulk_upsert_from_omie, db, objs_in=lote, batch_size=len(lote)
+        )
+        resultado.total_importados += len(gravado.inseridas)
+        resultado.total_atualizados += len(gravado.atualizadas)
+        resultado.total_sem_alteracao += len(gravado.inalteradas)
+        resultado.erros.extend(gravado.erros)
+        resultado.erros_transitorios += len(gravado.transitorios)
+        if ao_gravar_lote is not None:
+            # Pode acessar o banco (progresso de job) ou lançar para interromper
+            await asyncio.to_thread(ao_gravar_lote, resultado)
+
+async def _encadear(etapa, fila_saida: asyncio.Queue) -> None:
+    # Sinaliza o fim para a próxima etapa assim que esta termina
+    await etapa
+    await fila_saida.put(_FIM)
+
+async def sincronizar_empresas(
+    db: Session,
+    client: OmieClient,
+    *,
+    registros_por_pagina: int = 50,
+    batch_size: Optional[int] = None,
+    max_paginas_em_fila: Optional[int] = None,
+    alterado_desde: Optional[datetime] = None,
+    ao_gravar_lote: Optional[Callable[[ResultadoSincronizacao], None]] = None
+) -> ResultadoSincronizacao:
+    """
+    Baixar, validar e gravar as empresas do Omie em fluxo contínuo.
+    Cada lote é gravado (e commitado) assim que fica completo. Com
+    `alterado_desde` (UTC) só os registros alterados desde então são baixados.
+    `ao_gravar_lote` é chamado (numa thread) com os totais parciais após cada lote.
+    """
+    batch_size = batch_size or settings.OMIE_SYNC_BATCH_SIZE
+    fila_paginas: asyncio.Queue = asyncio.Queue(maxsize=max_paginas_em_fila or settings.OMIE_SYNC_FILA_PAGINAS)
+    fila_lotes: asyncio.Queue = asyncio.Queue(maxsize=1)
+    resultado = ResultadoSincronizacao()
+    if alterado_desde is not None:
+        resultado.modo = MODO_DELTA
+        resultado.alterado_desde = alterado_desde
+
+    tarefas = [
+        asyncio.ensure_future(_encadear(
+            _produzir_paginas(client, registros_por_pagina, fila_paginas, resultado), fila_paginas
+        )),
+        asyncio.ensure_future(_encadear(
+            _validar(fila_paginas, fila_lotes, resultado, batch_size), fila_lotes
+        )),
+        asyncio.ensure_future(_gravar(db, fila_lotes, resultado, ao_gravar_lote)),
+    ]
+    try:
+        await asyncio.gather(*tarefas)
+    except BaseException:
+        # Uma etapa falhou: as outras ficariam presas nas filas
+        for tarefa in tarefas:
+            tarefa.cancel()
+        await asyncio.gather(*tarefas, return_exceptions=True)
+        raise
+
+    logger.info(
+        f"Sincronização Omie: {resultado.total_processados} processadas, "
+        f"{resultado.total_importados} importadas, {resultado.total_atualizados} atualizadas, "
+        f"{resultado.total_sem_alteracao} sem alteração, {resultado.total_erros} erros "
+        f"em {resultado.paginas} páginas ({resultado.modo})"
+    )
+    return resultado
+
+async def sincronizar_empresas_integracao(
+    db: Session,
+    integracao,
+    *,
+    modo: str = MODO_DELTA,
+    registros_por_pagina: int = 50,
+    client: Optional[OmieClient] = None,
+    ao_gravar_lote: Optional[Callable[[ResultadoSincronizacao], None]] = None
+) -> ResultadoSincronizacao:
+    """
+    Sincronizar as empresas de uma integração Omie.
+
+    No modo delta só são pedidos ao Omie os registros alterados desde a
+    marca d'água da última sincronização (sem marca, a primeira é
+    completa). Erros permanentes não seguram a marca: o mesmo registro
+    falharia de novo em toda sincronização, e quando for corrigido no Omie
+    a alteração o traz no próximo delta. Só erros transitórios mantêm a
+    marca, para que esses registros voltem na próxima.
+    """
+    client = client or OmieClient.from_integracao(integracao)
+    alterado_desde = None
+    if modo == MODO_DELTA:
+        watermark = crud.integracao.get_watermark(
+            db, integracao_id=integracao.id, entidade=ENTIDADE_EMPRESAS
+        )
+        if watermark is not None:
+            alterado_desde = watermark - MARGEM_WATERMARK
+
+    inicio = datetime.utcnow()
+    resultado = await sincronizar_empresas(
+        db, client, registros_por_pagina=registros_por_pagina, alterado_desde=alterado_desde,
+        ao_gravar_lote=ao_gravar_lote
+    )
+    if resultado.erros_transitorios == 0:
+        crud.integracao.set_watermark(
+            db, integracao_id=integracao.id, entidade=ENTIDADE_EMPRESAS, sincronizado_ate=inicio
+        )
+    return resultado
@@ -0,0 +1,125 @@
+"""
+Motor de saldos das contas correntes.
+
+`saldo_atual` é atualizado na mesma transação de cada lançamento, e cada
+dia com movimento tem uma linha em `saldos_diarios` com o movimento do dia
+e o acumulado até ele. O saldo numa data é o saldo inicial mais o acumulado
+da última linha até essa data: uma busca no índice (conta, data), sem somar
+o extrato. Lançamentos retroativos corrigem o acumulado dos dias seguintes
+com um único UPDATE.
+
+Hoje os lançamentos vêm dos pagamentos (saídas); novas origens só precisam
+chamar `movimentar` dentro da própria transação.
+"""
+from datetime import date
+from decimal import Decimal
+from typing import Iterable, Optional, Tuple
+
+from sqlalchemy import case, func, update
+from sqlalchemy.orm import Session
+
+from app.core import cache_respostas
+from app.models.financeiro import ContaCorrente, Pagamento, SaldoDiario
+
+# (conta_corrente_id, data, valor) — valor negativo para saídas
+Lancamento = Tuple[Optional[int], date, Decimal]
+
+def _travar_conta(db: Session, conta_corrente_id: int) -> Optional[ContaCorrente]:
+    return (
+        db.query(ContaCorrente)
+        .filter(ContaCorrente.id == conta_corrente_id)
+        .with_for_update()
+        .first()
+    )
+
+def _acumulado_ate(db: Session, conta_corrente_id: int, data: date) -> Decimal:
+    acumulado = (
+        db.query(SaldoDiario.acumulado)
+        .filter(SaldoDiario.conta_corrente_id == conta_corrente_id, SaldoDiario.data <= data)
+        .order_by(SaldoDiario.data.desc())
+        .limit(1)
+        .scalar()
+    )
+    return Decimal(acumulado or 0)
+
+def movimentar(db: Session, *, conta_corrente_id: Optional[int], data: date, valor: Decimal) -> None:
+    """Lançar `valor` na conta em `data`, sem commit (vale a transação de quem chama)"""
+    valor = Decimal(valor or 0)
+    if not conta_corrente_id or not valor:
+        return
+    # Serializa os lançamentos da conta até o commit
+    if _travar_conta(db, conta_corrente_id) is None:
+        return
+
+    existe = (
+        db.query(SaldoDiario.id)
+        .filter(SaldoDiario.conta_corrente_id == conta_corrente_id, SaldoDiario.data == data)
+        .first()
+    )
+    if existe is None:
+        db.add(SaldoDiario(
+            conta_corrente_id=conta_corrente_id,
+            data=data,
+            movimento=0,
+            acumulado=_acumulado_ate(db, conta_corrente_id, data)
+        ))
+        db.flush()
+
+    db.execute(
+        update(SaldoDiario)
+        .where(SaldoDiario.conta_corrente_id == conta_corrente_id, SaldoDiario.data >= data)
+        .values(
+            acumulado=SaldoDiario.acumulado + valor,
+            movimento=SaldoDiario.movimento + case((SaldoDiario.data == data, valor), else_=0)
+        )
+        .execution_options(synchronize_session="fetch")
+    )
+    db.execute(
+        update(ContaCorrente)
+        .where(ContaCorrente.id == conta_corrente_id)
+        .values(saldo_atual=func.coalesce(ContaCorrente.saldo_atual, 0) + valor)
+        .execution_options(synchronize_session="fetch")
+    )
+    # O saldo_atual sai nas listas de contas corrente em cache
+    cache_respostas.marcar(db, cache_respostas.CONTAS_CORRENTE)
+
+def aplicar_lancamentos(db: Session, lancamentos: Iterable[Lancamento]) -> None:
+    """Aplicar vários lançamentos travando as contas sempre na mesma ordem (evita deadlock)"""
+    for conta_corrente_id, data, valor in sorted(
+        (l for l in lancamentos if l[0]), key=lambda l: (l[0], l[1])
+    ):
+        movimentar(db, conta_corrente_id=conta_corrente_id, data=data, valor=valor)
+
+def saldo_em(db: Session, *, conta: ContaCorrente, data: date) -> Decimal:
+    """Saldo da conta ao fim do dia `data`"""
+    return Decimal(conta.saldo_inicial or 0) + _acumulado_ate(db, conta.id, data)
+
+def reconstruir_saldos(db: Session, *, conta_corrente_id: int) -> Optional[ContaCorrente]:
+    """
+    Refazer os saldos diários e o saldo_atual a partir dos lançamentos
+    (carga inicial e correções), sem commit.
+    """
+    conta = _travar_conta(db, conta_corrente_id)
+    if conta is None:
+        return None
+    db.query(SaldoDiario).filter(SaldoDiario.conta_corrente_id == conta_corrente_id).delete(
+        synchronize_session=False
+    )
+
+    movimentos = (
+        db.query(Pagamento.data_pagamento, (-func.sum(Pagamento.valor)).label("movimento"))
+        .filter(Pagamento.conta_corrente_id == conta_corrente_id)
+        .group_by(Pagamento.data_pagamento)
+        .order_by(Pagamento.data_pagamento)
+        .all()
+    )
+    acumulado = Decimal(0)
+    for data, movimento in movimentos:
+        acumulado += Decimal(movimento)
+        db.add(SaldoDiario(
+            conta_corrente_id=conta_corrente_id, data=data, movimento=movimento, acumulado=acumulado
+        ))
+    conta.saldo_atual = Decimal(conta.saldo_inicial or 0) + acumulado
+    cache_respostas.marcar(db, cache_respostas.CONTAS_CORRENTE)
+    db.flush()
+    return conta
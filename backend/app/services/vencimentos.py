@@ -0,0 +1,70 @@
+"""
+Marcação dos títulos vencidos.
+
+Contas a pagar/receber pendentes com vencimento anterior a hoje passam a
+VENCIDO com um único UPDATE por tabela, apoiado no índice parcial de
+`data_vencimento` dos pendentes. A rotina é idempotente: rodar de novo no
+mesmo dia (outro worker, restart) não altera nada. Cada execução fica
+registrada em `execucoes_rotinas` com as contagens e a duração.
+"""
+import logging
+import time
+from datetime import date, datetime
+from typing import Dict, Optional
+
+from sqlalchemy import func, update
+from sqlalchemy.orm import Session
+
+from app.core import cache_respostas
+from app.models.financeiro import ContaPagar, ContaReceber, StatusConta
+from app.models.job import ExecucaoRotina, StatusJob
+
+logger = logging.getLogger(__name__)
+
+ROTINA_MARCAR_VENCIDOS = "marcar_vencidos"
+
+def marcar_vencidos(db: Session, *, hoje: Optional[date] = None) -> Dict[str, int]:
+    """Passar os pendentes vencidos para VENCIDO, sem commit; retorna as linhas por tabela"""
+    referencia = hoje or func.current_date()
+    contadores: Dict[str, int] = {}
+    for modelo, filtros in (
+        (ContaPagar, ()),
+        # Recebida e ainda pendente é inconsistência de cadastro, não atraso
+        (ContaReceber, (ContaReceber.data_recebimento.is_(None),)),
+    ):
+        resultado = db.execute(
+            update(modelo)
+            .where(
+                modelo.status == StatusConta.PENDENTE,
+                modelo.data_vencimento < referencia,
+                *filtros
+            )
+            .values(status=StatusConta.VENCIDO)
+            .execution_options(synchronize_session=False)
+        )
+        contadores[modelo.__tablename__] = resultado.rowcount
+    if any(contadores.values()):
+        cache_respostas.marcar(db, cache_respostas.LANCAMENTOS)
+    return contadores
+
+def executar_marcacao(db: Session, *, hoje: Optional[date] = None) -> ExecucaoRotina:
+    """Rodar a marcação numa transação e gravar o histórico da execução"""
+    execucao = ExecucaoRotina(rotina=ROTINA_MARCAR_VENCIDOS, iniciado_em=datetime.utcnow())
+    inicio = time.perf_counter()
+    try:
+        execucao.contadores = marcar_vencidos(db, hoje=hoje)
+        db.commit()
+        execucao.status = StatusJob.CONCLUIDO.value
+    except Exception as e:
+        db.rollback()
+        execucao.status = StatusJob.ERRO.value
+        execucao.mensagem = str(e) or repr(e)
+        logger.exception(f"Falha ao marcar títulos vencidos: {execucao.mensagem}")
+    execucao.duracao_ms = int((time.perf_counter() - inicio) * 1000)
+    execucao.finalizado_em = datetime.utcnow()
+    db.add(execucao)
+    db.commit()
+    db.refresh(execucao)
+    if execucao.status == StatusJob.CONCLUIDO.value:
+        logger.info(f"Títulos marcados como vencidos: {execucao.contadores} ({execucao.duracao_ms} ms)")
+    return execucao
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Serialization benchmark for ERP Claude list endpoints
+Seeds empresas and measures the per-row cost of producing the JSON body of
+one empresas page, before and after the row projection + orjson path:
+
+    orm + pydantic + json   ORM entities, Empresa.from_orm, jsonable_encoder
+                            and the stdlib json (the previous endpoint body)
+    projection + orjson     columns projected into dicts (app.db.projecao)
+                            and RespostaJSON (app.core.serializacao)
+
+Each path is split into fetch (query and row building), convert (schema
+validation / encoding to JSON types) and encode (bytes). Both paths must
+produce the same JSON; the script exits with status 1 otherwise.
+
+Usage:
+    python benchmark_serialization.py                       # temporary SQLite database
+    python benchmark_serialization.py --rows 1000 --repeat 50
+    DATABASE_URL=postgresql://... python benchmark_serialization.py
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import logging
+import time
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, List
+
+if not os.getenv("DATABASE_URL"):
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'benchmark.db')}"
+
+# Add the app directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.core import serializacao
+from app.db.pagination import paginated_response
+from app.db.projecao import projetar
+from app.db.session import Base, SessionLocal, engine
+from app.models import Empresa as EmpresaModel
+from app.schemas.empresa import Empresa
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+logger = logging.getLogger(__name__)
+
+def seed(db: Session, rows: int) -> None:
+    """Bulk insert `rows` empresas with every column filled"""
+    random.seed(42)
+    agora = datetime(2024, 1, 1, 12, 0, 0)
+    db.execute(insert(EmpresaModel), [
+        {
+            "codigo_cliente_omie": i,
+            "codigo_cliente_integracao": f"INT{i:08d}",
+            "razao_social": f"Empresa de Teste {i} Comércio e Serviços Ltda",
+            "nome_fantasia": f"Teste {i}",
+            "cnpj": f"{i:014d}",
+            "inscricao_estadual": f"{random.randint(0, 10**12):012d}",
+            "inscricao_municipal": f"{random.randint(0, 10**8):08d}",
+            "inscricao_suframa": None,
+            "endereco": "Avenida Paulista",
+            "endereco_numero": str(random.randint(1, 3000)),
+            "bairro": "Bela Vista",
+            "complemento": "Sala 101",
+            "cidade": "São Paulo",
+            "estado": "SP",
+            "cep": "01310-100",
+            "codigo_pais": "1058",
+            "telefone1_ddd": "11",
+            "telefone1_numero": f"9{random.randint(0, 10**8):08d}",
+            "telefone2_ddd": "11",
+            "telefone2_numero": f"3{random.randint(0, 10**7):07d}",
+            "fax_ddd": None,
+            "fax_numero": None,
+            "email": f"contato{i}@example.com",
+            "homepage": f"https://empresa{i}.example.com",
+            "optante_simples_nacional": random.choice("SN"),
+            "data_abertura": date(2000, 1, 1) + timedelta(days=random.randint(0, 8000)),
+            "cnae": "4751201",
+            "tipo_atividade": random.choice("012345"),
+            "codigo_regime_tributario": random.choice("123"),
+            "codigo_banco": "001",
+            "agencia": "1234",
+            "conta_corrente": f"{random.randint(0, 10**6):06d}-{random.randint(0, 9)}",
+            "doc_titular": f"{i:014d}",
+            "nome_titular": f"Empresa de Teste {i}",
+            "observacoes": "Cliente importado do Omie",
+            "inativo": "N",
+            "bloqueado": "N",
+            "created_at": agora,
+            "updated_at": agora + timedelta(seconds=i),
+        }
+        for i in range(1, rows + 1)
+    ])
+    db.commit()
+
+def orm_pydantic_json(db: Session, limit: int) -> Dict[str, Callable]:
+    """Previous empresas list body: ORM entities validated by the schema, stdlib json"""
+    etapas = {}
+    etapas["fetch"] = lambda _: db.query(EmpresaModel).order_by(EmpresaModel.id).limit(limit).all()
+    etapas["convert"] = lambda itens: jsonable_encoder(
+        paginated_response([Empresa.from_orm(item) for item in itens], len(itens), limit=limit)
+    )
+    etapas["encode"] = lambda corpo: json.dumps(
+        corpo, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+    return etapas
+
+def projection_orjson(db: Session, limit: int) -> Dict[str, Callable]:
+    """Current empresas list body: projected dicts encoded by RespostaJSON"""
+    etapas = {}
+    etapas["fetch"] = lambda _: projetar(
+        db.query(EmpresaModel).order_by(EmpresaModel.id), EmpresaModel, Empresa
+    ).limit(limit).all()
+    etapas["convert"] = lambda itens: paginated_response(itens, len(itens), limit=limit)
+    etapas["encode"] = serializacao.dumps
+    return etapas
+
+def measure(db: Session, etapas: Dict[str, Callable], repeat: int) -> Dict[str, float]:
+    """Best time of each stage over `repeat` runs (seconds) and the last body"""
+    melhores = {nome: float("inf") for nome in etapas}
+    corpo = None
+    for _ in range(repeat):
+        # Every run starts from a clean session, as a request would
+        db.expunge_all()
+        valor = None
+        for nome, etapa in etapas.items():
+            inicio = time.perf_counter()
+            valor = etapa(valor)
+            melhores[nome] = min(melhores[nome], time.perf_counter() - inicio)
+        corpo = valor
+    melhores["body"] = corpo
+    return melhores
+
+def benchmark(rows: int, repeat: int) -> int:
+    logger.info(f"🔗 Database: {engine.url.render_as_string(hide_password=True)}")
+    logger.info(f"🧰 JSON encoder: {'orjson' if serializacao.orjson is not None else 'json (orjson not installed)'}")
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        if db.query(EmpresaModel.id).first() is None:
+            logger.info(f"🌱 Seeding {rows} empresas...")
+            seed(db, rows)
+
+        resultados = {
+            "orm + pydantic + json": measure(db, orm_pydantic_json(db, rows), repeat),
+            "projection + orjson": measure(db, projection_orjson(db, rows), repeat),
+        }
+    finally:
+        db.close()
+
+    antes, depois = resultados.values()
+    if json.loads(antes["body"]) != json.loads(depois["body"]):
+        logger.error("❌ The two paths produced different JSON bodies")
+        return 1
+
+    logger.info(f"📦 {rows} rows per page, {len(depois['body']) / rows:.0f} bytes per row, best of {repeat} runs")
+    logger.info(f"{'µs per row':<24}{'fetch':>10}{'convert':>10}{'encode':>10}{'total':>10}")
+    for nome, tempos in resultados.items():
+        etapas = [tempos[etapa] * 1e6 / rows for etapa in ("fetch", "convert", "encode")]
+        logger.info(f"{nome:<24}" + "".join(f"{valor:>10.2f}" for valor in etapas) + f"{sum(etapas):>10.2f}")
+    total_antes = sum(antes[etapa] for etapa in ("fetch", "convert", "encode"))
+    total_depois = sum(depois[etapa] for etapa in ("fetch", "convert", "encode"))
+    logger.info(f"✅ {total_antes / total_depois:.1f}x faster per page")
+    return 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1000, help="empresas seeded and returned in one page")
+    parser.add_argument("--repeat", type=int, default=20, help="runs per path (the best one is reported)")
+    args = parser.parse_args()
+    sys.exit(benchmark(args.rows, args.repeat))
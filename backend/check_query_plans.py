@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Query plan check for ERP Claude
+Seeds a database with a realistic volume of financial data, runs EXPLAIN on
+every statement issued by the CRUD hot paths and exits with status 1 when a
+sequential scan shows up on one of the large tables.
+
+Usage:
+    python check_query_plans.py                  # temporary SQLite database
+    DATABASE_URL=postgresql://... python check_query_plans.py --rows 50000
+
+Point it at an empty scratch database: tables are created and seeded.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import logging
+from contextlib import contextmanager
+from datetime import date, timedelta
+from typing import Callable, List, Tuple
+
+if not os.getenv("DATABASE_URL"):
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'query_plans.db')}"
+
+# Add the app directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import event, insert, text
+from sqlalchemy.orm import Session
+
+from app import crud
+from app.db.session import Base, SessionLocal, engine
+from app.models import *
+from app.models.financeiro import StatusConta, TipoPagamento, TipoPessoa
+from app.services import fluxo_caixa, saldos, vencimentos
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+logger = logging.getLogger(__name__)
+
+# Tables that grow with the business; a full scan on them is a regression
+LARGE_TABLES = {
+    "contas_pagar", "contas_receber", "pagamentos", "saldos_diarios", "fluxo_caixa_diario",
+}
+
+USERS = 20
+SUPPLIERS = 200
+CATEGORIES = 20
+ACCOUNTS = 10
+
+def seed(db: Session, rows: int) -> None:
+    """Bulk insert `rows` contas a pagar/receber and pagamentos (Core inserts, no ORM events)"""
+    random.seed(42)
+    conn = db.connection()
+    start = date(2020, 1, 1)
+    day = lambda: start + timedelta(days=random.randint(0, 365 * 6))
+
+    conn.execute(insert(User), [
+        {"id": i, "email": f"user{i}@example.com", "hashed_password": "x", "is_active": True, "is_superuser": False}
+        for i in range(1, USERS + 1)
+    ])
+    conn.execute(insert(Categoria), [
+        {"id": i, "nome": f"Categoria {i}", "ativa": True} for i in range(1, CATEGORIES + 1)
+    ])
+    conn.execute(insert(ClienteFornecedor), [
+        {"id": i, "nome": f"Fornecedor {i}", "tipo_pessoa": TipoPessoa.JURIDICA, "eh_fornecedor": True, "ativo": True}
+        for i in range(1, SUPPLIERS + 1)
+    ])
+    conn.execute(insert(ContaCorrente), [
+        {"id": i, "nome": f"Conta {i}", "banco": "Banco", "agencia": "0001", "conta": str(i),
+         "saldo_inicial": 0, "saldo_atual": 0, "ativa": True}
+        for i in range(1, ACCOUNTS + 1)
+    ])
+    statuses = [StatusConta.PENDENTE] * 3 + [StatusConta.PAGO] * 6 + [StatusConta.VENCIDO, StatusConta.CANCELADO]
+    conn.execute(insert(ContaPagar), [
+        {"id": i, "descricao": f"Conta {i}", "fornecedor_id": random.randint(1, SUPPLIERS),
+         "categoria_id": random.randint(1, CATEGORIES), "conta_corrente_id": random.randint(1, ACCOUNTS),
+         "valor_original": 100, "valor_pago": 0, "data_vencimento": day(),
+         "status": random.choice(statuses), "user_id": random.randint(1, USERS)}
+        for i in range(1, rows + 1)
+    ])
+    conn.execute(insert(ContaReceber), [
+        {"id": i, "descricao": f"Receber {i}", "cliente": "Cliente", "valor": 100, "data_vencimento": day(),
+         "status": random.choice(statuses), "user_id": random.randint(1, USERS)}
+        for i in range(1, rows + 1)
+    ])
+    conn.execute(insert(Pagamento), [
+        {"id": i, "conta_pagar_id": random.randint(1, rows), "conta_corrente_id": random.randint(1, ACCOUNTS),
+         "valor": 50, "data_pagamento": day(), "tipo_pagamento": TipoPagamento.PIX, "user_id": 1}
+        for i in range(1, rows + 1)
+    ])
+    for conta_id in range(1, ACCOUNTS + 1):
+        saldos.reconstruir_saldos(db, conta_corrente_id=conta_id)
+    fluxo_caixa.reconstruir_fluxo_caixa(db)
+    db.commit()
+
+    # Planner statistics for the freshly loaded tables
+    db.execute(text("ANALYZE"))
+    db.commit()
+
+@contextmanager
+def captured_statements(db: Session):
+    """Collect (sql, parameters) of every SELECT/UPDATE/DELETE issued by the session"""
+    statements: List[Tuple[str, object]] = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().split(" ", 1)[0].upper() in ("SELECT", "UPDATE", "DELETE", "WITH"):
+            statements.append((statement, parameters))
+
+    connection = db.connection()
+    event.listen(connection, "before_cursor_execute", capture)
+    try:
+        yield statements
+    finally:
+        event.remove(connection, "before_cursor_execute", capture)
+
+def _plan_nodes(plan):
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from _plan_nodes(child)
+
+def full_scans(db: Session, statement: str, parameters) -> Tuple[List[str], List[str]]:
+    """Large tables read by a sequential scan in the plan, plus the plan lines"""
+    conn = db.connection()
+    if engine.dialect.name == "postgresql":
+        raw = conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters).scalar()
+        plan = (json.loads(raw) if isinstance(raw, str) else raw)[0]["Plan"]
+        nodes = list(_plan_nodes(plan))
+        lines = [f"{n['Node Type']} {n.get('Relation Name', '')} {n.get('Index Name', '')}".strip() for n in nodes]
+        scans = [n["Relation Name"] for n in nodes if n["Node Type"] == "Seq Scan" and n.get("Relation Name") in LARGE_TABLES]
+        return scans, lines
+
+    rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+    lines = [row[-1] for row in rows]
+    scans = []
+    for line in lines:
+        # "SCAN contas_pagar" reads the whole table; "SEARCH ..." and "... USING INDEX" do not
+        words = line.split()
+        if len(words) >= 2 and words[0] == "SCAN" and "USING" not in words and words[1] in LARGE_TABLES:
+            scans.append(words[1])
+    return scans, lines
+
+def hot_paths(rows: int) -> List[Tuple[str, Callable[[Session], object]]]:
+    """CRUD methods served by the financial endpoints"""
+    today = date(2023, 6, 1)
+
+    def keyset_second_page(db: Session):
+        _, cursor = crud.crud_conta_pagar.get_multi_by_user_keyset(db, user_id=3, cursor="", limit=50)
+        return crud.crud_conta_pagar.get_multi_by_user_keyset(db, user_id=3, cursor=cursor, limit=50)
+
+    return [
+        ("crud_conta_pagar.get", lambda db: crud.crud_conta_pagar.get(db, id=rows // 2)),
+        ("crud_conta_pagar.get_for_update", lambda db: crud.crud_conta_pagar.get_for_update(db, id=rows // 2)),
+        ("crud_conta_pagar.get_multi_by_user", lambda db: crud.crud_conta_pagar.get_multi_by_user(db, user_id=3)),
+        ("crud_conta_pagar.get_multi_by_user_keyset", keyset_second_page),
+        ("crud_conta_receber.get_multi_by_user", lambda db: crud.crud_conta_receber.get_multi_by_user(db, user_id=3)),
+        ("crud_pagamento.get_by_conta_pagar", lambda db: crud.crud_pagamento.get_by_conta_pagar(db, conta_pagar_id=rows // 2)),
+        ("crud_pagamento._recalcular_conta_pagar",
+         lambda db: crud.crud_pagamento._recalcular_conta_pagar(db, conta_pagar_id=rows // 2)),
+        ("crud_conta_corrente.get_saldo_em",
+         lambda db: crud.crud_conta_corrente.get_saldo_em(db, db_obj=crud.crud_conta_corrente.get(db, id=1), data=today)),
+        ("fluxo_caixa.projetar",
+         lambda db: fluxo_caixa.projetar(db, data_inicio=today, data_fim=today + timedelta(days=90))),
+        ("vencimentos.marcar_vencidos", lambda db: vencimentos.marcar_vencidos(db, hoje=today)),
+    ]
+
+def check_query_plans(rows: int) -> int:
+    logger.info(f"🔗 Database: {engine.url.render_as_string(hide_password=True)}")
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    failures = 0
+    try:
+        if db.query(ContaPagar.id).first() is None:
+            logger.info(f"🌱 Seeding {rows} rows per table...")
+            seed(db, rows)
+
+        for name, call in hot_paths(rows):
+            with captured_statements(db) as statements:
+                call(db)
+            for statement, parameters in statements:
+                scans, lines = full_scans(db, statement, parameters)
+                if scans:
+                    failures += 1
+                    logger.error(f"❌ {name}: sequential scan on {', '.join(sorted(set(scans)))}")
+                    logger.error("   " + " ".join(statement.split()))
+                    for line in lines:
+                        logger.error(f"     {line}")
+                else:
+                    logger.info(f"✅ {name}: {' | '.join(lines)}")
+            # Nothing from the checks is kept
+            db.rollback()
+    finally:
+        db.close()
+
+    if failures:
+        logger.error(f"❌ {failures} statement(s) with sequential scans on large tables")
+        return 1
+    logger.info("✅ No sequential scans on large tables")
+    return 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20000, help="rows seeded per large table")
+    args = parser.parse_args()
+    sys.exit(check_query_plans(args.rows))
@@ -13,8 +13,9 @@ from sqlalchemy.orm import sessionmaker
 # Add the app directory to Python path
 sys.path.append('/app')
 
-# Import models from the main.py file
-from main import Base, User, Empresa, Integracao, get_password_hash
+from app.models import User
+from app.core.security import get_password_hash
+from migrate_database import upgrade_schema
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -31,10 +32,10 @@ def init_database():
         # Create engine
         engine = create_engine(database_url, echo=True)
         
-        # Create all tables
-        logger.info("🗃️ Creating database tables...")
-        Base.metadata.create_all(bind=engine)
-        logger.info("✅ Database tables created successfully!")
+        # Apply the migrations
+        logger.info("🗃️ Applying migrations...")
+        upgrade_schema(engine)
+        logger.info("✅ Database schema up to date!")
         
         # Create session
         SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -1,13 +1,20 @@
 #!/usr/bin/env python3
 """
 Database migration script for ERP Claude
-This script creates the new tables for the contas a pagar system
+Applies the Alembic migrations (alembic/versions) and fills the derived
+tables and default data. Run it once per deploy, before starting the API:
+the API workers no longer touch the schema at startup.
+
+Databases created before Alembic (create_all) are brought up to the
+baseline revision and stamped, then upgraded like any other.
 """
 
 import os
 import sys
 import logging
-from sqlalchemy import create_engine, text
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import Enum, create_engine, inspect, text
 from sqlalchemy.orm import sessionmaker
 
 # Add the app directory to Python path
@@ -16,13 +23,119 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 # Import all models to ensure they are registered
 from app.models import *
 from app.db.session import Base
+from app.core.security import get_password_hash
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Revision matching the schema that create_all used to build
+BASELINE_REVISION = "0001"
+
+DEFAULT_USERS = [
+    ("admin@example.com", "Administrador do Sistema", "changethis", True),
+    ("financeiro@example.com", "Elon Alb", "fin123", False),
+    ("user@example.com", "Maria Silva", "user123", False),
+]
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+def add_missing_columns(engine):
+    """Add model columns missing from existing tables (create_all only creates new tables)"""
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                column_type = column.type.compile(dialect=engine.dialect)
+                conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+                logger.info(f"  ➕ Added column {table.name}.{column.name}")
+
+def rename_enum_labels(engine):
+    """Rename Postgres enum labels created from member names to the member values"""
+    if engine.dialect.name != "postgresql":
+        return
+    enum_types = {}
+    for table in Base.metadata.sorted_tables:
+        for column in table.columns:
+            if isinstance(column.type, Enum) and column.type.enum_class and column.type.native_enum:
+                enum_types[column.type.name] = column.type.enum_class
+    with engine.begin() as conn:
+        for type_name, enum_class in enum_types.items():
+            labels = set(conn.execute(
+                text("SELECT e.enumlabel FROM pg_enum e JOIN pg_type t ON t.oid = e.enumtypid WHERE t.typname = :name"),
+                {"name": type_name}
+            ).scalars())
+            for member in enum_class:
+                if member.name in labels and member.value not in labels:
+                    conn.exec_driver_sql(
+                        f"ALTER TYPE {type_name} RENAME VALUE '{member.name}' TO '{member.value}'"
+                    )
+                    logger.info(f"  ✏️ Renamed {type_name}.{member.name} to {member.value}")
+
+def alembic_config(database_url):
+    config = Config(os.path.join(BASE_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(BASE_DIR, "alembic"))
+    config.set_main_option("sqlalchemy.url", database_url.replace("%", "%%"))
+    config.attributes["configurar_logging"] = False
+    return config
+
+def adopt_legacy_database(engine, config):
+    """Bring a pre-Alembic database (built by create_all) to the baseline and stamp it"""
+    inspector = inspect(engine)
+    if inspector.has_table("alembic_version") or not inspector.has_table("users"):
+        return False
+    logger.info("🏷️ Database without migration history, adopting it...")
+    Base.metadata.create_all(bind=engine)
+    add_missing_columns(engine)
+    # Enum columns now store the values ("pendente") sent by the API
+    rename_enum_labels(engine)
+    command.stamp(config, BASELINE_REVISION)
+    logger.info(f"  🏷️ Stamped at revision {BASELINE_REVISION}")
+    return True
+
+def upgrade_schema(engine):
+    """Apply the pending Alembic migrations"""
+    config = alembic_config(engine.url.render_as_string(hide_password=False))
+    adopt_legacy_database(engine, config)
+    command.upgrade(config, "head")
+
+def rebuild_balances(engine):
+    """Fill saldos_diarios and saldo_atual from the existing payments (first run only)"""
+    from app.services.saldos import reconstruir_saldos
+    
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    db = SessionLocal()
+    try:
+        if db.query(SaldoDiario.id).first() is not None:
+            return
+        for (conta_id,) in db.query(ContaCorrente.id).all():
+            reconstruir_saldos(db, conta_corrente_id=conta_id)
+            logger.info(f"  💰 Rebuilt balances for conta corrente {conta_id}")
+        db.commit()
+    finally:
+        db.close()
+
+def rebuild_cash_flow(engine):
+    """Fill fluxo_caixa_diario from the open contas a pagar/receber (first run only)"""
+    from app.services.fluxo_caixa import reconstruir_fluxo_caixa
+    
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    db = SessionLocal()
+    try:
+        if db.query(FluxoCaixaDiario.id).first() is not None:
+            return
+        reconstruir_fluxo_caixa(db)
+        db.commit()
+    finally:
+        db.close()
+
 def migrate_database():
-    """Create new tables for the contas a pagar system"""
+    """Apply the migrations and fill derived tables and default data"""
     
     # Get database URL from environment or use SQLite default
     database_url = os.getenv("DATABASE_URL", "sqlite:///./erp_database.db")
@@ -32,10 +145,18 @@ def migrate_database():
         # Create engine
         engine = create_engine(database_url, echo=True)
         
-        # Create all tables (this will only create new ones)
-        logger.info("🗃️ Creating new database tables...")
-        Base.metadata.create_all(bind=engine)
-        logger.info("✅ Database tables created successfully!")
+        # Schema changes, including the indexes (CONCURRENTLY on Postgres)
+        logger.info("🗃️ Applying migrations...")
+        upgrade_schema(engine)
+        logger.info("✅ Database schema up to date!")
+        
+        # Daily balance snapshots for the running balance engine
+        logger.info("💰 Building daily balances...")
+        rebuild_balances(engine)
+        
+        # Pre-aggregated buckets for the cash-flow projection
+        logger.info("📈 Building cash-flow buckets...")
+        rebuild_cash_flow(engine)
         
         # Create session
         SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -65,8 +186,8 @@ def migrate_database():
                 
                 for nome, descricao in default_categories:
                     db.execute(text(
-                        "INSERT INTO categorias (nome, descricao, ativa, created_at) "
-                        "VALUES (:nome, :descricao, :ativa, datetime('now'))"
+                        "INSERT INTO categorias (nome, descricao, ativa) "
+                        "VALUES (:nome, :descricao, :ativa)"
                     ), {"nome": nome, "descricao": descricao, "ativa": True})
                     logger.info(f"  ➕ Created category: {nome}")
                 
@@ -75,6 +196,22 @@ def migrate_database():
             else:
                 logger.info("📂 Categories already exist in database")
             
+            # Default users (created by main.py at import time before Alembic)
+            if db.query(User.id).first() is None:
+                logger.info("👤 Creating default users...")
+                for email, name, password, is_superuser in DEFAULT_USERS:
+                    db.add(User(
+                        email=email,
+                        full_name=name,
+                        hashed_password=get_password_hash(password),
+                        is_active=True,
+                        is_superuser=is_superuser
+                    ))
+                    logger.info(f"  ➕ Created user: {email}")
+                db.commit()
+            else:
+                logger.info("👤 Users already exist in database")
+            
             return True
             
         except Exception as e:
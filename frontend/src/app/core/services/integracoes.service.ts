@@ -1,6 +1,7 @@
 import { Injectable } from '@angular/core';
 import { HttpClient, HttpParams } from '@angular/common/http';
-import { Observable } from 'rxjs';
+import { Observable, timer } from 'rxjs';
+import { switchMap, takeWhile } from 'rxjs/operators';
 import { environment } from '../../../environments/environment';
 
 export interface Integracao {
@@ -63,6 +64,25 @@ export interface SincronizacaoResponse {
   detalhes?: any;
 }
 
+// Resposta de POST /integracoes/sincronizar: a sincronização roda como job
+export interface SincronizacaoIniciada {
+  message: string;
+  job_id: number;
+  status: string;
+}
+
+export interface Job {
+  id: number;
+  tipo: string;
+  status: string;
+  resultado?: any;
+  mensagem?: string;
+  progresso_atual: number;
+  progresso_total?: number;
+}
+
+export const STATUS_JOB_FINAIS = ['concluido', 'erro', 'cancelado'];
+
 export interface TipoIntegracao {
   codigo: string;
   nome: string;
@@ -122,8 +142,20 @@ export class IntegracoesService {
     return this.http.post<IntegracaoPublic>(`${this.apiUrl}/omie/configurar`, null, { params });
   }
 
-  sincronizarDados(request: SincronizacaoRequest): Observable<SincronizacaoResponse> {
-    return this.http.post<SincronizacaoResponse>(`${this.apiUrl}/sincronizar`, request);
+  sincronizarDados(request: SincronizacaoRequest): Observable<SincronizacaoIniciada> {
+    return this.http.post<SincronizacaoIniciada>(`${this.apiUrl}/sincronizar`, request);
+  }
+
+  getJob(id: number): Observable<Job> {
+    return this.http.get<Job>(`${environment.apiUrl}/jobs/${id}`);
+  }
+
+  // Consulta o job periodicamente até ele terminar (emite também o estado final)
+  acompanharJob(id: number, intervaloMs: number = 2000): Observable<Job> {
+    return timer(0, intervaloMs).pipe(
+      switchMap(() => this.getJob(id)),
+      takeWhile(job => !STATUS_JOB_FINAIS.includes(job.status), true)
+    );
   }
 
   getTiposDisponiveis(): Observable<{ tipos: TipoIntegracao[] }> {
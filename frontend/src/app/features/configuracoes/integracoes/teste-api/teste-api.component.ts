@@ -1,14 +1,16 @@
-import { Component, OnInit } from '@angular/core';
+import { Component, OnDestroy, OnInit } from '@angular/core';
 import { FormBuilder, FormGroup, Validators } from '@angular/forms';
 import { Router } from '@angular/router';
-import { IntegracoesService, IntegracaoPublic, IntegracaoTeste, SincronizacaoRequest, SincronizacaoResponse } from '../../../../core/services/integracoes.service';
+import { Subscription } from 'rxjs';
+import { switchMap } from 'rxjs/operators';
+import { IntegracoesService, IntegracaoPublic, IntegracaoTeste, Job, STATUS_JOB_FINAIS, SincronizacaoRequest, SincronizacaoResponse } from '../../../../core/services/integracoes.service';
 
 @Component({
   selector: 'app-teste-api',
   templateUrl: './teste-api.component.html',
   styleUrls: ['./teste-api.component.scss']
 })
-export class TesteApiComponent implements OnInit {
+export class TesteApiComponent implements OnInit, OnDestroy {
   testeForm: FormGroup;
   integracoes: IntegracaoPublic[] = [];
   loading = false;
@@ -18,6 +20,8 @@ export class TesteApiComponent implements OnInit {
   // Resultados
   ultimoTeste: IntegracaoTeste | null = null;
   ultimaSincronizacao: SincronizacaoResponse | null = null;
+  progressoSincronizacao = 0;
+  private sincronizacaoSub?: Subscription;
   
   // Configuração rápida do Omie
   omieForm: FormGroup;
@@ -44,6 +48,10 @@ export class TesteApiComponent implements OnInit {
     this.loadIntegracoes();
   }
 
+  ngOnDestroy(): void {
+    this.sincronizacaoSub?.unsubscribe();
+  }
+
   createTesteForm(): FormGroup {
     return this.fb.group({
       integracao_id: ['', Validators.required],
@@ -116,11 +124,19 @@ export class TesteApiComponent implements OnInit {
 
     this.sincronizando = true;
     this.ultimaSincronizacao = null;
-
-    this.integracoesService.sincronizarDados(request).subscribe({
-      next: (resultado: SincronizacaoResponse) => {
-        this.ultimaSincronizacao = resultado;
-        this.sincronizando = false;
+    this.progressoSincronizacao = 0;
+    this.sincronizacaoSub?.unsubscribe();
+
+    // A sincronização roda como job no servidor: acompanhar até terminar
+    this.sincronizacaoSub = this.integracoesService.sincronizarDados(request).pipe(
+      switchMap(iniciada => this.integracoesService.acompanharJob(iniciada.job_id))
+    ).subscribe({
+      next: (job: Job) => {
+        this.progressoSincronizacao = job.progresso_atual || 0;
+        if (STATUS_JOB_FINAIS.includes(job.status)) {
+          this.ultimaSincronizacao = this.resultadoDoJob(job);
+          this.sincronizando = false;
+        }
       },
       error: (error) => {
         this.ultimaSincronizacao = {
@@ -137,6 +153,24 @@ export class TesteApiComponent implements OnInit {
     });
   }
 
+  private resultadoDoJob(job: Job): SincronizacaoResponse {
+    const resultado = job.resultado || {};
+    const erros: string[] = resultado.erros || [];
+    const totalErros = resultado.total_erros || 0;
+    const mensagens = job.status === 'concluido'
+      ? (erros.length ? erros : ['Sincronização concluída com sucesso'])
+      : [job.mensagem || (job.status === 'cancelado' ? 'Sincronização cancelada' : 'Erro na sincronização')];
+    return {
+      sucesso: job.status === 'concluido' && totalErros === 0,
+      total_processados: resultado.total_processados || 0,
+      total_importados: resultado.total_importados || 0,
+      total_atualizadas: resultado.total_atualizados || 0,
+      total_erros: job.status === 'concluido' ? totalErros : Math.max(totalErros, 1),
+      mensagens,
+      detalhes: { job_id: job.id, modo: resultado.modo, paginas: resultado.paginas }
+    };
+  }
+
   configurarOmieRapido(): void {
     if (this.omieForm.invalid) {
       this.markFormGroupTouched(this.omieForm);